@@ -1,7 +1,6 @@
 from uuid import uuid4
 from pprint import pp
 from math import pi
-import pytz
 from enum import Enum
 from functools import cached_property
 from typing import Annotated, get_args, TypeVar
@@ -25,6 +24,21 @@ from pydantic import (
 from pydantic.alias_generators import to_camel, to_pascal
 from datetime import date, datetime
 from dateutil.parser import parse
+from pydanticcourse.countries import (
+    InternedRegistrationCountry,
+    country_code3,
+    lookup_country_name,
+)
+from pydanticcourse.formatters import format_iso_z, format_slash_date
+from pydanticcourse.timezones import make_utc, now_utc
+from pydanticcourse.wire_formats import (
+    DateWireFormat,
+    WireFormatModel,
+    parse_wire_date,
+    parse_wire_datetime,
+    to_wire,
+    wire_format,
+)
 
 # Use Pydntic mdeols to descibe attributes in another Pydantic model
 
@@ -201,14 +215,6 @@ json_data = """
 """
 
 
-def make_utc(dt: datetime) -> datetime:
-    if dt.tzinfo is None:
-        dt = pytz.utc.localize(dt)
-    else:
-        dt = dt.astimezone(pytz.utc)
-    return dt
-
-
 def parse_datetime(value: str):
     if isinstance(value, str):
         try:
@@ -218,21 +224,26 @@ def parse_datetime(value: str):
     return value
 
 
-def dt_serializer(dt, info: FieldSerializationInfo) -> datetime | str:
+def dt_serializer(dt, info: FieldSerializationInfo) -> datetime | str | int:
     if info.mode_is_json():
-        return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        # context={"date_wire_format": "epoch_ms"} etc. -> integer on the wire
+        fmt = wire_format(info)
+        if fmt is not DateWireFormat.text:
+            return to_wire(dt, fmt)
+        return format_iso_z(dt)  # same as dt.strftime("%Y-%m-%dT%H:%M:%SZ")
     return dt
 
 
 DateTimeUTC = Annotated[
     datetime,
     BeforeValidator(parse_datetime),
+    BeforeValidator(parse_wire_datetime),  # integer wire formats, see wire_formats.py
     AfterValidator(make_utc),
     PlainSerializer(dt_serializer, when_used="unless-none"),
 ]
 
 
-class CustomBaseModel(BaseModel):
+class CustomBaseModel(WireFormatModel):
     model_config = ConfigDict(
         extra="ignore", alias_generator=to_camel, populate_by_name=True
     )
@@ -240,7 +251,7 @@ class CustomBaseModel(BaseModel):
 
 class RequestInfo(CustomBaseModel):
     query_id: uuid4 = Field(default_factory=uuid4)
-    execution_dt: DateTimeUTC = Field(default_factory=lambda: datetime.now(pytz.utc))
+    execution_dt: DateTimeUTC = Field(default_factory=now_utc)
     elapsed_time_secs: float
 
 
@@ -248,6 +259,9 @@ class ResponseBaseModel(CustomBaseModel):
     request_info: RequestInfo
 
 
+# pydanticcourse/timing.py fills request_info in from the real handler time
+# (ResponseTimer / @timed_response) and keeps per-endpoint latency histograms
+
 # And now, we can use this ResponseBaseModel as the base for all our response models in our API.
 class Users(ResponseBaseModel):
     users: list[str] = []
@@ -260,61 +274,25 @@ users = Users(
 print(users.model_dump_json(by_alias=True, indent=2))
 
 # PROJECT
-countries = {
-    "australia": ("Australia", "AUS"),
-    "canada": ("Canada", "CAN"),
-    "china": ("China", "CHN"),
-    "france": ("France", "FRA"),
-    "germany": ("Germany", "DEU"),
-    "india": ("India", "IND"),
-    "mexico": ("Mexico", "MEX"),
-    "norway": ("Norway", "NOR"),
-    "pakistan": ("Pakistan", "PAK"),
-    "san marino": ("San Marino", "SMR"),
-    "sanmarino": ("San Marino", "SMR"),
-    "spain": ("Spain", "ESP"),
-    "sweden": ("Sweden", "SWE"),
-    "united kingdom": ("United Kingdom", "GBR"),
-    "uk": ("United Kingdom", "GBR"),
-    "great britain": ("United Kingdom", "GBR"),
-    "britain": ("United Kingdom", "GBR"),
-    "us": ("United States of America", "USA"),
-    "united states": ("United States of America", "USA"),
-    "usa": ("United States of America", "USA"),
-}
+# countries, aliases and fuzzy matching live in pydanticcourse/countries.py
 
-valid_country_names = sorted(countries.keys())
 
-
-def lookup_country(name: str) -> tuple[str, str]:
-    name = name.strip().casefold()
-    # casefold = Want to do case-insensitive string comparison? Use .casefold().
-    # Note casefold is "similar to lowercasing but more aggressive because
-    # it is intended to remove all case distinctions in a string"
-    # Its the Docs recommended ay to do string comparisons
-    try:
-        return countries[name]
-    except KeyError:
-        raise ValueError(
-            "Unknown country name. "
-            f"Country name must be one of: {','.join(valid_country_names)}"
-        )
-
-
-country_code_lookup = {name: code for name, code in countries.values()}
-
-
-def serialize_date(value: date) -> str:
-    return value.strftime("%Y/%m/%d")
+def serialize_date(value: date, info: FieldSerializationInfo) -> str | int:
+    fmt = wire_format(info)
+    if fmt is not DateWireFormat.text:
+        return to_wire(value, fmt)
+    return format_slash_date(value)  # same as value.strftime("%Y/%m/%d")
 
 
 T = TypeVar("T")
 BoundedString = Annotated[str, Field(min_length=2, max_length=50)]
 BoundedList = Annotated[list[T], Field(min_length=1, max_length=5)]
-Country = Annotated[str, AfterValidator(lambda name: lookup_country(name)[0])]
+Country = Annotated[str, AfterValidator(lookup_country_name)]
 
 CustomDate = Annotated[
-    datetime, PlainSerializer(serialize_date, when_used="json-unless-none")
+    datetime,
+    BeforeValidator(parse_wire_date),
+    PlainSerializer(serialize_date, when_used="json-unless-none"),
 ]
 
 
@@ -326,7 +304,7 @@ class AutomobileType(Enum):
     truck = "Truck"
 
 
-class CamelBasedModel(BaseModel):
+class CamelBasedModel(WireFormatModel):
     model_config = ConfigDict(
         extra="forbid",
         str_strip_whitespace=True,
@@ -342,7 +320,7 @@ class RegistrationCountry(CamelBasedModel):
     @computed_field
     @cached_property
     def code3(self) -> str:
-        return country_code_lookup[self.name]
+        return country_code3(self.name)
 
 
 class Automobile(CamelBasedModel):
@@ -366,7 +344,12 @@ class Automobile(CamelBasedModel):
         le=4,
         multiple_of=2,
     )
-    registration_country: RegistrationCountry | None
+    # A model instance, a name string and a cached code per vehicle adds up,
+    # so cars hold an interned CountryInfo instead (one per country for the
+    # whole process, see pydanticcourse/countries.py). It validates from
+    # {"name": "us"} and dumps like RegistrationCountry:
+    # {"name": "United States of America", "code3": "USA"}
+    registration_country: InternedRegistrationCountry | None
     registration_date: CustomDate | None = None
     license_plate: BoundedString | None = None
 
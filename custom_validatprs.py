@@ -1,6 +1,5 @@
 from uuid import uuid4
 from pprint import pp
-import pytz
 from enum import Enum
 import collections.abc
 from typing import Annotated, get_args, TypeVar
@@ -20,6 +19,9 @@ from pydantic import (
 from pydantic.alias_generators import to_camel
 from datetime import date, datetime
 from dateutil.parser import parse
+from pydanticcourse import timezones
+from pydanticcourse.countries import lookup_country_name
+from pydanticcourse.formatters import format_slash_date
 
 
 # Custom validators are functions
@@ -63,13 +65,10 @@ class TimeModel(BaseModel):
     @classmethod  # the method receives the class (cls) as its first argument, rather than an instance (self).
     def make_utc(cls, dt: datetime) -> datetime:
         # Ensure the datetime is timezone-aware
-        if dt.tzinfo is None:
-            # If naive, localize it to UTC
-            dt = pytz.utc.localize(dt)
-        else:
-            # Otherwise, convert to UTC if already timezone-aware
-            dt = dt.astimezone(pytz.utc)
-        return dt
+        # If naive, localize it to UTC
+        # Otherwise, convert to UTC if already timezone-aware
+        # (zoneinfo based, see pydanticcourse/timezones.py)
+        return timezones.make_utc(dt)
 
 
 # Example usage
@@ -175,51 +174,13 @@ print(d)
 # or a discount is applied to a price etc.
 
 # PROJECT
-countries = {
-    "australia": ("Australia", "AUS"),
-    "canada": ("Canada", "CAN"),
-    "china": ("China", "CHN"),
-    "france": ("France", "FRA"),
-    "germany": ("Germany", "DEU"),
-    "india": ("India", "IND"),
-    "mexico": ("Mexico", "MEX"),
-    "norway": ("Norway", "NOR"),
-    "pakistan": ("Pakistan", "PAK"),
-    "san marino": ("San Marino", "SMR"),
-    "sanmarino": ("San Marino", "SMR"),
-    "spain": ("Spain", "ESP"),
-    "sweden": ("Sweden", "SWE"),
-    "united kingdom": ("United Kingdom", "GBR"),
-    "uk": ("United Kingdom", "GBR"),
-    "great britain": ("United Kingdom", "GBR"),
-    "britain": ("United Kingdom", "GBR"),
-    "us": ("United States of America", "USA"),
-    "united states": ("United States of America", "USA"),
-    "usa": ("United States of America", "USA"),
-}
-
-valid_country_names = sorted(countries.keys())
-
-
-def lookup_country(name: str) -> tuple[str, str]:
-    name = name.strip().casefold()
-    # casefold = Want to do case-insensitive string comparison? Use .casefold().
-    # Note casefold is "similar to lowercasing but more aggressive because
-    # it is intended to remove all case distinctions in a string"
-    # Its the Docs recommended ay to do string comparisons
-    try:
-        return countries[name]
-    except KeyError:
-        raise ValueError(
-            "Unknown country name. "
-            f"Country name must be one of: {','.join(valid_country_names)}"
-        )
+# countries, aliases and fuzzy matching live in pydanticcourse/countries.py
 
 
 T = TypeVar("T")
 BoundedString = Annotated[str, Field(min_length=2, max_length=50)]
 BoundedList = Annotated[list[T], Field(min_length=1, max_length=5)]
-Country = Annotated[str, AfterValidator(lambda name: lookup_country(name)[0])]
+Country = Annotated[str, AfterValidator(lookup_country_name)]
 
 
 class AutomobileType(Enum):
@@ -267,7 +228,7 @@ class Automobile(BaseModel):
         "manufactured_date", "registration_date", when_used="json-unless-none"
     )
     def serialize_date(self, value: date) -> str:
-        return value.strftime("%Y/%m/%d")
+        return format_slash_date(value)  # same as value.strftime("%Y/%m/%d")
 
 
 api_data = {
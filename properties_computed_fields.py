@@ -1,7 +1,6 @@
 from uuid import uuid4
 from pprint import pp
 from math import pi
-import pytz
 from enum import Enum
 import collections.abc
 from typing import Annotated, get_args, TypeVar
@@ -15,6 +14,7 @@ from pydantic import (
     StringConstraints,
     field_serializer,
     field_validator,
+    FieldSerializationInfo,
     PlainSerializer,
     UUID4,
     ValidationInfo,
@@ -22,6 +22,16 @@ from pydantic import (
 from pydantic.alias_generators import to_camel
 from datetime import date, datetime
 from dateutil.parser import parse
+from pydanticcourse.countries import lookup_country_name
+from pydanticcourse.formatters import format_slash_date, format_slash_datetime
+from pydanticcourse.timezones import make_utc
+from pydanticcourse.wire_formats import (
+    DateWireFormat,
+    parse_wire_date,
+    parse_wire_datetime,
+    to_wire,
+    wire_format,
+)
 
 # Attach properties to pydantic model
 
@@ -53,14 +63,6 @@ print(circle.cicumference)
 # serializes to JSON using the following format YYY/MM/DD HH:MM: AM/PM (UTC)
 
 
-def make_utc(dt: datetime) -> datetime:
-    if dt.tzinfo is None:
-        dt = pytz.utc.localize(dt)
-    else:
-        dt = dt.astimezone(pytz.utc)
-    return dt
-
-
 def parse_datetime(value: str):
     if isinstance(value, str):
         try:
@@ -70,8 +72,13 @@ def parse_datetime(value: str):
     return value
 
 
-def dt_json_serializer(dt: datetime) -> str:
-    return dt.strftime("%Y/%m/%d %I:%M %p UTC")
+def dt_json_serializer(dt: datetime, info: FieldSerializationInfo) -> str | int:
+    # context={"date_wire_format": "epoch_s"} etc. -> integer on the wire
+    fmt = wire_format(info)
+    if fmt is not DateWireFormat.text:
+        return to_wire(dt, fmt)
+    # same as dt.strftime("%Y/%m/%d %I:%M %p UTC") without the strftime cost
+    return format_slash_datetime(dt)
 
 
 # Added PlainSerializer
@@ -80,6 +87,7 @@ def dt_json_serializer(dt: datetime) -> str:
 DateTimeUTC = Annotated[
     datetime,
     BeforeValidator(parse_datetime),  # Format to validable string
+    BeforeValidator(parse_wire_datetime),  # Integer wire formats (opt-in)
     AfterValidator(make_utc),  # Format to UTC
     # Now a step to ensure
     # Serializes to JSON using the following format YYY/MM/DD HH:MM: AM/PM (UTC)
@@ -96,57 +104,24 @@ pp(m.model_dump_json())  # '{"dt":"2024/01/01 03:00 PM UTC"}'
 
 
 # PROJECT
-countries = {
-    "australia": ("Australia", "AUS"),
-    "canada": ("Canada", "CAN"),
-    "china": ("China", "CHN"),
-    "france": ("France", "FRA"),
-    "germany": ("Germany", "DEU"),
-    "india": ("India", "IND"),
-    "mexico": ("Mexico", "MEX"),
-    "norway": ("Norway", "NOR"),
-    "pakistan": ("Pakistan", "PAK"),
-    "san marino": ("San Marino", "SMR"),
-    "sanmarino": ("San Marino", "SMR"),
-    "spain": ("Spain", "ESP"),
-    "sweden": ("Sweden", "SWE"),
-    "united kingdom": ("United Kingdom", "GBR"),
-    "uk": ("United Kingdom", "GBR"),
-    "great britain": ("United Kingdom", "GBR"),
-    "britain": ("United Kingdom", "GBR"),
-    "us": ("United States of America", "USA"),
-    "united states": ("United States of America", "USA"),
-    "usa": ("United States of America", "USA"),
-}
+# countries, aliases and fuzzy matching live in pydanticcourse/countries.py
 
-valid_country_names = sorted(countries.keys())
 
-
-def lookup_country(name: str) -> tuple[str, str]:
-    name = name.strip().casefold()
-    # casefold = Want to do case-insensitive string comparison? Use .casefold().
-    # Note casefold is "similar to lowercasing but more aggressive because
-    # it is intended to remove all case distinctions in a string"
-    # Its the Docs recommended ay to do string comparisons
-    try:
-        return countries[name]
-    except KeyError:
-        raise ValueError(
-            "Unknown country name. "
-            f"Country name must be one of: {','.join(valid_country_names)}"
-        )
-
-
-def serialize_date(value: date) -> str:
-    return value.strftime("%Y/%m/%d")
+def serialize_date(value: date, info: FieldSerializationInfo) -> str | int:
+    fmt = wire_format(info)
+    if fmt is not DateWireFormat.text:
+        return to_wire(value, fmt)
+    return format_slash_date(value)  # same as value.strftime("%Y/%m/%d")
 
 
 T = TypeVar("T")
 BoundedString = Annotated[str, Field(min_length=2, max_length=50)]
 BoundedList = Annotated[list[T], Field(min_length=1, max_length=5)]
-Country = Annotated[str, AfterValidator(lambda name: lookup_country(name)[0])]
+Country = Annotated[str, AfterValidator(lookup_country_name)]
 CustomDate = Annotated[
-    datetime, PlainSerializer(serialize_date, when_used="json-unless-none")
+    datetime,
+    BeforeValidator(parse_wire_date),
+    PlainSerializer(serialize_date, when_used="json-unless-none"),
 ]
 
 
@@ -0,0 +1,112 @@
+"""
+The Pydantic course project models as an importable package
+
+The lesson scripts in the repository root are meant to be run, they print
+demos when imported. Everything here is safe to import:
+
+    from pydanticcourse import Automobile
+
+- importing the package itself loads nothing, each name below is imported
+  from its module the first time it's used
+- the models use defer_build=True, so a model's core schema is built the
+  first time it validates or serializes something
+- pandas, pandantic, requests and dateutil are imported inside the functions
+  that need them
+
+python -m pydanticcourse.import_benchmark shows what each import costs.
+Short lived workers can call warm_start() at startup to load the built
+schemas from disk instead of generating them (see schema_cache.py).
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    # models
+    "Automobile": "automobiles",
+    "AutomobileType": "automobiles",
+    "CamelBasedModel": "automobiles",
+    "RegistrationCountry": "automobiles",
+    "ContactInfo": "people",
+    "LazyPerson": "people",
+    "CustomModel": "people",
+    "PersonalInfo": "people",
+    "Person": "people",
+    "PersonInheritence": "people",
+    "PlaceDateInfo": "people",
+    "PlaceInfo": "people",
+    "CustomBaseModel": "responses",
+    "RequestInfo": "responses",
+    "ResponseBaseModel": "responses",
+    "Users": "responses",
+    "DataFrameSchema": "estimates",
+    "Estimate": "estimates",
+    "validate_dataframe": "estimates",
+    "validate_estimates": "estimates",
+    "IPGeo": "geo",
+    "fetch_ip_geo": "geo",
+    # annotated types
+    "BoundedList": "custom_types",
+    "BoundedString": "custom_types",
+    "Country": "custom_types",
+    "InternedCountry": "countries",
+    "InternedRegistrationCountry": "countries",
+    "CustomDate": "custom_types",
+    "DateTimeUTC": "custom_types",
+    "SortedStringList": "custom_types",
+    # helpers
+    "CountryInfo": "countries",
+    "lookup_country": "countries",
+    "registry": "countries",
+    "DateWireFormat": "wire_formats",
+    "WireFormatModel": "wire_formats",
+    "make_utc": "timezones",
+    "FailFast": "failfast",
+    "ColumnExporter": "columnar",
+    "write_csv": "columnar",
+    "write_parquet": "columnar",
+    "KeyMap": "rekey",
+    "generator_map": "rekey",
+    "key_map": "rekey",
+    "ErrorSink": "error_sink",
+    "ValidatorProfile": "profiling",
+    "profile_validators": "profiling",
+    "IdGenerator": "ids",
+    "LineError": "ndjson",
+    "validate_ndjson": "ndjson",
+    "ModelWriter": "writers",
+    "write_models": "writers",
+    "FleetStore": "fleet",
+    "AutomobileIndex": "indexes",
+    "BloomFilter": "indexes",
+    "DuplicateVinError": "indexes",
+    "TrustedLoader": "trusted",
+    "TrustedDataWarning": "trusted",
+    "update_fields": "updates",
+    "update_many": "updates",
+    "extract": "selective",
+    "json_paths": "selective",
+    "ElementError": "jsonstream",
+    "iter_json_array": "jsonstream",
+    "LatencyRegistry": "timing",
+    "ResponseTimer": "timing",
+    "latencies": "timing",
+    "timed_response": "timing",
+    "warm_start": "schema_cache",
+    "SchemaCacheWarning": "schema_cache",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value  # next time it's a plain module attribute
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
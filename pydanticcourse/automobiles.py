@@ -0,0 +1,73 @@
+"""
+The Automobile project model (the final version built up in the lessons)
+"""
+
+from datetime import date
+from enum import Enum
+from functools import cached_property
+
+from pydantic import UUID4, ConfigDict, Field, computed_field
+from pydantic.alias_generators import to_camel
+
+from pydanticcourse.countries import InternedRegistrationCountry, country_code3
+from pydanticcourse.custom_types import BoundedList, BoundedString, Country, CustomDate
+from pydanticcourse.ids import uuid4
+from pydanticcourse.wire_formats import WireFormatModel
+
+
+class AutomobileType(Enum):
+    sedan = "Sedan"
+    coupe = "Coupe"
+    convertible = "Convertible"
+    suv = "SUV"
+    truck = "Truck"
+
+
+class CamelBasedModel(WireFormatModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        str_strip_whitespace=True,
+        validate_default=True,
+        validate_assignment=True,
+        alias_generator=to_camel,
+        # Build the core schema on first use, not when the module is imported
+        defer_build=True,
+    )
+
+
+class RegistrationCountry(CamelBasedModel):
+    name: Country | None = None
+
+    @computed_field
+    @cached_property
+    def code3(self) -> str:
+        return country_code3(self.name)
+
+
+class Automobile(CamelBasedModel):
+    id_: UUID4 | None = Field(alias="id", default_factory=uuid4)
+    manufacturer: BoundedString
+    series_name: BoundedString
+    type_: AutomobileType = Field(alias="type")
+    is_electric: bool = False
+    manufactured_date: CustomDate = Field(
+        validation_alias="completionDate", ge=date(1980, 1, 1)
+    )
+    base_msrp_usd: float = Field(
+        validation_alias="msrpUSD", serialization_alias="baseMSRPUSD"
+    )
+    top_features: BoundedList[BoundedString] | None = None
+    vin: BoundedString
+    number_of_doors: int = Field(
+        default=4,
+        validation_alias="doors",
+        ge=2,
+        le=4,
+        multiple_of=2,
+    )
+    # An interned CountryInfo rather than a RegistrationCountry per car. It
+    # validates from {"name": "us"} and dumps the same way the model does:
+    # {"name": "United States of America", "code3": "USA"}
+    registration_country: InternedRegistrationCountry | None
+    registration_date: CustomDate | None = None
+    license_plate: BoundedString | None = None
@@ -0,0 +1,147 @@
+"""
+NumPy backed column types
+
+The building blocks of FleetStore (fleet.py) and ErrorSink (error_sink.py):
+
+GrowableArray     a NumPy array that grows by doubling, like a list
+DictionaryColumn  each distinct value stored once, rows hold int32 codes
+StringColumn      all the strings in one UTF-8 buffer plus offsets
+ListColumn        list[str] per row, dictionary encoded items plus offsets
+
+The three columns store None as well as values. truncate(rows) drops the
+rows past the first `rows`, to undo a failed extend().
+"""
+
+from typing import Any, Iterable
+
+import numpy as np
+
+_INITIAL_CAPACITY = 1024
+
+
+class GrowableArray:
+    # A NumPy array that grows by doubling, like a list
+    def __init__(self, dtype, shape: tuple[int, ...] = ()):
+        self.data = np.empty((_INITIAL_CAPACITY, *shape), dtype=dtype)
+        self.size = 0
+
+    def extend(self, values) -> None:
+        values = np.asarray(values, dtype=self.data.dtype)
+        end = self.size + len(values)
+        if end > len(self.data):
+            capacity = max(end, len(self.data) * 2)
+            grown = np.empty((capacity, *self.data.shape[1:]), dtype=self.data.dtype)
+            grown[: self.size] = self.data[: self.size]
+            self.data = grown
+        self.data[self.size : end] = values
+        self.size = end
+
+    def truncate(self, size: int) -> None:
+        self.size = min(self.size, size)
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.data[: self.size]
+
+
+class DictionaryColumn:
+    # Each distinct value is stored once, rows hold its index (-1 = None)
+    def __init__(self):
+        self.codes = GrowableArray(np.int32)
+        self.values: list[Any] = []
+        self._index: dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        if value is None:
+            return -1
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code_of(self, value: Any) -> int:
+        # -2 matches nothing, it's never used as a code
+        return -1 if value is None else self._index.get(value, -2)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        encode = self.encode
+        self.codes.extend([encode(v) for v in values])
+
+    def truncate(self, rows: int) -> None:
+        # Values only the dropped rows used stay in the dictionary
+        self.codes.truncate(rows)
+
+    def __getitem__(self, row: int) -> Any:
+        code = self.codes.data[row]
+        return None if code < 0 else self.values[code]
+
+
+class StringColumn:
+    # All the strings back to back in one UTF-8 buffer, row i is
+    # data[offsets[i]:offsets[i + 1]]. None is a separate mask.
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = GrowableArray(np.int64)
+        self.offsets.extend([0])
+        self.present = GrowableArray(np.bool_)
+
+    def extend(self, values: Iterable[str | None]) -> None:
+        ends = []
+        present = []
+        for value in values:
+            if value is not None:
+                self.data += value.encode()
+            ends.append(len(self.data))
+            present.append(value is not None)
+        self.offsets.extend(ends)
+        self.present.extend(present)
+
+    def truncate(self, rows: int) -> None:
+        # Also drops what a failed extend() wrote past the last row
+        rows = min(rows, self.present.size)
+        del self.data[self.offsets.data[rows] :]
+        self.offsets.truncate(rows + 1)
+        self.present.truncate(rows)
+
+    def __getitem__(self, row: int) -> str | None:
+        if not self.present.data[row]:
+            return None
+        start, end = self.offsets.data[row], self.offsets.data[row + 1]
+        return self.data[start:end].decode()
+
+
+class ListColumn:
+    # list[str] | None per row: dictionary encoded items + offsets
+    def __init__(self):
+        self.items = DictionaryColumn()
+        self.offsets = GrowableArray(np.int64)
+        self.offsets.extend([0])
+        self.present = GrowableArray(np.bool_)
+
+    def extend(self, values: Iterable[list[str] | None]) -> None:
+        ends = []
+        present = []
+        end = self.items.codes.size
+        for value in values:
+            if value is not None:
+                self.items.extend(value)
+                end += len(value)
+            ends.append(end)
+            present.append(value is not None)
+        self.offsets.extend(ends)
+        self.present.extend(present)
+
+    def truncate(self, rows: int) -> None:
+        # Also drops what a failed extend() wrote past the last row
+        rows = min(rows, self.present.size)
+        self.items.truncate(self.offsets.data[rows])
+        self.offsets.truncate(rows + 1)
+        self.present.truncate(rows)
+
+    def __getitem__(self, row: int) -> list[str] | None:
+        if not self.present.data[row]:
+            return None
+        start, end = self.offsets.data[row], self.offsets.data[row + 1]
+        values = self.items.values
+        return [values[code] for code in self.items.codes.data[start:end]]
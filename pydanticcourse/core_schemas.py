@@ -0,0 +1,115 @@
+"""
+The pydantic internals the core schema tools build on
+
+schema_cache, profiling, failfast and columnar take models' core schemas
+apart (or copy them) and build SchemaValidators / SchemaSerializers from
+the pieces; trusted, updates, selective and rekey read the fields' keys
+from them. Two things the builders need have no public API in pydantic:
+the CoreConfig it makes from model_config, and creating a validator the
+way a model class gets its own (plugins included). Both come from here so
+there's one place to fix when pydantic moves them.
+
+They were checked against pydantic 2.10. Code that would quietly do the
+wrong thing on another version, rather than fail, calls
+require_tested_pydantic() first.
+"""
+
+from typing import Any
+
+import pydantic
+from pydantic import BaseModel
+from pydantic_core import CoreConfig, CoreSchema, SchemaValidator
+
+TESTED_PYDANTIC = (2, 10)
+
+
+def pydantic_version() -> tuple[int, int]:
+    major, minor = pydantic.VERSION.split(".")[:2]
+    return int(major), int(minor)
+
+
+def require_tested_pydantic(feature: str) -> None:
+    if pydantic_version() != TESTED_PYDANTIC:
+        tested = ".".join(map(str, TESTED_PYDANTIC))
+        raise RuntimeError(
+            f"{feature} relies on pydantic internals that were only checked"
+            f" against pydantic {tested}.x, this is pydantic {pydantic.VERSION}"
+        )
+
+
+def core_config(model: type[BaseModel]) -> CoreConfig:
+    # The same config pydantic hands the validator when it builds the class
+    from pydantic._internal._config import ConfigWrapper
+
+    return ConfigWrapper(model.model_config, check=False).core_config(title=model.__name__)
+
+
+def schema_validator(
+    model: type[BaseModel], schema: CoreSchema, config: CoreConfig | None = None
+) -> SchemaValidator:
+    # A validator for (a version of) the model's schema, built like the
+    # model's own __pydantic_validator__
+    from pydantic.plugin._schema_validator import create_schema_validator
+
+    return create_schema_validator(
+        schema,
+        model,
+        model.__module__,
+        model.__qualname__,
+        "BaseModel",
+        core_config(model) if config is None else config,
+        model.model_config.get("plugin_settings"),
+    )
+
+
+def apply_alias_generator(model: type[BaseModel]) -> None:
+    # Building the schema also fills in the FieldInfos' aliases from
+    # model_config's alias_generator (model_fields["series_name"].alias is
+    # None until then). A model given a cached schema skips the build.
+    alias_generator = model.model_config.get("alias_generator")
+    if alias_generator is None:
+        return
+    from pydantic._internal._generate_schema import GenerateSchema
+
+    for name, field in model.model_fields.items():
+        GenerateSchema._apply_alias_generator_to_field_info(alias_generator, field, name)
+    for name, decorator in model.__pydantic_decorators__.computed_fields.items():
+        GenerateSchema._apply_alias_generator_to_computed_field_info(
+            alias_generator, decorator.info, name
+        )
+
+
+def model_fields_schema(model: type[BaseModel]) -> dict[str, Any]:
+    # The "model-fields" schema inside the model's core schema. Its fields
+    # carry the input keys the validator really uses, alias_generator ones
+    # included, however the schema was built or loaded.
+    model.model_rebuild()  # defer_build models have no schema until first use
+    schema = model.__pydantic_core_schema__
+    definitions = {}
+    if schema["type"] == "definitions":
+        definitions = {d["ref"]: d for d in schema["definitions"]}
+        schema = schema["schema"]
+    if schema["type"] == "definition-ref":  # self-referencing models
+        schema = definitions[schema["schema_ref"]]
+    while schema["type"] in ("function-after", "function-before", "function-wrap"):
+        schema = schema["schema"]  # model validators
+    if schema["type"] != "model" or schema["schema"]["type"] != "model-fields":
+        raise TypeError(f"{model.__name__} isn't a plain BaseModel")
+    return schema["schema"]
+
+
+def input_paths(name: str, field: dict[str, Any], by_name: bool = False) -> list[list[str | int]]:
+    # Every path the validator looks the field up by, in the order it tries
+    # them. by_name: the field name as well (populate_by_name models).
+    alias = field.get("validation_alias")
+    if alias is None:
+        return [[name]]
+    if isinstance(alias, str):
+        paths = [[alias]]
+    elif isinstance(alias[0], list):
+        paths = [list(path) for path in alias]  # AliasChoices
+    else:
+        paths = [list(alias)]  # AliasPath
+    if by_name and [name] not in paths:
+        paths.append([name])
+    return paths
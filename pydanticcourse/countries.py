@@ -0,0 +1,467 @@
+"""
+Country resolver for the Country annotated type
+
+Replaces the hand written 20 entry countries dict. Resolves free text to an
+ISO 3166-1 country in three steps, cheapest first:
+
+    1. exact   - "Germany", " USA ", "GBR", "DE", "Côte d'Ivoire", "cote divoire"
+    2. aliases - "UK", "Great Britain", "Holland", "South Korea" ...
+    3. fuzzy   - "Untied Kingdom", "Germnay", "Swedn" (bounded edit distance)
+
+ISO codes only count in upper case ("DE" and "GBR", not "no", "and" or
+"per" out of free text); names are case-insensitive.
+
+Names are normalized before matching: accents stripped, casefolded,
+punctuation -> spaces, a leading "the" dropped.
+casefold is "similar to lowercasing but more aggressive because it is
+intended to remove all case distinctions in a string" - it's the docs
+recommended way to do case-insensitive string comparisons.
+
+Fuzzy matches use a bigram index to pick candidates and an optimal string
+alignment distance (Levenshtein + transpositions) to check them. A fuzzy
+match is only accepted when it keeps the first letter, stays within one
+edit per five characters and a single country is closest - so "Prussia"
+is not Russia.
+
+An unknown country's error names the few closest countries, not all ~250.
+
+The data lives in pydanticcourse/data/iso3166.csv (the ISO 3166-1 list from
+the iso-codes project plus our own aliases). `registry` holds the live copy,
+long running services can pick up an edited file with registry.reload() or
+registry.reload_if_changed().
+"""
+
+import csv
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import chain
+from pathlib import Path
+from typing import Annotated, Any, Iterable
+
+from pydantic import PlainSerializer, PlainValidator
+
+DATA_FILE = Path(__file__).parent / "data" / "iso3166.csv"
+
+_NOT_WORD = re.compile(r"[\W_]+")
+
+# Raw strings remembered per resolver (hits and misses), cleared when full
+_MEMO_MAX = 100_000
+
+# At most one edit per this many characters for a fuzzy match
+_CHARS_PER_EDIT = 5
+# Countries suggested by the unknown-country error
+_SUGGESTIONS = 3
+
+
+class CountryInfo:
+    # One instance per country for the whole process (see intern_country),
+    # so a model field holding a country costs a pointer, not a string plus
+    # a nested model. `id` is a small int, stable for the life of the
+    # process, handy for dictionary encoding.
+    __slots__ = ("id", "name", "alpha2", "alpha3", "numeric")
+
+    def __init__(self, id: int, name: str, alpha2: str, alpha3: str, numeric: str):
+        self.id = id
+        self.name = name
+        self.alpha2 = alpha2
+        self.alpha3 = alpha3
+        self.numeric = numeric
+
+    @property
+    def code3(self) -> str:
+        return self.alpha3
+
+    def __repr__(self) -> str:
+        return f"CountryInfo(name={self.name!r}, code3={self.alpha3!r})"
+
+    def __reduce__(self):
+        # Unpickle to the interned instance in the receiving process
+        return country_by_code3, (self.alpha3,)
+
+
+_interned: dict[str, CountryInfo] = {}  # alpha3 -> instance
+_intern_lock = threading.Lock()
+
+
+def intern_country(name: str, alpha2: str, alpha3: str, numeric: str) -> CountryInfo:
+    # Reloads reuse the existing instance unless the country's data changed,
+    # in which case the replacement keeps the same id
+    with _intern_lock:
+        current = _interned.get(alpha3)
+        if current is not None and (current.name, current.alpha2, current.numeric) == (
+            name,
+            alpha2,
+            numeric,
+        ):
+            return current
+        id = current.id if current is not None else len(_interned)
+        country = _interned[alpha3] = CountryInfo(id, name, alpha2, alpha3, numeric)
+        return country
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    text = _NOT_WORD.sub(" ", text).strip()
+    if text.startswith("the "):
+        text = text[4:]
+    return text
+
+
+def _bigrams(text: str) -> set[str]:
+    padded = f"^{text}$"
+    return {padded[i : i + 2] for i in range(len(padded) - 1)}
+
+
+def _max_edits(text: str) -> int:
+    # Short strings are too easy to confuse ("Iran" / "Iraq", "Mali" / "Bali"),
+    # and never more than one edit per _CHARS_PER_EDIT characters
+    return len(text) // _CHARS_PER_EDIT if len(text) < 3 * _CHARS_PER_EDIT else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    # Optimal string alignment distance (Levenshtein + transpositions).
+    # Only cells within `limit` of the diagonal can stay under the limit, so
+    # that's all we fill in. Returns limit + 1 for anything over the limit.
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    width = len(b) + 1
+    previous2 = [over] * width
+    previous = [j if j <= limit else over for j in range(width)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        current = [over] * width
+        if i <= limit:
+            current[0] = i
+        row_best = current[0]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cb = b[j - 1]
+            best = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < best:
+                best = previous[j] + 1
+            if current[j - 1] + 1 < best:
+                best = current[j - 1] + 1
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                if previous2[j - 2] + 1 < best:
+                    best = previous2[j - 2] + 1
+            current[j] = best
+            if best < row_best:
+                row_best = best
+        if row_best > limit:
+            return over
+        previous2, previous = previous, current
+    return min(previous[-1], over)
+
+
+class CountryResolver:
+    def __init__(self, countries: Iterable[CountryInfo], aliases: dict[str, str]):
+        # aliases maps extra spellings -> alpha3
+        self.countries = tuple(countries)
+        by_code = {country.alpha3: country for country in self.countries}
+
+        # Codes are only taken as they're written, in upper case
+        self._codes = {country.alpha2: country for country in self.countries}
+        self._codes.update((country.alpha3, country) for country in self.countries)
+        names: dict[str, CountryInfo] = {}
+        for country in self.countries:
+            names[normalize(country.name)] = country
+        for alias, code in aliases.items():
+            names.setdefault(normalize(alias), by_code[code])
+        self._index = names
+
+        # Fuzzy matching only looks at names, two/three letter codes are
+        # too short to guess at
+        self._fuzzy_names = list(names)
+        self._fuzzy_sizes = [len(_bigrams(name)) for name in self._fuzzy_names]
+        self._fuzzy_index: dict[str, list[int]] = defaultdict(list)
+        for position, name in enumerate(self._fuzzy_names):
+            for gram in _bigrams(name):
+                self._fuzzy_index[gram].append(position)
+
+        self.by_name = {country.name: country for country in self.countries}
+        self.names = sorted(self.by_name)
+
+        # Bulk feeds repeat the same few dozen raw strings over and over, so
+        # remember the outcome (None = unknown) for each raw string we've seen
+        self._memo: dict[str, CountryInfo | None] = {}
+        # and the error message for each unknown one
+        self._unknown_messages: dict[str, str] = {}
+
+    def resolve(self, raw: str) -> CountryInfo | None:
+        # Cheap first: most input is plain ASCII that only needs casefolding
+        stripped = raw.strip()
+        country = self._index.get(stripped.casefold()) or self._codes.get(stripped)
+        if country is not None:
+            return country
+        key = normalize(raw)
+        country = self._index.get(key)
+        if country is not None:
+            return country
+        return self._fuzzy(key)
+
+    def _fuzzy(self, key: str) -> CountryInfo | None:
+        limit = _max_edits(key)
+        if limit == 0:
+            return None
+        grams = _bigrams(key)
+        shared = Counter(
+            chain.from_iterable(self._fuzzy_index.get(gram, ()) for gram in grams)
+        )
+        # An edit breaks at most three bigrams (a transposition), so a real
+        # match has to share at least this many
+        needed = len(grams) - 3 * limit
+
+        best_distance = limit + 1
+        best: set[CountryInfo] = set()
+        for position, count in shared.items():
+            if count < needed:
+                continue
+            name = self._fuzzy_names[position]
+            if name[0] != key[0]:
+                continue  # typos rarely hit the first letter, "Prussia" isn't Russia
+            distance = edit_distance(key, name, limit)
+            if distance < best_distance:
+                best_distance, best = distance, {self._index[name]}
+            elif distance == best_distance and distance <= limit:
+                best.add(self._index[name])
+        if len(best) != 1:
+            return None  # nothing close enough, or a tie between countries
+        return best.pop()
+
+    def suggestions(self, raw: str, limit: int = _SUGGESTIONS) -> list[str]:
+        # The countries whose names share the most bigrams with raw (Dice
+        # coefficient), for error messages
+        grams = _bigrams(normalize(raw))
+        shared = Counter(
+            chain.from_iterable(self._fuzzy_index.get(gram, ()) for gram in grams)
+        )
+        scored = sorted(
+            (
+                (2 * count / (len(grams) + self._fuzzy_sizes[position]), position)
+                for position, count in shared.items()
+            ),
+            reverse=True,
+        )
+        found: list[str] = []
+        for score, position in scored:
+            if score < 0.3 or len(found) == limit:
+                break
+            name = self._index[self._fuzzy_names[position]].name
+            if name not in found:
+                found.append(name)
+        return found
+
+    def unknown_message(self, raw: str) -> str:
+        message = self._unknown_messages.get(raw)
+        if message is None:
+            message = f"Unknown country name {raw[:50]!r}"
+            suggestions = self.suggestions(raw)
+            if suggestions:
+                message += f", did you mean: {', '.join(suggestions)}"
+            if len(self._unknown_messages) >= _MEMO_MAX:
+                self._unknown_messages.clear()
+            self._unknown_messages[raw] = message
+        return message
+
+    def resolve_cached(self, raw: str) -> CountryInfo | None:
+        try:
+            return self._memo[raw]
+        except KeyError:
+            pass
+        country = self.resolve(raw)
+        if len(self._memo) >= _MEMO_MAX:
+            self._memo.clear()
+        self._memo[raw] = country
+        return country
+
+    def lookup(self, raw: str) -> tuple[str, str]:
+        country = self.resolve_cached(raw)
+        if country is None:
+            raise ValueError(self.unknown_message(raw))
+        return country.name, country.alpha3
+
+    def lookup_name(self, raw: str) -> str:
+        # What the Country annotated type needs
+        return self.lookup_info(raw).name
+
+    def lookup_info(self, raw: str) -> CountryInfo:
+        country = self.resolve_cached(raw)
+        if country is None:
+            raise ValueError(self.unknown_message(raw))
+        return country
+
+
+def load_resolver(path: Path | str = DATA_FILE) -> CountryResolver:
+    countries = []
+    aliases = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            countries.append(
+                intern_country(
+                    row["name"], row["alpha_2"], row["alpha_3"], row["numeric"]
+                )
+            )
+            for alias in filter(None, row["aliases"].split(";")):
+                aliases[alias] = row["alpha_3"]
+    return CountryResolver(countries, aliases)
+
+
+class CountryRegistry:
+    """The live set of countries, reloadable without a restart.
+
+    A reload builds a complete new CountryResolver off to the side and then
+    publishes it with a single attribute assignment. Readers grab
+    `registry.resolver` once per lookup and never take a lock - they see
+    either the old resolver or the new one, never something half built.
+    The memo lives on the resolver, so a reload starts with a clean one.
+    The data file is only read on first use.
+    """
+
+    def __init__(self, path: Path | str = DATA_FILE):
+        self.path = Path(path)
+        self._mtime_ns: int | None = None
+        self._resolver: CountryResolver | None = None
+        # Only writers lock, so two reloads can't race each other
+        self._reload_lock = threading.Lock()
+
+    @property
+    def resolver(self) -> CountryResolver:
+        resolver = self._resolver
+        if resolver is None:
+            with self._reload_lock:
+                if self._resolver is None:
+                    self._load(self.path)
+                resolver = self._resolver
+        return resolver  # type: ignore[return-value]
+
+    def _load(self, path: Path) -> CountryResolver:
+        mtime_ns = path.stat().st_mtime_ns
+        resolver = load_resolver(path)  # may raise, the old one stays live
+        self.path, self._mtime_ns = path, mtime_ns
+        self._resolver = resolver
+        return resolver
+
+    def reload(self, path: Path | str | None = None) -> CountryResolver:
+        with self._reload_lock:
+            return self._load(Path(path) if path is not None else self.path)
+
+    def reload_if_changed(self) -> bool:
+        # Cheap enough to call from a timer / before each batch
+        if self._resolver is None:
+            return False  # not loaded yet, first use reads the current file
+        if self.path.stat().st_mtime_ns == self._mtime_ns:
+            return False
+        self.reload()
+        return True
+
+    def lookup(self, raw: str) -> tuple[str, str]:
+        return self.resolver.lookup(raw)
+
+    def lookup_name(self, raw: str) -> str:
+        return self.resolver.lookup_name(raw)
+
+    def code3(self, name: str) -> str:
+        return self.resolver.by_name[name].alpha3
+
+    @property
+    def names(self) -> list[str]:
+        return self.resolver.names
+
+
+registry = CountryRegistry()
+
+
+def lookup_country(name: str) -> tuple[str, str]:
+    return registry.resolver.lookup(name)
+
+
+def lookup_country_name(name: str) -> str:
+    return registry.resolver.lookup_name(name)
+
+
+def country_code3(name: str) -> str:
+    # display name -> ISO alpha-3 code, e.g. "United Kingdom" -> "GBR"
+    return registry.resolver.by_name[name].alpha3
+
+
+def country_by_code3(code3: str) -> CountryInfo:
+    registry.resolver  # make sure the countries have been loaded
+    try:
+        return _interned[code3]
+    except KeyError:
+        raise ValueError(f"Unknown ISO 3166-1 alpha-3 code {code3!r}") from None
+
+
+# Annotated types holding an interned CountryInfo
+# They validate from anything lookup_country accepts (or an existing
+# CountryInfo) and serialize back to the same wire formats as before:
+#   InternedCountry             -> "United Kingdom"
+#   InternedRegistrationCountry -> {"name": "United Kingdom", "code3": "GBR"}
+
+
+def parse_country(value: Any) -> CountryInfo:
+    if isinstance(value, CountryInfo):
+        return value
+    if isinstance(value, str):
+        return registry.resolver.lookup_info(value)
+    raise ValueError("Country must be a string")
+
+
+def parse_registration_country(value: Any) -> CountryInfo:
+    # {"name": "us"} as sent by the API, a dump {"name": ..., "code3": ...},
+    # or a RegistrationCountry (anything with a .name)
+    if isinstance(value, CountryInfo):
+        return value
+    if not isinstance(value, dict):
+        return parse_country(getattr(value, "name", value))
+    if set(value) - {"name", "code3"}:
+        raise ValueError("Registration country only has name and code3")
+    code3 = value.get("code3")
+    if value.get("name") is None and code3 is not None:
+        return country_by_code3(code3)
+    country = parse_country(value.get("name"))
+    if code3 is not None and code3 != country.alpha3:
+        raise ValueError(
+            f"Registration country code3 {code3!r} doesn't match"
+            f" {country.name} ({country.alpha3})"
+        )
+    return country
+
+
+def country_name(country: CountryInfo) -> str:
+    return country.name
+
+
+def registration_country_dict(country: CountryInfo) -> dict[str, str]:
+    return {"name": country.name, "code3": country.alpha3}
+
+
+InternedCountry = Annotated[
+    CountryInfo,
+    PlainValidator(parse_country, json_schema_input_type=str),
+    PlainSerializer(country_name, return_type=str),
+]
+InternedRegistrationCountry = Annotated[
+    CountryInfo,
+    PlainValidator(parse_registration_country, json_schema_input_type=dict[str, str]),
+    PlainSerializer(registration_country_dict, return_type=dict[str, str]),
+]
+
+
+if __name__ == "__main__":
+    # python -m pydanticcourse.countries
+    import timeit
+
+    resolver = registry.resolver
+    number = 5_000
+    for raw in ("Germany", "Côte d'Ivoire", "Untied Kingdom", "Prussia", "Narnia"):
+        uncached = timeit.timeit(lambda: resolver.resolve(raw), number=number)
+        cached = timeit.timeit(lambda: resolver.resolve_cached(raw), number=number)
+        print(
+            f"{raw!r:>18} -> {resolver.resolve(raw)}\n"
+            f"{'':>18}    {uncached / number * 1e6:.2f} us, "
+            f"cached {cached / number * 1e6:.2f} us"
+        )
@@ -0,0 +1,91 @@
+"""
+Annotated types shared by the project models
+
+    DateTimeUTC      -> parsed from most string formats, stored as UTC,
+                        JSON "%Y-%m-%dT%H:%M:%SZ"
+    CustomDate       -> JSON "%Y/%m/%d"
+    BoundedString    -> 2 to 50 characters
+    BoundedList      -> 1 to 5 items
+    SortedStringList -> sorted case-insensitively
+    Country          -> country name resolved through pydanticcourse.countries
+
+Validators and serializers are plain module level functions (no lambdas) so
+schemas built from them can be pickled, see schema_cache.py.
+"""
+
+from datetime import date, datetime
+from typing import Annotated, Any, TypeVar
+
+from pydantic import (
+    AfterValidator,
+    BeforeValidator,
+    Field,
+    FieldSerializationInfo,
+    PlainSerializer,
+)
+
+from pydanticcourse.countries import lookup_country_name
+from pydanticcourse.formatters import format_iso_z, format_slash_date
+from pydanticcourse.timezones import make_utc
+from pydanticcourse.wire_formats import (
+    DateWireFormat,
+    parse_wire_date,
+    parse_wire_datetime,
+    to_wire,
+    wire_format,
+)
+
+T = TypeVar("T")
+
+
+def parse_datetime(value: Any) -> Any:
+    if isinstance(value, str):
+        # dateutil is slow to import, only pay for it once a string needs it
+        from dateutil.parser import parse
+
+        try:
+            return parse(value)
+        except Exception as ex:
+            raise ValueError(str(ex))
+    return value
+
+
+def dt_serializer(dt: datetime, info: FieldSerializationInfo) -> datetime | str | int:
+    if info.mode_is_json():
+        # context={"date_wire_format": "epoch_ms"} etc. -> integer on the wire
+        fmt = wire_format(info)
+        if fmt is not DateWireFormat.text:
+            return to_wire(dt, fmt)
+        return format_iso_z(dt)  # same as dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return dt
+
+
+def serialize_date(value: date, info: FieldSerializationInfo) -> str | int:
+    fmt = wire_format(info)
+    if fmt is not DateWireFormat.text:
+        return to_wire(value, fmt)
+    return format_slash_date(value)  # same as value.strftime("%Y/%m/%d")
+
+
+def sort_casefold(values: list[str]) -> list[str]:
+    return sorted(values, key=str.casefold)
+
+
+DateTimeUTC = Annotated[
+    datetime,
+    BeforeValidator(parse_datetime),
+    BeforeValidator(parse_wire_datetime),  # integer wire formats, see wire_formats.py
+    AfterValidator(make_utc),
+    PlainSerializer(dt_serializer, when_used="unless-none"),
+]
+
+CustomDate = Annotated[
+    datetime,
+    BeforeValidator(parse_wire_date),
+    PlainSerializer(serialize_date, when_used="json-unless-none"),
+]
+
+BoundedString = Annotated[str, Field(min_length=2, max_length=50)]
+BoundedList = Annotated[list[T], Field(min_length=1, max_length=5)]
+SortedStringList = Annotated[list[str], AfterValidator(sort_casefold)]
+Country = Annotated[str, AfterValidator(lookup_country_name)]
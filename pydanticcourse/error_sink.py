@@ -0,0 +1,382 @@
+"""
+Compact error collection for bulk validation
+
+On a dirty feed the usual `except ValidationError as ex: log(str(ex))`
+turns every failure into a long multi-line message (with a docs URL per
+error) that nobody reads until something looks wrong, and that can't be
+counted or grouped without parsing it again. ErrorSink keeps what's
+needed to find the problem and renders messages only when asked:
+
+    sink = ErrorSink()
+    cars = list(sink.validate(Automobile, rows))   # the rows that passed
+    sink.top_fields()          # [("doors", 1840), ("registrationDate", 77), ...]
+    sink.top_types()
+    sink.to_csv("errors.csv")  # or to_parquet() / to_dataframe()
+    sink.message(0)            # "Input should be a multiple of 2"
+
+Each error is one entry in a set of columns (see columns.py):
+- row: the row's index in the input
+- path: the error's location as the validator reports it - so with the
+  aliases the data uses ("doors", "registrationCountry", "fieldInt"),
+  "topFeatures.2" inside lists. Dictionary encoded.
+- type: pydantic's error type ("multiple_of", "missing"). Dictionary encoded.
+- message: pydantic's one line message, dictionary encoded (the same
+  few messages repeat across a feed)
+- input: the offending value, truncated to max_input characters
+
+Errors are read with ex.errors(include_url=False, include_context=False):
+the docs URLs are a good part of what str(ex) costs. pydantic-core
+renders each error's one line message in there anyway (there's no API
+without it), so it's kept once per distinct text instead of being
+formatted into a multi-line string per row. The readable report is put
+together from the columns only by messages() / message() / exports
+with messages=True.
+
+CPU-wise the sink costs about what str(ex) does, the exception and
+errors() are most of it. The difference is what's kept: ~30 bytes per
+error instead of a ~400 byte string per failed row, plus the
+aggregations for free.
+"""
+
+import csv
+import reprlib
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple, TypeVar
+
+import numpy as np
+from pydantic import BaseModel, ValidationError
+
+from pydanticcourse.columns import DictionaryColumn, GrowableArray, StringColumn
+
+M = TypeVar("M", bound=BaseModel)
+
+MAX_INPUT = 80
+_FLUSH_EVERY = 4096
+
+
+class RowError(NamedTuple):
+    row: int
+    path: str
+    type: str
+    input: str | None
+
+
+def format_path(loc: tuple[int | str, ...]) -> str:
+    return ".".join(map(str, loc))
+
+
+class ErrorSink:
+    def __init__(self, max_input: int = MAX_INPUT):
+        self.max_input = max_input
+        self._repr = reprlib.Repr()
+        self._repr.maxstring = self._repr.maxother = max_input
+        self._repr.maxlevel = 2
+        self.rows = GrowableArray(np.int64)
+        self.paths = DictionaryColumn()  # holds loc tuples
+        self.types = DictionaryColumn()
+        self.message_texts = DictionaryColumn()
+        self.inputs = StringColumn()
+        self.failed_rows = 0
+        # Appends go to lists first, NumPy columns grow in batches
+        self._pending: tuple[list, list, list, list, list] = ([], [], [], [], [])
+
+    def _input(self, value: Any) -> str | None:
+        if type(value) is str:
+            return value[: self.max_input]
+        if value is None:
+            return None
+        if isinstance(value, (int, float, bool)):
+            return repr(value)
+        return self._repr.repr(value)[: self.max_input]
+
+    def add(self, row: int, error: ValidationError) -> None:
+        rows, paths, types, messages, inputs = self._pending
+        encode_path = self.paths.encode
+        encode_type = self.types.encode
+        encode_message = self.message_texts.encode
+        to_input = self._input
+        for item in error.errors(include_url=False, include_context=False):
+            error_type = item["type"]
+            rows.append(row)
+            paths.append(encode_path(item["loc"]))
+            types.append(encode_type(error_type))
+            messages.append(encode_message(item["msg"]))
+            # "missing" reports the whole row as its input - not worth keeping
+            inputs.append(None if error_type == "missing" else to_input(item["input"]))
+        self.failed_rows += 1
+        if len(rows) >= _FLUSH_EVERY:
+            self._flush()
+
+    def _flush(self) -> None:
+        rows, paths, types, messages, inputs = self._pending
+        if not rows:
+            return
+        self.rows.extend(rows)
+        self.paths.codes.extend(paths)
+        self.types.codes.extend(types)
+        self.message_texts.codes.extend(messages)
+        self.inputs.extend(inputs)
+        self._pending = ([], [], [], [], [])
+
+    def validate(
+        self,
+        model: type[M],
+        rows: Iterable[Any],
+        *,
+        start: int = 0,
+        context: dict[str, Any] | None = None,
+    ) -> Iterator[M]:
+        # The rows that validate, the others go in the sink. bytes / str
+        # rows are validated as JSON.
+        add = self.add
+        validate = model.model_validate
+        validate_json = model.model_validate_json
+        for index, row in enumerate(rows, start):
+            try:
+                if isinstance(row, (str, bytes, bytearray)):
+                    yield validate_json(row, context=context)
+                else:
+                    yield validate(row, context=context)
+            except ValidationError as ex:
+                add(index, ex)
+
+    def __len__(self) -> int:
+        return self.rows.size + len(self._pending[0])
+
+    def __iter__(self) -> Iterator[RowError]:
+        self._flush()
+        rows = self.rows.values
+        paths, path_codes = self.paths.values, self.paths.codes.values
+        types, type_codes = self.types.values, self.types.codes.values
+        for i in range(len(rows)):
+            yield RowError(
+                int(rows[i]),
+                format_path(paths[path_codes[i]]),
+                types[type_codes[i]],
+                self.inputs[i],
+            )
+
+    def _position(self, i: int) -> int:
+        # Like a list index: negative counts from the end
+        self._flush()
+        size = self.rows.size
+        if i < 0:
+            i += size
+        if not 0 <= i < size:
+            raise IndexError(f"error index out of range ({size} errors)")
+        return i
+
+    def __getitem__(self, i: int) -> RowError:
+        i = self._position(i)
+        return RowError(
+            int(self.rows.values[i]),
+            format_path(self.paths[i]),
+            self.types[i],
+            self.inputs[i],
+        )
+
+    def message(self, i: int) -> str:
+        return self.message_texts[self._position(i)]
+
+    def messages(self, limit: int | None = None) -> Iterator[str]:
+        # "row 12, doors: Input should be a multiple of 2"
+        self._flush()
+        count = len(self) if limit is None else min(limit, len(self))
+        for i in range(count):
+            error = self[i]
+            yield f"row {error.row}, {error.path}: {self.message(i)}"
+
+    def _top(self, column: DictionaryColumn, n: int, label) -> list[tuple[Any, int]]:
+        self._flush()
+        counts = np.bincount(column.codes.values, minlength=len(column.values))
+        order = np.argsort(counts, kind="stable")[::-1][:n]
+        return [(label(column.values[code]), int(counts[code])) for code in order if counts[code]]
+
+    def top_fields(self, n: int = 10) -> list[tuple[str, int]]:
+        return self._top(self.paths, n, format_path)
+
+    def top_types(self, n: int = 10) -> list[tuple[str, int]]:
+        return self._top(self.types, n, str)
+
+    def counts(self) -> dict[tuple[str, str], int]:
+        # (path, type) -> number of errors
+        self._flush()
+        width = max(len(self.types.values), 1)
+        pairs = self.paths.codes.values.astype(np.int64) * width + self.types.codes.values
+        codes, counts = np.unique(pairs, return_counts=True)
+        paths, types = self.paths.values, self.types.values
+        return {
+            (format_path(paths[code // width]), types[code % width]): int(count)
+            for code, count in zip(codes, counts)
+        }
+
+    @property
+    def nbytes(self) -> int:
+        # The columns (the distinct paths / types / messages not counted)
+        self._flush()
+        return (
+            self.rows.size * 8
+            + self.paths.codes.size * 4
+            + self.types.codes.size * 4
+            + self.message_texts.codes.size * 4
+            + len(self.inputs.data)
+            + self.inputs.offsets.size * 8
+            + self.inputs.present.size
+        )
+
+    def columns(self, messages: bool = False) -> dict[str, list[Any]]:
+        self._flush()
+        paths = [format_path(loc) for loc in self.paths.values]
+        data = {
+            "row": self.rows.values.tolist(),
+            "path": [paths[code] for code in self.paths.codes.values],
+            "type": [self.types.values[code] for code in self.types.codes.values],
+            "input": [self.inputs[i] for i in range(len(self))],
+        }
+        if messages:
+            texts = self.message_texts.values
+            data["message"] = [texts[code] for code in self.message_texts.codes.values]
+        return data
+
+    def to_csv(self, path: str, messages: bool = False) -> None:
+        data = self.columns(messages)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(data)
+            writer.writerows(zip(*data.values()))
+
+    def to_dataframe(self, messages: bool = False):
+        import pandas as pd
+
+        data = self.columns(messages)
+        frame = pd.DataFrame(data)
+        for name in ("path", "type"):
+            frame[name] = frame[name].astype("category")
+        return frame
+
+    def to_arrow(self, messages: bool = False):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(
+                "to_arrow() / to_parquet() need pyarrow: pip install 'pydanticcourse[arrow]'"
+            ) from None
+        self._flush()
+        # The dictionary columns go across as they are, no per row strings
+        table = {
+            "row": pa.array(self.rows.values),
+            "path": pa.DictionaryArray.from_arrays(
+                pa.array(self.paths.codes.values),
+                pa.array([format_path(loc) for loc in self.paths.values], pa.string()),
+            ),
+            "type": pa.DictionaryArray.from_arrays(
+                pa.array(self.types.codes.values), pa.array(self.types.values, pa.string())
+            ),
+            "input": pa.array([self.inputs[i] for i in range(len(self))], pa.string()),
+        }
+        if messages:
+            table["message"] = pa.DictionaryArray.from_arrays(
+                pa.array(self.message_texts.codes.values),
+                pa.array(self.message_texts.values, pa.string()),
+            )
+        return pa.table(table)
+
+    def to_parquet(self, path: str, messages: bool = False) -> None:
+        table = self.to_arrow(messages)
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path)
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    import time
+
+    from pydanticcourse.automobiles import Automobile
+    from pydanticcourse.estimates import DataFrameSchema, Estimate
+    from pydanticcourse.samples import api_data
+
+    random.seed(5)
+    faults = [
+        {"doors": 3},
+        {"registrationDate": "sometime"},
+        {"vin": "x"},
+        {"msrpUSD": "a lot"},
+        {"topFeatures": ["ok", "x"]},
+        {"completionDate": "1975-01-01"},
+    ]
+    n = 20_000
+    rows = []
+    for i in range(n):
+        row = {**api_data, "vin": f"VIN{i:08d}"}
+        if random.random() < 0.3:  # a dirty feed
+            for fault in random.sample(faults, random.randint(1, 3)):
+                row.update(fault)
+        if random.random() < 0.02:
+            del row["manufacturer"]
+        rows.append(row)
+
+    sink = ErrorSink()
+    valid = list(sink.validate(Automobile, rows))
+    print(f"{len(valid)} valid, {sink.failed_rows} failed rows, {len(sink)} errors")
+    print("top fields:", sink.top_fields(5))
+    print("top types: ", sink.top_types(3))
+    for line in sink.messages(3):
+        print("   ", line)
+
+    # Aliases as the data spells them
+    estimates = ErrorSink()
+    list(estimates.validate(Estimate, [{"area": "Texas", "july_1_2001": "n/a",
+                                        "july_1_2000": "1", "april_1_2000": "2"}]))
+    frames = ErrorSink()
+    list(frames.validate(DataFrameSchema, [{"fieldBool": True, "fieldStr": "a",
+                                            "fieldInt": 3, "fieldFloat": 1.0}]))
+    print(list(estimates.messages()), list(frames.messages()))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sink.to_csv(os.path.join(tmp, "errors.csv"), messages=True)
+        with open(os.path.join(tmp, "errors.csv")) as f:
+            print("".join(f.readlines()[:3]), end="")
+        try:
+            sink.to_parquet(os.path.join(tmp, "errors.parquet"), messages=True)
+            print(f"parquet: {os.path.getsize(os.path.join(tmp, 'errors.parquet'))} bytes")
+        except ImportError as ex:
+            print(ex)
+    assert sink.to_dataframe()["path"].value_counts().iloc[0] == sink.top_fields(1)[0][1]
+
+    def with_strings() -> list[str]:
+        messages = []
+        for index, row in enumerate(rows):
+            try:
+                Automobile.model_validate(row)
+            except ValidationError as ex:
+                messages.append(f"row {index}: {ex}")
+        return messages
+
+    def with_sink() -> ErrorSink:
+        errors = ErrorSink()
+        for _ in errors.validate(Automobile, rows):
+            pass
+        return errors
+
+    def valid_only() -> None:
+        for row in valid_rows:
+            Automobile.model_validate(row)
+
+    valid_vins = {car.vin for car in valid}
+    valid_rows = [row for row in rows if row["vin"] in valid_vins]
+    for label, run in (
+        ("only the valid rows", valid_only),
+        ("every row, str(ex) per bad row", with_strings),
+        ("every row, ErrorSink", with_sink),
+    ):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:<32} {best * 1e3:.0f}ms")
+    kept = sum(len(message) for message in with_strings())
+    print(f"kept: {kept / 1e6:.1f} MB of strings vs {with_sink().nbytes / 1e6:.2f} MB of columns")
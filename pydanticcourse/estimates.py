@@ -0,0 +1,66 @@
+"""
+CSV ingestion models
+
+Since CSV doesnt have datatypes built in we use Pydantic to coerce the data
+into types. For dataframes we use pandantic - pandas and pandantic are only
+imported when a dataframe is actually validated.
+"""
+
+import csv
+from typing import Annotated, Iterator
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, field_validator
+
+ESTIMATE_FIELDS = ["area", "july_1_2001", "july_1_2000", "april_1_2000"]
+
+
+def name_int(value: str):
+    try:
+        return int(value.strip().replace(",", "").replace("\t", ""))
+    except Exception as ex:
+        raise ValueError(f"data could be parsed into a valid integer {str(ex)}")
+
+
+IntChecker = Annotated[int, BeforeValidator(name_int)]
+
+
+class Estimate(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
+    area: str
+    july_1_2001: IntChecker
+    july_1_2000: IntChecker
+    april_1_2000: IntChecker
+
+
+def validate_estimates(path: str, delimiter: str = "\t") -> Iterator[Estimate]:
+    with open(path, newline="") as f:
+        data = csv.DictReader(f, fieldnames=ESTIMATE_FIELDS, delimiter=delimiter)
+        next(data)  # skip header row
+        for row in data:
+            yield Estimate.model_validate(row)
+
+
+class DataFrameSchema(BaseModel):
+    """Example schema for testing."""
+
+    model_config = ConfigDict(defer_build=True)
+
+    field_bool: bool = Field(alias="fieldBool")
+    field_str: str = Field(alias="fieldStr")
+    field_int: int = Field(alias="fieldInt")
+    field_float: float = Field(alias="fieldFloat")
+
+    @field_validator("field_int")
+    def must_be_even(cls, value: int) -> int:
+        if value % 2 != 0:
+            raise ValueError("Number must be even")
+        return value
+
+
+def validate_dataframe(path: str, errors: str = "raise", sep: str = "\t"):
+    import pandas as pd
+    from pandantic import Pandantic
+
+    df = pd.read_csv(path, sep=sep)
+    return Pandantic(schema=DataFrameSchema).validate(dataframe=df, errors=errors)
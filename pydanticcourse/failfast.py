@@ -0,0 +1,454 @@
+"""
+Fail-fast validation for rejecting junk input early
+
+model_validate checks every field and collects every error, which is what
+you want for a form and a waste on a feed where a third of the records
+are garbage: a record with a bad door count still gets its dates parsed,
+its country looked up and its features checked, only to be thrown away.
+FailFast puts a screen in front of the model that stops at the first
+problem:
+
+    gate = FailFast(Automobile).calibrate(sample)  # cheapest, most telling checks
+    car = gate.model_validate(record)     # ValidationError with ONE error
+    cars = list(ErrorSink().validate(gate, rows))   # works where a model does
+
+The screen is a list of checks run one at a time on the record, each a
+SchemaValidator for a typed dict with one field, built from the field's
+own core schema and the model's config. pydantic-core finds the key the
+way the model does (aliases, AliasChoices, populate_by_name) and reports
+"missing" for required fields, BoundedString's lengths, doors'
+ge/le/multiple_of, the country lookup and the wire date parsing run
+exactly as in the model, and the ValidationError comes out with the
+model's title and the input key in loc. Lists stop at their first bad
+item (fail_fast). With extra="forbid" there's one more check for keys
+the model doesn't know. The first failing check ends the record.
+
+A record that gets through the screen is validated by the model itself,
+so what's accepted is exactly what model_validate accepts, cross-field
+checks and model validators included. A rejection reports an error the
+model would have reported too, just the first one instead of all.
+
+Cross-field checks: a @field_validator that takes ValidationInfo may
+read info.data (DependencyModel's "c" reads the validated "b"), which only
+exists inside the model, so the screen never runs those. mode="after"
+ones are peeled off and the field's own type is still screened; before /
+wrap / plain ones take the field out of the screen. The model runs them
+in declaration order as usual. A model with a before / wrap
+model_validator gets no screen at all (its fields don't see the raw
+input). Telling which validators take ValidationInfo uses a pydantic
+internal; on a pydantic version it wasn't checked against (see
+core_schemas.py) every field validator is treated as one that does.
+
+Until calibrate() there is no screen: the gate validates with the model
+alone, errors and all. Every check in declaration order is slower than
+the bare model both ways (on python -m pydanticcourse.failfast's feed:
+83k vs 112k rejections/s, 46k vs 110k accepts/s), so it isn't a useful
+default. calibrate() times every check and the model on a sample of the
+feed, orders the checks by cost per rejection (time spent / rows caught,
+cheap checks that catch a lot first) and keeps the prefix of that order
+that makes the whole sample cheapest - a check that rarely fails or costs
+more than the model's own rejection only slows down the good records.
+goal="rejections" keeps every check that caught something in the sample
+instead: the fastest rejections, paid for by the good records. Checks
+that never failed in the sample are left to the model either way.
+report() shows the numbers.
+
+The trade: a good record pays the screen on top of model_validate, a bad
+one costs a few field checks instead of a full validation. Worth it on
+dirty feeds, not on clean ones. JSON rows are parsed with pydantic-core's
+from_json and screened as Python data (strict models skip the screen for
+JSON, strict JSON and strict Python accept different things).
+"""
+
+import time
+from typing import Any, Generic, Iterable, Literal, NamedTuple, TypeVar
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import SchemaValidator, from_json
+
+from pydanticcourse.core_schemas import TESTED_PYDANTIC, core_config, pydantic_version
+
+if pydantic_version() == TESTED_PYDANTIC:
+    from pydantic._internal._decorators import inspect_validator
+else:
+    inspect_validator = None
+
+M = TypeVar("M", bound=BaseModel)
+
+EXTRA_KEYS = "(extra keys)"
+MODEL = "(model)"  # calibrate()'s timing of model_validate
+
+_FUNCTIONS = ("function-before", "function-after", "function-wrap", "function-plain")
+_SEQUENCES = ("list", "tuple", "set", "frozenset")
+
+
+class _Check(NamedTuple):
+    name: str  # the field, or EXTRA_KEYS
+    validator: SchemaValidator
+
+
+class CheckStats:
+    __slots__ = ("calls", "failures", "seconds", "failure_seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.seconds = 0.0
+        self.failure_seconds = 0.0  # spent on the calls that failed
+
+
+def _model_fields_schema(model: type[BaseModel]) -> tuple[dict | None, list]:
+    # The model-fields schema (None if the fields don't see the raw input)
+    # and the definitions the field schemas may refer to
+    schema = model.__pydantic_core_schema__
+    definitions = []
+    if schema["type"] == "definitions":
+        definitions = schema["definitions"]
+        schema = schema["schema"]
+    while schema["type"] == "function-after":  # mode="after" model validators
+        schema = schema["schema"]
+    if schema["type"] != "model":
+        return None, definitions
+    schema = schema["schema"]
+    if schema["type"] != "model-fields":  # before / wrap model validators
+        return None, definitions
+    return schema, definitions
+
+
+def _uses(schema: Any, functions: list) -> bool:
+    # Does the schema call one of the functions anywhere?
+    if isinstance(schema, list):
+        return any(_uses(item, functions) for item in schema)
+    if not isinstance(schema, dict):
+        return False
+    function = schema.get("function")
+    if schema.get("type") in _FUNCTIONS and isinstance(function, dict):
+        if function["function"] in functions:
+            return True
+    return any(_uses(value, functions) for key, value in schema.items() if key != "function")
+
+
+def _fail_fast(schema: Any) -> Any:
+    # A copy of the schema where lists / tuples / sets stop at their first
+    # bad item too
+    if isinstance(schema, list):
+        return [_fail_fast(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    copy = {key: _fail_fast(value) for key, value in schema.items()}
+    if copy.get("type") in _SEQUENCES:
+        copy["fail_fast"] = True
+    return copy
+
+
+def _typed_dict_field(field: dict[str, Any], schema: dict[str, Any]) -> dict[str, Any]:
+    required = schema["type"] != "default"
+    if not required:
+        # A missing key is left out, the model applies the default
+        schema = schema["schema"]
+    typed = {"type": "typed-dict-field", "schema": schema, "required": required}
+    if "validation_alias" in field:
+        typed["validation_alias"] = field["validation_alias"]
+    return typed
+
+
+class FailFast(Generic[M]):
+    def __init__(self, model: type[M], *, context: dict[str, Any] | None = None):
+        self.model = model
+        self._wire_context = getattr(model, "_wire_context", None)
+        self.context = self._wire_context(context) if self._wire_context is not None else context
+        model.model_rebuild()  # defer_build models have no schema until first use
+        self.strict = bool(model.model_config.get("strict"))
+        self.checks = self._plan()
+        # The screen in the order it runs, empty (just the model) until
+        # calibrate()
+        self.order: list[_Check] = []
+        self.stats: dict[str, CheckStats] = {}
+
+    def _plan(self) -> list[_Check]:
+        model = self.model
+        fields_schema, definitions = _model_fields_schema(model)
+        if fields_schema is None:
+            return []
+        config = core_config(model)
+
+        def check(name: str, fields: dict[str, Any], extra: str = "ignore") -> _Check:
+            schema = {"type": "typed-dict", "fields": fields, "extra_behavior": extra}
+            if definitions:
+                schema = {"type": "definitions", "schema": schema, "definitions": definitions}
+            return _Check(name, SchemaValidator(schema, config))
+
+        checks = []
+        if fields_schema.get("extra_behavior", config.get("extra_fields_behavior")) == "forbid":
+            anything = {"type": "default", "schema": {"type": "any"}}
+            fields = {
+                name: _typed_dict_field(field, anything)
+                for name, field in fields_schema["fields"].items()
+            }
+            checks.append(check(EXTRA_KEYS, fields, "forbid"))
+        # Validators that get ValidationInfo may read info.data
+        dependent = [
+            decorator.func
+            for decorator in model.__pydantic_decorators__.field_validators.values()
+            if inspect_validator is None or inspect_validator(decorator.func, decorator.info.mode)
+        ]
+        for name, field in fields_schema["fields"].items():
+            schema = field["schema"]
+            inner = schema["schema"] if schema["type"] == "default" else schema
+            while inner["type"] == "function-after" and inner["function"]["function"] in dependent:
+                inner = inner["schema"]
+            if dependent and _uses(inner, dependent):
+                continue
+            schema = {**schema, "schema": inner} if schema["type"] == "default" else inner
+            checks.append(check(name, {name: _typed_dict_field(field, _fail_fast(schema))}))
+        return checks
+
+    def _context(self, context: Any | None) -> Any | None:
+        # The model's default wire format, as model_validate would add it
+        if context is None:
+            return self.context
+        return self._wire_context(context) if self._wire_context is not None else context
+
+    def first_error(self, data: Any, context: Any | None = None) -> ValidationError | None:
+        # What stops the record, None if the screen passes it (non-dict input
+        # is left to the model)
+        if not isinstance(data, dict):
+            return None
+        context = self._context(context)
+        for check in self.order:
+            try:
+                check.validator.validate_python(data, context=context)
+            except ValidationError as ex:
+                return ex
+        return None
+
+    def model_validate(self, obj: Any, *, context: Any | None = None) -> M:
+        context = self._context(context)
+        if isinstance(obj, dict):
+            for check in self.order:
+                check.validator.validate_python(obj, context=context)
+        return self.model.model_validate(obj, context=context)
+
+    def model_validate_json(
+        self, json_data: str | bytes | bytearray, *, context: Any | None = None
+    ) -> M:
+        if self.strict:
+            return self.model.model_validate_json(json_data, context=context)
+        try:
+            data = from_json(json_data)
+        except ValueError:
+            # Not JSON at all, let the model say so
+            return self.model.model_validate_json(json_data, context=context)
+        return self.model_validate(data, context=context)
+
+    def calibrate(
+        self, sample: Iterable[Any], goal: Literal["feed", "rejections"] = "feed"
+    ) -> "FailFast[M]":
+        perf_counter = time.perf_counter
+        context = self.context
+        rows = [row for row in sample if isinstance(row, dict)]
+        if not rows:
+            raise ValueError("calibrate() needs a sample of dict records")
+        self.stats = {}
+        validators = [(check.name, check.validator.validate_python) for check in self.checks]
+        validators.append((MODEL, self.model.model_validate))
+        # Per check and row: seconds (best of two, the first pass warms up
+        # caches) and whether the row failed
+        timings: dict[str, list[tuple[float, bool]]] = {}
+        for name, validate in validators:
+            stats = self.stats[name] = CheckStats()
+            timing = timings[name] = []
+            for row in rows:
+                best = float("inf")
+                for _ in range(2):
+                    start = perf_counter()
+                    try:
+                        validate(row, context=context)
+                        failed = False
+                    except ValidationError:
+                        failed = True
+                    best = min(best, perf_counter() - start)
+                timing.append((best, failed))
+            stats.calls = len(rows)
+            stats.failures = sum(failed for _, failed in timing)
+            stats.seconds = sum(seconds for seconds, _ in timing)
+            stats.failure_seconds = sum(seconds for seconds, failed in timing if failed)
+
+        def cost_per_rejection(check: _Check) -> float:
+            stats = self.stats[check.name]
+            return stats.seconds / stats.failures if stats.failures else float("inf")
+
+        order = [
+            check
+            for check in sorted(self.checks, key=cost_per_rejection)
+            if self.stats[check.name].failures
+        ]
+        if goal == "feed":
+            # The sample's total time with the first k checks as the screen,
+            # for every k; the cheapest k wins
+            def sample_seconds(screen: list[_Check]) -> float:
+                total = 0.0
+                for i in range(len(rows)):
+                    for check in screen:
+                        seconds, failed = timings[check.name][i]
+                        total += seconds
+                        if failed:
+                            break
+                    else:
+                        total += timings[MODEL][i][0]
+                return total
+
+            best = min(range(len(order) + 1), key=lambda k: sample_seconds(order[:k]))
+            order = order[:best]
+        self.order = order
+        return self
+
+    def report(self) -> str:
+        screened = {check.name for check in self.order}
+        lines = [
+            f"{'check':<22}{'calls':>8}{'failures':>10}{'us/call':>9}"
+            f"{'us/rejection':>14}  screened"
+        ]
+        for name in [check.name for check in self.checks] + [MODEL]:
+            stats = self.stats.get(name) or CheckStats()
+            per_call = stats.seconds / stats.calls * 1e6 if stats.calls else 0.0
+            # A check's cost per row it catches, the model's per row it rejects
+            spent = stats.failure_seconds if name == MODEL else stats.seconds
+            per_rejection = spent / stats.failures * 1e6 if stats.failures else 0.0
+            lines.append(
+                f"{name:<22}{stats.calls:>8}{stats.failures:>10}{per_call:>9.2f}"
+                f"{per_rejection:>14.2f}  {'yes' if name in screened else ''}"
+            )
+        lines.append("screen order: " + ", ".join(check.name for check in self.order))
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import random
+
+    from pydantic import ValidationInfo, field_validator
+
+    from pydanticcourse.automobiles import Automobile
+    from pydanticcourse.error_sink import ErrorSink
+    from pydanticcourse.samples import api_data
+
+    # The lesson's DependencyModel (custom_validatprs.py): "c" reads the
+    # validated "b", so the screen must leave that validator to the model
+    class DependencyModel(BaseModel):
+        a: int
+        b: list[int]
+        c: str
+        d: str
+
+        @field_validator("c")
+        @classmethod
+        def validator(cls, value: str, validated_values: ValidationInfo) -> str:
+            return f"list is {len(validated_values.data['b'])}"
+
+    good_row = {"a": 1, "b": [1, 2, 3], "c": "hello", "d": "goodbye"}
+    bad_row = {"a": "x", "b": "nope", "c": 1, "d": 2}
+    gate = FailFast(DependencyModel).calibrate([good_row, bad_row], goal="rejections")
+    assert [check.name for check in gate.checks] == ["a", "b", "c", "d"]
+    print(gate.model_validate(good_row))
+    try:
+        gate.model_validate(bad_row)
+    except ValidationError as ex:
+        assert ex.error_count() == 1 and ex.errors()[0]["loc"][0] in "abcd"
+
+    random.seed(7)
+    junk = [
+        {"vin": None},
+        {"doors": 3},
+        {"doors": 6},
+        {"completionDate": "1975/01/01"},
+        {"manufacturer": "X"},
+        {"topFeatures": []},
+        {"registrationCountry": "Atlantis"},
+        {"msrpUSD": "call us"},
+        {"type": "Hovercraft"},
+        {"wheels": 4},
+    ]
+
+    def record(i: int) -> dict[str, Any]:
+        row = {**api_data, "vin": f"VIN{i:08d}"}
+        if random.random() < 0.3:
+            row.update(random.choice(junk))
+            if row.get("vin") is None:
+                del row["vin"]
+        return row
+
+    feed = [record(i) for i in range(20_000)]
+
+    # Same verdicts as the model, and the one error is one of the model's.
+    # Uncalibrated, the gate is just the model.
+    gate = FailFast(Automobile)
+    calibrated = FailFast(Automobile).calibrate(feed[:2000])
+    every_check = FailFast(Automobile).calibrate(feed[:2000], goal="rejections")
+    for row in feed[:3000]:
+        try:
+            expected = Automobile.model_validate(row)
+        except ValidationError as ex:
+            full = {(e["type"], e["loc"]) for e in ex.errors()}
+            try:
+                gate.model_validate(row)
+            except ValidationError as same:
+                assert {(e["type"], e["loc"]) for e in same.errors()} == full
+            else:
+                raise AssertionError("accepted a record the model rejects")
+            for screen in (calibrated, every_check):
+                try:
+                    screen.model_validate(row)
+                except ValidationError as first:
+                    assert first.error_count() == 1
+                    error = first.errors()[0]
+                    assert (error["type"], error["loc"]) in full, (error, full)
+                else:
+                    raise AssertionError("accepted a record the model rejects")
+        else:
+            assert gate.model_validate(row).vin == expected.vin
+            assert calibrated.model_validate(row).vin == expected.vin
+            assert every_check.model_validate(row).vin == expected.vin
+    print("same accept / reject as Automobile.model_validate, one error per rejection")
+    print(every_check.report())
+    print('goal="feed" keeps:', ", ".join(check.name for check in calibrated.order))
+
+    def best_of(run, repeat: int = 3) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def valid(row: dict[str, Any]) -> bool:
+        try:
+            Automobile.model_validate(row)
+        except ValidationError:
+            return False
+        return True
+
+    bad = [row for row in feed if not valid(row)]
+    good = [row for row in feed if valid(row)]
+    print(f"\n{len(bad)} of {len(feed)} records are junk")
+    for label, validator in (
+        ("Automobile", Automobile),
+        ("FailFast()", gate),
+        ("goal=\"feed\"", calibrated),
+        ("goal=\"rejections\"", every_check),
+    ):
+
+        def reject_all() -> None:
+            for row in bad:
+                try:
+                    validator.model_validate(row)
+                except ValidationError:
+                    pass
+
+        rejecting = best_of(reject_all)
+        accepting = best_of(lambda: [validator.model_validate(row) for row in good])
+        feed_time = best_of(lambda: list(ErrorSink().validate(validator, feed)))
+        print(
+            f"{label:<20} rejects {len(bad) / rejecting:>9,.0f}/s"
+            f"  accepts {len(good) / accepting:>8,.0f}/s"
+            f"  whole feed into an ErrorSink {feed_time * 1e3:5.0f}ms"
+        )
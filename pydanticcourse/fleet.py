@@ -0,0 +1,334 @@
+"""
+Columnar (struct of arrays) storage for validated Automobile records
+
+A validated Automobile is a pydantic object with a __dict__, a UUID, two
+datetimes, a list and a handful of strings - well over a kilobyte each.
+FleetStore keeps the same data as columns:
+
+    base_msrp_usd, number_of_doors, is_electric   -> NumPy arrays
+    manufactured_date, registration_date          -> datetime64[us] (NaT = None)
+    manufacturer, series_name, type_,
+    registration_country, top_features            -> dictionary encoded, an int
+                                                     code per row (-1 = None)
+    vin, license_plate                            -> one UTF-8 buffer + offsets
+    id_                                           -> 16 bytes per row
+
+    store = FleetStore()
+    store.extend(cars)                  # models are validated already
+    store[0]                            # an Automobile again, on demand
+
+    electric_convertibles = store.where(is_electric=True, type_="Convertible")
+    store.group_by("registration_country", mask=electric_convertibles)
+    # {CountryInfo(name='Germany', code3='DEU'): 93300.0, ...}
+
+Queries are NumPy scans over the code / value arrays, nothing is rebuilt.
+
+Datetimes are stored as UTC wall time: an aware manufactured / registration
+date comes back as the naive UTC equivalent (the project's convention for
+naive datetimes, see timezones.py).
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Iterable, Iterator
+from uuid import UUID
+
+import numpy as np
+
+from pydanticcourse.automobiles import Automobile, AutomobileType
+from pydanticcourse.columns import DictionaryColumn, GrowableArray, ListColumn, StringColumn
+from pydanticcourse.countries import CountryInfo, country_by_code3, lookup_country
+from pydanticcourse.timezones import make_utc
+
+_NAT = np.datetime64("NaT", "us")
+
+
+def _to_datetime64(value: datetime | None) -> np.datetime64:
+    if value is None:
+        return _NAT
+    if value.tzinfo is not None:
+        value = make_utc(value).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+def _from_datetime64(value: np.datetime64) -> datetime | None:
+    if np.isnat(value):
+        return None
+    return value.item()
+
+
+# Which column type holds each Automobile field
+_DICTIONARY_FIELDS = ("manufacturer", "series_name", "type_", "registration_country")
+_STRING_FIELDS = ("vin", "license_plate")
+_NUMERIC_FIELDS = {
+    "base_msrp_usd": np.float64,
+    "number_of_doors": np.int8,
+    "is_electric": np.bool_,
+}
+_DATE_FIELDS = ("manufactured_date", "registration_date")
+_FIELDS = (
+    "id_",
+    *_DICTIONARY_FIELDS,
+    *_STRING_FIELDS,
+    *_NUMERIC_FIELDS,
+    *_DATE_FIELDS,
+    "top_features",
+)
+
+if set(_FIELDS) != set(Automobile.model_fields):
+    # Automobile gained / lost a field - the store has to learn about it
+    raise RuntimeError(
+        f"FleetStore columns {sorted(_FIELDS)} don't match Automobile fields"
+        f" {sorted(Automobile.model_fields)}"
+    )
+
+
+class FleetStore:
+    def __init__(self, models: Iterable[Automobile] = ()):
+        self._size = 0
+        self.dictionaries = {name: DictionaryColumn() for name in _DICTIONARY_FIELDS}
+        self.strings = {name: StringColumn() for name in _STRING_FIELDS}
+        self.numbers = {name: GrowableArray(dtype) for name, dtype in _NUMERIC_FIELDS.items()}
+        self.dates = {name: GrowableArray("datetime64[us]") for name in _DATE_FIELDS}
+        self.top_features = ListColumn()
+        self._ids = GrowableArray(np.uint8, (16,))
+        self._has_id = GrowableArray(np.bool_)
+        self.extend(models)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, model: Automobile) -> None:
+        self.extend((model,))
+
+    def extend(self, models: Iterable[Automobile]) -> None:
+        # Column at a time: gather a batch of Python values per field, then
+        # one NumPy copy per column
+        batch = list(models)
+        if not batch:
+            return
+        try:
+            self._extend_columns(batch)
+        except BaseException:
+            # All or nothing: a bad model midway through the batch mustn't
+            # leave the columns it already reached one row longer
+            self._truncate(self._size)
+            raise
+        self._size += len(batch)
+
+    def _extend_columns(self, batch: list[Automobile]) -> None:
+        for name, column in self.dictionaries.items():
+            column.extend([getattr(m, name) for m in batch])
+        for name, column in self.strings.items():
+            column.extend([getattr(m, name) for m in batch])
+        for name, column in self.numbers.items():
+            column.extend([getattr(m, name) for m in batch])
+        for name, column in self.dates.items():
+            column.extend([_to_datetime64(getattr(m, name)) for m in batch])
+        self.top_features.extend([m.top_features for m in batch])
+        ids = [m.id_ for m in batch]
+        raw = b"".join(b"\0" * 16 if i is None else i.bytes for i in ids)
+        self._ids.extend(np.frombuffer(raw, dtype=np.uint8).reshape(-1, 16))
+        self._has_id.extend([i is not None for i in ids])
+
+    def _truncate(self, rows: int) -> None:
+        for column in (
+            *self.dictionaries.values(),
+            *self.strings.values(),
+            *self.numbers.values(),
+            *self.dates.values(),
+            self.top_features,
+            self._ids,
+            self._has_id,
+        ):
+            column.truncate(rows)
+
+    # Rebuilding models
+
+    def __getitem__(self, row: int) -> Automobile:
+        if row < 0:
+            row += self._size
+        if not 0 <= row < self._size:
+            raise IndexError("FleetStore index out of range")
+        values: dict[str, Any] = {
+            "id_": UUID(bytes=self._ids.data[row].tobytes())
+            if self._has_id.data[row]
+            else None,
+            "top_features": self.top_features[row],
+        }
+        for name, column in self.dictionaries.items():
+            values[name] = column[row]
+        for name, column in self.strings.items():
+            values[name] = column[row]
+        for name, column in self.numbers.items():
+            values[name] = column.data[row].item()
+        for name, column in self.dates.items():
+            values[name] = _from_datetime64(column.data[row])
+        # Everything in here passed validation on the way in
+        return Automobile.model_construct(**values)
+
+    def __iter__(self) -> Iterator[Automobile]:
+        return self.models()
+
+    def models(self, rows: np.ndarray | Iterable[int] | None = None) -> Iterator[Automobile]:
+        # rows: indexes, or a boolean mask from where()
+        if rows is None:
+            rows = range(self._size)
+        elif isinstance(rows, np.ndarray) and rows.dtype == np.bool_:
+            rows = np.flatnonzero(rows)
+        for row in rows:
+            yield self[int(row)]
+
+    # Columns and queries
+
+    def column(self, name: str) -> np.ndarray:
+        # Values for numeric / date fields, codes for dictionary fields
+        if name in self.numbers:
+            return self.numbers[name].values
+        if name in self.dates:
+            return self.dates[name].values
+        if name in self.dictionaries:
+            return self.dictionaries[name].codes.values
+        raise KeyError(f"{name!r} isn't a numeric, date or dictionary column")
+
+    def _normalize(self, name: str, value: Any) -> Any:
+        # Let callers say type_="Convertible" or registration_country="us"
+        if name == "type_" and not isinstance(value, Enum) and value is not None:
+            return AutomobileType(value)
+        if name == "registration_country" and isinstance(value, str):
+            return country_by_code3(lookup_country(value)[1])
+        return value
+
+    def where(self, **conditions: Any) -> np.ndarray:
+        # Equality on any numeric / dictionary column, a list / tuple / set
+        # means "any of". Returns a boolean mask.
+        mask = np.ones(self._size, dtype=np.bool_)
+        for name, wanted in conditions.items():
+            many = isinstance(wanted, (list, tuple, set, frozenset))
+            wanted = [self._normalize(name, w) for w in wanted] if many else [
+                self._normalize(name, wanted)
+            ]
+            if name in self.dictionaries:
+                column = self.dictionaries[name]
+                codes = [column.code_of(w) for w in wanted]
+                mask &= np.isin(column.codes.values, codes)
+            else:
+                mask &= np.isin(self.column(name), wanted)
+        return mask
+
+    def group_by(
+        self,
+        by: str,
+        value: str = "base_msrp_usd",
+        agg: str = "mean",
+        mask: np.ndarray | None = None,
+    ) -> dict[Any, float]:
+        # agg: "mean", "sum" or "count". Rows where `by` is None are skipped.
+        if agg not in ("mean", "sum", "count"):
+            raise ValueError(f"agg should be 'mean', 'sum' or 'count', not {agg!r}")
+        if by in self.dictionaries:
+            labels = self.dictionaries[by].values
+            keys = self.dictionaries[by].codes.values
+        else:
+            column = self.column(by)
+            labels, keys = np.unique(column, return_inverse=True)
+            labels = labels.tolist()
+            if by in self.dates:
+                keys = np.where(np.isnat(column), -1, keys)  # NaT is None
+        values = self.column(value).astype(np.float64)
+        if mask is not None:
+            keys, values = keys[mask], values[mask]
+        valid = keys >= 0
+        keys, values = keys[valid], values[valid]
+
+        counts = np.bincount(keys, minlength=len(labels))
+        if agg == "count":
+            result = counts.astype(np.float64)
+        else:
+            result = np.bincount(keys, weights=values, minlength=len(labels))
+            if agg == "mean":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    result = result / counts
+        return {labels[i]: float(result[i]) for i in np.flatnonzero(counts)}
+
+    @property
+    def nbytes(self) -> int:
+        total = self._ids.data.nbytes + self._has_id.data.nbytes
+        for column in self.numbers.values():
+            total += column.data.nbytes
+        for column in self.dates.values():
+            total += column.data.nbytes
+        for column in self.dictionaries.values():
+            total += column.codes.data.nbytes
+        for column in self.strings.values():
+            total += len(column.data) + column.offsets.data.nbytes
+            total += column.present.data.nbytes
+        features = self.top_features
+        total += features.items.codes.data.nbytes + features.offsets.data.nbytes
+        total += features.present.data.nbytes
+        return total
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    import tracemalloc
+
+    from pydantic import TypeAdapter
+
+    random.seed(7)
+    countries = ["us", "Germany", "uk", "France", "Japan", "Italy"]
+    features = ["6 cylinders", "all-wheel drive", "convertible", "heated seats"]
+    raw = [
+        {
+            "manufacturer": random.choice(["BMW", "Tesla", "Ford", "Toyota"]),
+            "seriesName": random.choice(["M4", "Model S", "Mustang", "Prius"]),
+            "type": random.choice(list(AutomobileType)).value,
+            "isElectric": random.random() < 0.3,
+            "completionDate": (
+                f"20{random.randint(10, 23)}-0{random.randint(1, 9)}"
+                f"-1{random.randint(0, 9)}"
+            ),
+            "msrpUSD": random.randint(20_000, 120_000),
+            "topFeatures": random.sample(features, random.randint(1, 3)),
+            "vin": f"VIN{i:010d}",
+            "doors": random.choice([2, 4]),
+            "registrationCountry": {"name": random.choice(countries)},
+            "licensePlate": None if i % 5 == 0 else f"P-{i}",
+        }
+        for i in range(100_000)
+    ]
+
+    tracemalloc.start()
+    cars = TypeAdapter(list[Automobile]).validate_python(raw)
+    models_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    store = FleetStore(cars)
+    print(f"{len(cars)} models  ~{models_bytes / 1e6:.0f} MB as pydantic objects")
+    print(f"FleetStore        ~{store.nbytes / 1e6:.1f} MB")
+
+    for i in (0, 12_345, len(cars) - 1):
+        assert store[i] == cars[i], i
+    print("rebuilt models are equal to the originals")
+
+    # Average MSRP of electric convertibles by country
+    start = time.perf_counter()
+    mask = store.where(is_electric=True, type_="Convertible")
+    by_country = store.group_by("registration_country", mask=mask)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    totals: dict[CountryInfo, list[float]] = {}
+    for car in cars:
+        if car.is_electric and car.type_ is AutomobileType.convertible:
+            totals.setdefault(car.registration_country, []).append(car.base_msrp_usd)
+    loop = {country: sum(v) / len(v) for country, v in totals.items()}
+    python_loop = time.perf_counter() - start
+
+    assert by_country.keys() == loop.keys()
+    assert all(abs(by_country[k] - loop[k]) < 1e-6 for k in loop)
+    for country, mean in sorted(by_country.items(), key=lambda kv: kv[0].name):
+        print(f"  {country.name:<26} {mean:>10,.0f}")
+    print(f"vectorized {vectorized * 1000:.1f}ms, loop over models {python_loop * 1000:.1f}ms")
+    print("doors:", store.group_by("number_of_doors", agg="count"))
@@ -0,0 +1,118 @@
+"""
+Fast formatters for the fixed date layouts the project serializes to
+
+strftime goes through the C library (and the locale) for every value, which
+dominates model_dump_json when we dump a lot of Automobile / RequestInfo
+records. The layouts we use never change, so we build the strings straight
+from the integer fields instead.
+
+    format_iso_z(dt)         -> "%Y-%m-%dT%H:%M:%SZ"      2023-06-01T15:04:05Z
+    format_slash_date(d)     -> "%Y/%m/%d"                2023/06/01
+    format_slash_datetime(dt)-> "%Y/%m/%d %I:%M %p UTC"   2023/06/01 03:04 PM UTC
+
+The output is byte for byte what strftime gives in the default "C" locale
+(Python never calls setlocale for you). Run python -m pydanticcourse.formatters
+to check that and see the timings.
+"""
+
+from datetime import date, datetime
+
+# "00" .. "99" - indexing a tuple is much cheaper than a :02d format spec
+_TWO_DIGITS = tuple(f"{i:02d}" for i in range(100))
+
+# strftime zero pads %Y differently across platforms for years < 1000
+# (glibc gives "999", others "0999"), leave those to strftime
+_MIN_FAST_YEAR = 1000
+
+# Fleets share a small number of distinct dates, so remember the formatted
+# day keyed on its ordinal
+_slash_dates: dict[int, str] = {}
+_SLASH_DATES_MAX = 50_000
+
+
+def format_iso_z(dt: datetime) -> str:
+    if dt.year < _MIN_FAST_YEAR:
+        return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    d = _TWO_DIGITS
+    return (
+        f"{dt.year}-{d[dt.month]}-{d[dt.day]}"
+        f"T{d[dt.hour]}:{d[dt.minute]}:{d[dt.second]}Z"
+    )
+
+
+def format_slash_date(value: date) -> str:
+    key = value.toordinal()
+    try:
+        return _slash_dates[key]
+    except KeyError:
+        pass
+    if value.year < _MIN_FAST_YEAR:
+        text = value.strftime("%Y/%m/%d")
+    else:
+        text = f"{value.year}/{_TWO_DIGITS[value.month]}/{_TWO_DIGITS[value.day]}"
+    if len(_slash_dates) >= _SLASH_DATES_MAX:
+        _slash_dates.clear()
+    _slash_dates[key] = text
+    return text
+
+
+def format_slash_datetime(dt: datetime) -> str:
+    if dt.year < _MIN_FAST_YEAR:
+        return dt.strftime("%Y/%m/%d %I:%M %p UTC")
+    d = _TWO_DIGITS
+    hour = dt.hour
+    return (
+        f"{dt.year}/{d[dt.month]}/{d[dt.day]} "
+        f"{d[hour % 12 or 12]}:{d[dt.minute]} {'AM' if hour < 12 else 'PM'} UTC"
+    )
+
+
+def verify_against_strftime(values: list[datetime]) -> None:
+    # Raise if any formatter disagrees with strftime for the given values
+    layouts = (
+        (format_iso_z, "%Y-%m-%dT%H:%M:%SZ"),
+        (format_slash_date, "%Y/%m/%d"),
+        (format_slash_datetime, "%Y/%m/%d %I:%M %p UTC"),
+    )
+    for value in values:
+        for formatter, layout in layouts:
+            fast, slow = formatter(value), value.strftime(layout)
+            if fast != slow:
+                raise AssertionError(
+                    f"{formatter.__name__}({value!r}) = {fast!r}, strftime = {slow!r}"
+                )
+
+
+if __name__ == "__main__":
+    # python -m pydanticcourse.formatters
+    import timeit
+    from datetime import timedelta
+
+    values = [
+        datetime(year, month, day, hour, minute, second)
+        for year in (1, 9, 999, 1000, 1980, 2000, 2024, 9999)
+        for month, day in ((1, 1), (2, 28), (12, 31))
+        for hour in range(24)
+        for minute, second in ((0, 0), (7, 9), (59, 59))
+    ]
+    # every day across a couple of leap years
+    start = datetime(2023, 12, 31, 23, 59, 59)
+    values += [start + timedelta(days=n, minutes=n) for n in range(800)]
+    verify_against_strftime(values)
+    for day in (date(2024, 2, 29), date(1980, 1, 1), date(999, 1, 1)):
+        assert format_slash_date(day) == day.strftime("%Y/%m/%d"), day
+    print(f"{len(values)} values match strftime")
+
+    dt = datetime(2023, 6, 1, 15, 4, 5)
+    number = 200_000
+    for formatter, layout in (
+        (format_iso_z, "%Y-%m-%dT%H:%M:%SZ"),
+        (format_slash_date, "%Y/%m/%d"),
+        (format_slash_datetime, "%Y/%m/%d %I:%M %p UTC"),
+    ):
+        slow = timeit.timeit(lambda: dt.strftime(layout), number=number)
+        fast = timeit.timeit(lambda: formatter(dt), number=number)
+        print(
+            f"{formatter.__name__:>22}: {fast / number * 1e9:5.0f} ns "
+            f"(strftime {slow / number * 1e9:5.0f} ns)"
+        )
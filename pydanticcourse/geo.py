@@ -0,0 +1,42 @@
+"""
+IP geolocation response model (https://get.geojs.io)
+
+requests is only imported when we actually call the API.
+"""
+
+from pydantic import BaseModel, ConfigDict, Field, IPvAnyAddress, field_validator
+
+
+class IPGeo(BaseModel):
+    model_config = ConfigDict(extra="ignore", defer_build=True)
+
+    ip: IPvAnyAddress  # Validate an IPv4 or IPv6 address. (REQUIRED)
+    country: str | None = None
+    country_code: str | None = Field(default=None, min_length=2, max_length=2)
+    country_code3: str | None = Field(default=None, min_length=2, max_length=3)
+    city: str | None = None
+    region: str | None = None
+    timezone: str | None = None
+    organization_name: str | None = None
+
+    @field_validator("organization_name", mode="after")
+    @classmethod
+    def set_unknown_to_none(cls, value: str):
+        # The api returns "unknown" if organizayion_name is None
+        # Conversion  is handled here -> None
+        # organization_name: str | None = None
+        if value.casefold() == "unknown":
+            return None
+        return value
+
+
+def create_ip_url(ip_address: str) -> str:
+    return f"https://get.geojs.io/v1/geo/{ip_address}.json"
+
+
+def fetch_ip_geo(ip_address: str, timeout: float = 10) -> IPGeo:
+    import requests
+
+    response = requests.get(create_ip_url(ip_address), timeout=timeout)
+    response.raise_for_status()
+    return IPGeo.model_validate_json(response.content)
@@ -0,0 +1,101 @@
+"""
+Import time benchmark
+
+Each case runs in a fresh interpreter (best of a few runs), so nothing is
+already cached in sys.modules:
+
+    python -m pydanticcourse.import_benchmark
+
+"import" is just the import statement, "first use" adds building the schema
+and validating one record - what a CLI worker that validates a single model
+actually pays.
+"""
+
+import subprocess
+import sys
+
+RUNS = 5
+
+AUTOMOBILE = {
+    "manufacturer": "BMW",
+    "seriesName": "M4 Competition xDrive",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "doors": 2,
+    "registrationCountry": {"name": "us"},
+}
+
+CASES = {
+    "pydantic": ("import pydantic", ""),
+    "pydanticcourse": ("import pydanticcourse", ""),
+    "Automobile": (
+        "from pydanticcourse import Automobile",
+        f"Automobile.model_validate({AUTOMOBILE!r})",
+    ),
+    "Person": (
+        "from pydanticcourse import Person",
+        "Person.model_validate({'firstName': 'David', 'lastName': 'Hilbert',"
+        " 'contactInfo': {}, 'personalInfo': {'nationality': 'German',"
+        " 'born': {'date': '1862-01-23',"
+        " 'place': {'city': 'Konigsberg', 'country': 'Prussia'}}}})",
+    ),
+    "Users": (
+        "from pydanticcourse import Users, RequestInfo",
+        "Users(request_info=RequestInfo(elapsed_time_secs=1.0)).model_dump_json()",
+    ),
+    "Estimate": (
+        "from pydanticcourse import Estimate",
+        "Estimate(area='x', july_1_2001='1', july_1_2000='2', april_1_2000='3')",
+    ),
+    "IPGeo": ("from pydanticcourse import IPGeo", "IPGeo(ip='8.8.8.8')"),
+}
+
+_TIMER = """
+import time
+start = time.perf_counter()
+{import_stmt}
+imported = time.perf_counter()
+{first_use}
+used = time.perf_counter()
+print(imported - start, used - start)
+"""
+
+
+def measure(import_stmt: str, first_use: str) -> tuple[float, float]:
+    best_import = best_use = float("inf")
+    for _ in range(RUNS):
+        out = subprocess.run(
+            [sys.executable, "-c", _TIMER.format(import_stmt=import_stmt, first_use=first_use)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        best_import = min(best_import, float(out[0]))
+        best_use = min(best_use, float(out[1]))
+    return best_import, best_use
+
+
+def heavy_modules_loaded(import_stmt: str) -> list[str]:
+    # Which of the slow optional dependencies did the import drag in?
+    code = (
+        f"{import_stmt}\n"
+        "import sys\n"
+        "print(' '.join(m for m in ('pandas', 'pandantic', 'requests', 'dateutil',"
+        " 'email_validator', 'numpy') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    return out.stdout.split()
+
+
+def main() -> None:
+    print(f"{'':<16}{'import':>10}{'first use':>12}  heavy modules loaded")
+    for name, (import_stmt, first_use) in CASES.items():
+        imported, used = measure(import_stmt, first_use)
+        heavy = ", ".join(heavy_modules_loaded(import_stmt)) or "-"
+        print(f"{name:<16}{imported * 1000:>8.1f}ms{used * 1000:>10.1f}ms  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
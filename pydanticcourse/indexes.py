@@ -0,0 +1,333 @@
+"""
+VIN de-duplication and secondary indexes for Automobile ingestion
+
+    index = AutomobileIndex(FleetStore(), expected=10_000_000)
+    for car in cars:
+        try:
+            index.add(car)              # rejects a VIN it has seen before
+        except DuplicateVinError:
+            ...
+
+    index.row_for_vin("VIN0000000042")
+    index.rows(manufacturer="BMW", registration_country="us")
+    index.find(type_="Convertible")   # Automobiles rebuilt from the store
+
+VIN check
+    A Bloom filter sits in front of the exact VIN -> row map. Almost every
+    VIN in an import is new, and the filter says "definitely new" without
+    touching the map. Only a "maybe seen" (a real duplicate or a false
+    positive, ~error_rate of new VINs) looks at the exact map. The map can
+    be a dbm file on disk (vin_db=...), so an import bigger than memory only
+    keeps the filter in RAM - about 1.8 bytes per VIN at error_rate=0.001.
+
+Inverted indexes
+    manufacturer, type_ and registration_country -> value -> rows, as
+    compact arrays of row numbers (4 bytes per row). One field is a dict
+    lookup, several are intersected with NumPy.
+"""
+
+import dbm
+import math
+from array import array
+from hashlib import blake2b
+from typing import Any, Iterable, Iterator, MutableMapping
+
+import numpy as np
+
+from pydanticcourse.automobiles import Automobile, AutomobileType
+from pydanticcourse.countries import country_by_code3, lookup_country
+from pydanticcourse.fleet import FleetStore
+
+INDEXED_FIELDS = ("manufacturer", "type_", "registration_country")
+
+
+class DuplicateVinError(ValueError):
+    def __init__(self, vin: str, row: int):
+        super().__init__(f"VIN {vin!r} is already loaded (row {row})")
+        self.vin = vin
+        self.row = row
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and 0 < error_rate < 1")
+        # The usual sizing: m = -n ln p / (ln 2)^2 bits, k = m / n ln 2 hashes
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(bits / capacity * math.log(2)))
+        self.size = bits
+        self.bits = bytearray((bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: bytes) -> Iterator[int]:
+        # Double hashing (Kirsch-Mitzenmacher): k positions from one digest.
+        # blake2b rather than hash() so the positions don't change between runs.
+        digest = blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % size
+
+    def add(self, key: bytes) -> bool:
+        # Returns True if the key may have been added before
+        bits = self.bits
+        seen = True
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                seen = False
+                bits[byte] |= mask
+        if not seen:
+            self.count += 1
+        return seen
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+
+class VinIndex:
+    # VIN -> row, with the Bloom filter answering the "never seen it" case
+    def __init__(
+        self,
+        expected: int = 1_000_000,
+        error_rate: float = 0.001,
+        db_path: str | None = None,
+    ):
+        self.bloom = BloomFilter(expected, error_rate)
+        self._db = None
+        if db_path is None:
+            self._rows: MutableMapping[bytes, Any] = {}
+        else:
+            self._db = self._rows = dbm.open(db_path, "n")
+        self.exact_checks = 0  # how often the filter said "maybe"
+
+    def _get(self, key: bytes) -> int | None:
+        self.exact_checks += 1
+        row = self._rows.get(key)
+        return None if row is None else int(row)
+
+    def check(self, vin: str) -> None:
+        # Raises DuplicateVinError like add() would, without recording the VIN
+        key = vin.encode()
+        if key in self.bloom:
+            existing = self._get(key)
+            if existing is not None:
+                raise DuplicateVinError(vin, existing)
+
+    def add(self, vin: str, row: int) -> None:
+        key = vin.encode()
+        if self.bloom.add(key):
+            existing = self._get(key)
+            if existing is not None:
+                raise DuplicateVinError(vin, existing)
+        self._rows[key] = row if self._db is None else str(row).encode()
+
+    def row_for(self, vin: str) -> int | None:
+        key = vin.encode()
+        if key not in self.bloom:
+            return None
+        return self._get(key)
+
+    def __contains__(self, vin: str) -> bool:
+        return self.row_for(vin) is not None
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+
+
+class InvertedIndex:
+    # value -> rows holding it, rows are appended in order so stay sorted
+    def __init__(self):
+        self.postings: dict[Any, array] = {}
+
+    def add(self, value: Any, row: int) -> None:
+        if value is None:
+            return
+        rows = self.postings.get(value)
+        if rows is None:
+            rows = self.postings[value] = array("I")
+        rows.append(row)
+
+    def rows(self, value: Any) -> np.ndarray:
+        rows = self.postings.get(value)
+        if rows is None:
+            return np.empty(0, dtype=np.uint32)
+        # A copy: a view would pin the array and the next add() to it would
+        # raise BufferError
+        return np.array(rows, dtype=np.uint32)
+
+    def values(self) -> list[Any]:
+        return list(self.postings)
+
+
+class AutomobileIndex:
+    def __init__(
+        self,
+        store: FleetStore | None = None,
+        *,
+        expected: int = 1_000_000,
+        error_rate: float = 0.001,
+        vin_db: str | None = None,
+    ):
+        # With a store, add() also stores the car and find() can rebuild it.
+        # Without one the caller owns the rows (e.g. line numbers).
+        self.store = store
+        self.vins = VinIndex(expected, error_rate, vin_db)
+        self.fields = {name: InvertedIndex() for name in INDEXED_FIELDS}
+        self._next_row = len(store) if store is not None else 0
+
+    def add(self, car: Automobile, row: int | None = None) -> int:
+        if self.store is not None:
+            # The store numbers its rows, the car goes in the next one
+            if row is not None and row != len(self.store):
+                raise ValueError(
+                    f"row {row} given, but the car would be stored in row {len(self.store)}"
+                )
+            row = len(self.store)
+        elif row is None:
+            row = self._next_row
+        if not 0 <= row <= 0xFFFFFFFF:
+            raise ValueError(f"row {row} doesn't fit in the indexes (0 to 2**32 - 1)")
+        # Everything that can fail happens before anything is changed
+        self.vins.check(car.vin)
+        if self.store is not None:
+            self.store.append(car)
+        self.vins.add(car.vin, row)
+        for name, index in self.fields.items():
+            index.add(getattr(car, name), row)
+        self._next_row = max(self._next_row, row + 1)
+        return row
+
+    def add_new(self, cars: Iterable[Automobile]) -> Iterator[Automobile]:
+        # Adds every car with a new VIN and yields the duplicates
+        for car in cars:
+            try:
+                self.add(car)
+            except DuplicateVinError:
+                yield car
+
+    def row_for_vin(self, vin: str) -> int | None:
+        return self.vins.row_for(vin)
+
+    def _normalize(self, name: str, value: Any) -> Any:
+        if name == "type_" and isinstance(value, str):
+            return AutomobileType(value)
+        if name == "registration_country" and isinstance(value, str):
+            return country_by_code3(lookup_country(value)[1])
+        return value
+
+    def rows(self, **conditions: Any) -> np.ndarray:
+        # Rows matching every condition (field=value), sorted
+        if not conditions:
+            raise ValueError(f"give at least one of {', '.join(INDEXED_FIELDS)}")
+        result = None
+        for name, value in conditions.items():
+            if name not in self.fields:
+                raise KeyError(f"{name!r} isn't indexed, use one of {INDEXED_FIELDS}")
+            rows = self.fields[name].rows(self._normalize(name, value))
+            result = rows if result is None else np.intersect1d(
+                result, rows, assume_unique=True
+            )
+        return result
+
+    def find(self, **conditions: Any) -> Iterator[Automobile]:
+        if self.store is None:
+            raise RuntimeError("find() needs the index to be built over a FleetStore")
+        return self.store.models(self.rows(**conditions))
+
+    def close(self) -> None:
+        self.vins.close()
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    import time
+
+    from pydantic import TypeAdapter
+
+    random.seed(3)
+    n = 100_000
+    vins = [f"VIN{i:010d}" for i in range(n)]
+    stream = vins + random.sample(vins, n // 100)  # 1% duplicates
+    random.shuffle(stream)
+
+    # Bloom filter accuracy and size
+    bloom = BloomFilter(n, 0.001)
+    for vin in vins:
+        bloom.add(vin.encode())
+    unseen = [f"NEW{i:010d}".encode() for i in range(n)]
+    false_positives = sum(key in bloom for key in unseen)
+    print(
+        f"Bloom filter: {bloom.nbytes / 1024:.0f} KiB for {n} VINs, {bloom.hashes} hashes,"
+        f" false positive rate {false_positives / n:.4%} (target 0.1%)"
+    )
+
+    for label, db in (("in memory", None), ("dbm on disk", "vins")):
+        with tempfile.TemporaryDirectory() as tmp:
+            index = VinIndex(n, db_path=db and os.path.join(tmp, db))
+            duplicates = 0
+            start = time.perf_counter()
+            for row, vin in enumerate(stream):
+                try:
+                    index.add(vin, row)
+                except DuplicateVinError:
+                    duplicates += 1
+            elapsed = time.perf_counter() - start
+            print(
+                f"VinIndex ({label}): {duplicates} duplicates rejected,"
+                f" {index.exact_checks} exact lookups for {len(stream)} VINs,"
+                f" {elapsed / len(stream) * 1e6:.1f}us per VIN"
+            )
+            index.close()
+
+    # Secondary indexes over a FleetStore
+    raw = [
+        {
+            "manufacturer": random.choice(["BMW", "Tesla", "Ford", "Toyota"]),
+            "seriesName": "Model",
+            "type": random.choice(list(AutomobileType)).value,
+            "completionDate": "2020-01-01",
+            "msrpUSD": 50_000,
+            "vin": vin,
+            "registrationCountry": {"name": random.choice(["us", "uk", "Germany"])},
+        }
+        for vin in stream[:20_000]
+    ]
+    cars = TypeAdapter(list[Automobile]).validate_python(raw)
+    index = AutomobileIndex(FleetStore(), expected=len(cars))
+    rejected = list(index.add_new(cars))
+    print(f"{len(index.store)} cars indexed, {len(rejected)} duplicate VINs rejected")
+
+    start = time.perf_counter()
+    rows = index.rows(manufacturer="BMW", type_="Convertible", registration_country="uk")
+    indexed = time.perf_counter() - start
+    start = time.perf_counter()
+    seen = set()
+    scan = []
+    for car in cars:
+        if car.vin in seen:
+            continue
+        seen.add(car.vin)
+        if (
+            car.manufacturer == "BMW"
+            and car.type_ is AutomobileType.convertible
+            and car.registration_country.code3 == "GBR"
+        ):
+            scan.append(car.vin)
+    scanned = time.perf_counter() - start
+    assert [car.vin for car in index.find(
+        manufacturer="BMW", type_="Convertible", registration_country="uk"
+    )] == scan
+    print(
+        f"BMW convertibles in the UK: {len(rows)} - index {indexed * 1e6:.0f}us,"
+        f" linear scan {scanned * 1e3:.1f}ms"
+    )
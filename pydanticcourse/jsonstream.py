@@ -0,0 +1,254 @@
+"""
+Incremental parsing of huge JSON arrays of records
+
+TypeAdapter(list[Automobile]).validate_json(raw) needs the whole response
+in memory (plus every model it builds). iter_json_array() reads the input
+in fixed-size chunks instead, finds where each element of the top level
+array ends and validates it as soon as it's complete:
+
+    for car in iter_json_array("cars.json", Automobile):
+        ...
+
+    response = requests.get(url, stream=True)
+    for person in iter_json_array(response.iter_content(1 << 16), Person):
+        ...
+
+The buffer only ever holds the unread part of the current chunk plus the
+element being read, so memory follows the size of one record, not the
+response.
+
+Element boundaries come from the stdlib JSON decoder's raw_decode() (C),
+then the element's text is validated with model_validate_json, exactly
+as if it had been validated as part of the whole array. A chunk that ends
+in the middle of an element just means reading more (the read size
+doubles while one element is bigger than the buffer, so giant records
+stay linear).
+
+errors="yield" turns elements that fail validation into ElementError
+(index, pydantic's errors, the raw text) instead of raising. Malformed
+JSON always raises ValueError.
+"""
+
+import codecs
+import json
+import re
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Literal, NamedTuple
+
+from pydantic import BaseModel, ValidationError
+
+from pydanticcourse.automobiles import Automobile
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class ElementError(NamedTuple):
+    index: int  # position in the array
+    errors: list[dict[str, Any]]
+    raw: str
+
+
+def _chunks(source: Any, chunk_size: int) -> Iterator[bytes]:
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            yield from _chunks(f, chunk_size)
+        return
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = bytes(source)
+        for start in range(0, len(source), chunk_size):
+            yield source[start : start + chunk_size]
+        return
+    read = getattr(source, "read", None)
+    if read is not None:
+        while chunk := read(chunk_size):
+            yield chunk
+        return
+    yield from source  # any iterable of bytes chunks
+
+
+def _incomplete(ex: json.JSONDecodeError, size: int) -> bool:
+    # A truncated element fails at the end of the buffer, except for an
+    # unterminated string which is reported where the string starts
+    return ex.pos >= size - 6 or ex.msg.startswith("Unterminated string")
+
+
+class _Reader:
+    def __init__(self, source: Any, chunk_size: int):
+        self._chunks = _chunks(source, chunk_size)
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+        self.buffer = ""
+        self.pos = 0
+        self.offset = 0  # characters dropped from the front of the buffer
+        self.eof = False
+
+    def more(self, at_least: int = 1) -> bool:
+        # Append at least `at_least` characters (fewer at EOF)
+        if self.eof:
+            return False
+        # Drop what's been consumed so the buffer stays one element big
+        if self.pos:
+            self.offset += self.pos
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+        parts = [self.buffer]
+        added = 0
+        while added < at_least:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                parts.append(self._decode(b"", final=True))
+                self.eof = True
+                break
+            text = self._decode(chunk)
+            parts.append(text)
+            added += len(text)
+        self.buffer = "".join(parts)
+        return True
+
+    def skip_whitespace(self) -> str:
+        # The next non whitespace character ("" at the end of the input)
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.more():
+                return ""
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"{message} at character {self.offset + self.pos}")
+
+    def element(self) -> str:
+        # Text of the JSON value starting at pos, reading more as needed
+        wanted = len(self.buffer) - self.pos
+        while True:
+            try:
+                _, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as ex:
+                if not _incomplete(ex, len(self.buffer)) or not self.more(wanted):
+                    raise self.error(f"Invalid JSON ({ex.msg})") from None
+                wanted *= 2
+                continue
+            # "12" at the very end might be the start of "1234"
+            if end == len(self.buffer) and not self.eof:
+                self.more(wanted)
+                continue
+            text = self.buffer[self.pos : end]
+            self.pos = end
+            return text
+
+
+def iter_json_array(
+    source: str | Path | bytes | IO[bytes] | Iterable[bytes],
+    model: type[BaseModel] = Automobile,
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    context: dict[str, Any] | None = None,
+    errors: Literal["raise", "yield"] = "raise",
+) -> Iterator[BaseModel | ElementError]:
+    reader = _Reader(source, chunk_size)
+    validate = model.model_validate_json
+
+    if reader.skip_whitespace() != "[":
+        raise reader.error("Expected a JSON array")
+    reader.pos += 1
+    if reader.skip_whitespace() == "]":
+        return
+
+    index = 0
+    while True:
+        text = reader.element()
+        try:
+            yield validate(text, context=context)
+        except ValidationError as ex:
+            if errors == "raise":
+                raise
+            yield ElementError(index, ex.errors(include_url=False), text)
+        index += 1
+
+        following = reader.skip_whitespace()
+        reader.pos += 1
+        if following == "]":
+            break
+        if following != ",":
+            reader.pos -= 1
+            raise reader.error("Expected ',' or ']' after an array element")
+        if reader.skip_whitespace() in ("]", ""):
+            raise reader.error("Expected a value after ','")
+
+    if reader.skip_whitespace() != "":
+        raise reader.error("Unexpected data after the array")
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    import tracemalloc
+
+    from pydantic import TypeAdapter
+
+    record = {
+        "manufacturer": "BMW",
+        "seriesName": "M4 Competition xDrive",
+        "type": "Convertible",
+        "completionDate": "2023-01-01",
+        "msrpUSD": 93_300,
+        "topFeatures": ["6 cylinders", "all-wheel drive", "convertible ☀"],
+        "vin": "1234567890",
+        "doors": 2,
+        "registrationCountry": {"name": "us"},
+        "registrationDate": "2023-06-01",
+        "licensePlate": "AAA-BBB",
+    }
+    n = 20_000
+    raw = json.dumps(
+        [{**record, "vin": f"VIN{i:08d}"} for i in range(n)], indent=2, ensure_ascii=False
+    ).encode()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cars.json")
+        with open(path, "wb") as f:
+            f.write(raw)
+
+        def whole_array() -> list:
+            with open(path, "rb") as f:
+                return TypeAdapter(list[Automobile]).validate_json(f.read())
+
+        def streamed() -> list:
+            # Only keep the VINs so the models don't add up
+            return [car.vin for car in iter_json_array(path, Automobile)]
+
+        assert streamed() == [car.vin for car in whole_array()]
+        runs = (("validate the whole array", whole_array), ("iter_json_array", streamed))
+        for label, run in runs:
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                run()
+                best = min(best, time.perf_counter() - start)
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{label:<26} {best / n * 1e6:.1f}us per record, peak {peak / 1e6:.1f} MB")
+
+    # Tiny chunks split elements, strings, escapes and multi-byte characters
+    sample = json.dumps(
+        [{**record, "vin": f'V"{i}\\\\x'} for i in range(50)], ensure_ascii=False
+    ).encode()
+    for size in (1, 2, 3, 7, 64):
+        assert [c.vin for c in iter_json_array(sample, chunk_size=size)] == [
+            f'V"{i}\\\\x' for i in range(50)
+        ]
+    print("chunk sizes down to 1 byte give the same records")
+
+    bad = json.dumps([record, {**record, "doors": 3}, record]).encode()
+    results = list(iter_json_array(bad, errors="yield"))
+    print(f"invalid element -> {results[1].index} {results[1].errors[0]['msg']}")
+    for broken in (b'[{"a": 1} {"b": 2}]', b'[{"a": 1},]', b"[1, 2", b"{}"):
+        try:
+            list(iter_json_array(broken, errors="yield"))
+        except ValueError as ex:
+            print(f"{broken!r:<24} {ex}")
@@ -0,0 +1,191 @@
+"""
+Bulk validation of NDJSON (one JSON document per line)
+
+complex_models.py validates a single api_data dict. Registry imports are
+millions of lines, so here every line goes straight from bytes to a model
+with model_validate_json - no json.loads(), no intermediate dict:
+
+    for chunk in validate_ndjson(Path("registry.ndjson")):
+        for result in chunk:
+            if isinstance(result, LineError):
+                ...  # result.line, result.errors, result.raw
+            else:
+                ...  # an Automobile
+
+The source is a path (Path / os.PathLike), the NDJSON itself as bytes or
+str, or a binary file. A str is never taken for a file name.
+
+Results come back in chunks (lists) in input order. A bad line doesn't stop
+the import, it becomes a LineError holding the line number, pydantic's
+error list and the raw bytes (for a dead letter file).
+
+processes=N validates the chunks in a process pool. Chunks are still
+yielded in input order and only a few are in flight at once, so memory
+stays flat however big the input is.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, NamedTuple
+
+from pydantic import BaseModel, ValidationError
+
+from pydanticcourse.automobiles import Automobile
+
+CHUNK_SIZE = 10_000
+READ_BUFFER = 1 << 20
+
+
+class LineError(NamedTuple):
+    line: int  # 1 based line number in the input
+    errors: list[dict[str, Any]]  # ValidationError.errors()
+    raw: bytes
+
+
+NDJSONSource = bytes | bytearray | memoryview | str | os.PathLike | IO[bytes]
+
+
+def iter_lines(source: NDJSONSource) -> Iterator[tuple[int, bytes]]:
+    # (line number, line) for every non blank line
+    if isinstance(source, os.PathLike):
+        with open(source, "rb", buffering=READ_BUFFER) as f:
+            yield from iter_lines(f)
+        return
+    if isinstance(source, str):
+        source = source.encode()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        lines: Iterable[bytes] = bytes(source).split(b"\n")
+    else:
+        lines = source  # binary file / socket.makefile("rb") / any iterable of lines
+    for number, line in enumerate(lines, 1):
+        if line and not line.isspace():
+            yield number, line
+
+
+def _chunks(
+    lines: Iterator[tuple[int, bytes]], size: int
+) -> Iterator[list[tuple[int, bytes]]]:
+    while chunk := list(islice(lines, size)):
+        yield chunk
+
+
+def validate_chunk(
+    model: type[BaseModel],
+    chunk: list[tuple[int, bytes]],
+    context: dict[str, Any] | None = None,
+) -> list[BaseModel | LineError]:
+    validate = model.model_validate_json
+    results: list[BaseModel | LineError] = []
+    append = results.append
+    for number, line in chunk:
+        try:
+            append(validate(line, context=context))
+        except ValidationError as ex:
+            append(LineError(number, ex.errors(include_url=False), line))
+    return results
+
+
+def _init_worker(model: type[BaseModel]) -> None:
+    # Each worker loads the cached schema instead of building it
+    from pydanticcourse.schema_cache import warm_start
+
+    warm_start(model)
+
+
+def validate_ndjson(
+    source: NDJSONSource,
+    model: type[BaseModel] = Automobile,
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    processes: int | None = None,
+    context: dict[str, Any] | None = None,
+) -> Iterator[list[BaseModel | LineError]]:
+    chunks = _chunks(iter_lines(source), chunk_size)
+    if not processes or processes < 2:
+        for chunk in chunks:
+            yield validate_chunk(model, chunk, context)
+        return
+
+    # executor.map() would read the whole input up front. Keep a window of
+    # futures instead and always hand back the oldest one first.
+    max_pending = processes * 2
+    with ProcessPoolExecutor(
+        processes, initializer=_init_worker, initargs=(model,)
+    ) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(validate_chunk, model, chunk, context))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def validate_ndjson_file(path: str | Path, **kwargs) -> Iterator[BaseModel | LineError]:
+    # Flat version of validate_ndjson for a file, one result at a time
+    for chunk in validate_ndjson(Path(path), **kwargs):
+        yield from chunk
+
+
+if __name__ == "__main__":
+    import json
+    import os
+    import tempfile
+    import time
+
+    record = {
+        "manufacturer": "BMW",
+        "seriesName": "M4 Competition xDrive",
+        "type": "Convertible",
+        "isElectric": False,
+        "completionDate": "2023-01-01",
+        "msrpUSD": 93_300,
+        "topFeatures": ["6 cylinders", "all-wheel drive", "convertible"],
+        "vin": "1234567890",
+        "doors": 2,
+        "registrationCountry": {"name": "us"},
+        "registrationDate": "2023-06-01",
+        "licensePlate": "AAA-BBB",
+    }
+    lines = []
+    for i in range(50_000):
+        row = {**record, "vin": f"VIN{i:08d}"}
+        if i % 1000 == 999:
+            row["doors"] = 3  # a few bad records
+        lines.append(json.dumps(row).encode())
+    data = b"\n".join(lines) + b"\n"
+
+    start = time.perf_counter()
+    for line in lines:
+        try:
+            Automobile.model_validate(json.loads(line))
+        except ValidationError:
+            pass
+    print(f"json.loads + model_validate   {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    results = [r for chunk in validate_ndjson(data) for r in chunk]
+    print(f"validate_ndjson               {time.perf_counter() - start:.2f}s")
+
+    errors = [r for r in results if isinstance(r, LineError)]
+    print(f"{len(results)} results, {len(errors)} errors, first: line {errors[0].line}")
+    print(errors[0].errors[0]["loc"], errors[0].errors[0]["msg"])
+
+    with tempfile.NamedTemporaryFile(suffix=".ndjson", delete=False) as f:
+        f.write(data)
+    try:
+        workers = max(2, min(4, os.cpu_count() or 1))
+        start = time.perf_counter()
+        parallel = list(validate_ndjson_file(f.name, processes=workers))
+        print(f"validate_ndjson processes={workers}   {time.perf_counter() - start:.2f}s")
+    finally:
+        os.unlink(f.name)
+
+    def key(r):
+        return r.line if isinstance(r, LineError) else r.vin
+
+    assert [key(r) for r in parallel] == [key(r) for r in results]
+    print("process pool results are in input order")
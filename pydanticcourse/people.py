@@ -0,0 +1,151 @@
+"""
+Person models - composition (nested models) and inheritance
+
+They only pick the parts of a bigger person document we care about,
+extra="ignore" drops the rest.
+"""
+
+from functools import cached_property
+from typing import Any
+
+from pydantic import (
+    AliasChoices,
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    PastDate,
+    computed_field,
+    model_serializer,
+)
+from pydantic.alias_generators import to_camel
+
+from pydanticcourse.custom_types import SortedStringList
+
+
+class ContactInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", defer_build=True)
+    email: EmailStr | None = None
+
+
+class PlaceInfo(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
+    city: str
+    country: str
+
+
+class PlaceDateInfo(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, defer_build=True)
+
+    date_: PastDate = Field(alias="date")
+    place: PlaceInfo
+
+
+class PersonalInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", defer_build=True)
+
+    nationality: str
+    born: PlaceDateInfo
+
+
+class Person(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        extra="ignore",
+        defer_build=True,
+    )
+
+    first_name: str
+    last_name: str
+    contact_info: ContactInfo
+    personal_info: PersonalInfo
+    notable_students: SortedStringList = Field(default=[], repr=False)
+
+
+# Person's field names and aliases, in field order
+_PERSON_KEYS = [key for name in Person.model_fields for key in (name, to_camel(name))]
+
+
+# Lazy version of Person for callers that mostly just want the names.
+# contactInfo / personalInfo are kept as the parsed JSON values and only
+# validated into ContactInfo / PersonalInfo (EmailStr, PastDate...) the
+# first time they're read, then cached on the instance. model_dump() and
+# validate_nested() validate them all, repr() leaves them alone so it can't
+# raise. Dumps have Person's keys in Person's order.
+
+
+def _lazy_submodel(raw_field: str, model: type[BaseModel], alias: str):
+    def get(self):
+        return model.model_validate(getattr(self, raw_field))
+
+    get.__name__ = model.__name__
+    return computed_field(cached_property(get), return_type=model, alias=alias, repr=False)
+
+
+def _raw_field(alias: str, name: str) -> Any:
+    # Fills from the JSON key or the name Person uses, e.g. contact_info=...
+    return Field(validation_alias=AliasChoices(alias, name), exclude=True, repr=False)
+
+
+class LazyPerson(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        extra="ignore",
+        defer_build=True,
+    )
+
+    first_name: str
+    last_name: str
+    raw_contact_info: Any = _raw_field("contactInfo", "contact_info")
+    raw_personal_info: Any = _raw_field("personalInfo", "personal_info")
+    notable_students: SortedStringList = Field(default=[], repr=False)
+
+    contact_info = _lazy_submodel("raw_contact_info", ContactInfo, "contactInfo")
+    personal_info = _lazy_submodel("raw_personal_info", PersonalInfo, "personalInfo")
+
+    @model_serializer(mode="wrap")
+    def _person_order(self, handler):
+        # Computed fields are dumped after the regular ones, put the keys
+        # back in Person's order
+        data = handler(self)
+        return {key: data[key] for key in _PERSON_KEYS if key in data}
+
+    def validate_nested(self) -> "LazyPerson":
+        # Validate everything now, raises ValidationError like Person would
+        self.contact_info
+        self.personal_info
+        return self
+
+    def to_person(self) -> Person:
+        return Person.model_construct(
+            first_name=self.first_name,
+            last_name=self.last_name,
+            contact_info=self.contact_info,
+            personal_info=self.personal_info,
+            notable_students=self.notable_students,
+        )
+
+
+# Model Inheritence
+# Create  custom base model and it just has a configuration
+
+
+class CustomModel(BaseModel):
+    model_config = ConfigDict(
+        extra="ignore",
+        alias_generator=to_camel,
+        populate_by_name=True,
+        defer_build=True,
+    )
+
+
+class PersonInheritence(CustomModel):
+    model_config = ConfigDict(strict=False)  # override parent
+    first_name: str
+    last_name: str
+    contact_info: ContactInfo
+    personal_info: PersonalInfo
+    notable_students: SortedStringList = Field(default=[], repr=False)
@@ -0,0 +1,274 @@
+"""
+Per-validator profiling for the project models
+
+Which of parse_datetime, make_utc, parse_registration_country, name_int,
+sort_casefold... is eating the validation budget? profile_validators()
+swaps instrumented validators/serializers into the given models for the
+duration of a with block:
+
+    with profile_validators(Automobile, Users) as profile:
+        run_the_workload()
+    print(profile.report())
+
+    model        field          validator                 calls  errors  total ms  us/call
+    ContactInfo  email          after EmailStr._validate   2000       0   255.537   127.77
+    RequestInfo  execution_dt   before parse_datetime      2000       0   122.119    61.06
+    ...
+
+Every BeforeValidator / AfterValidator / WrapValidator / PlainValidator,
+field_validator / model_validator and PlainSerializer / field_serializer
+in the models' core schemas (nested models included) is wrapped with a
+call counter, an error counter and a perf_counter timer. Rows are keyed
+by the model that declares the field, so RequestInfo.execution_dt shows
+up as RequestInfo even when it's validated as part of Users.
+
+How it works: the model's core schema is copied with every validator and
+serializer function replaced by a timed wrapper, and a SchemaValidator /
+SchemaSerializer is built from the copy. Entering the profile puts those
+on the model classes; leaving puts the originals back. Profiling off means
+the original, untouched validators, so it costs nothing at all.
+
+Notes
+- times are inclusive: a wrap validator's time includes the handler
+- the same function used by several fields gets a row per field
+- the swap is per class, so it's seen by every thread - profile in a
+  benchmark or a canary, not a busy shared process
+- TypeAdapters (e.g. TypeAdapter(list[Automobile])) have their own copy
+  of the schema and aren't instrumented, profile the model itself
+- swapping validators relies on pydantic internals, so it only runs on the
+  pydantic version it was checked against (see core_schemas.py)
+"""
+
+import time
+from typing import Any, Callable, Iterable, NamedTuple
+
+from pydantic import BaseModel
+from pydantic_core import SchemaSerializer
+
+from pydanticcourse.core_schemas import core_config, require_tested_pydantic, schema_validator
+
+_KINDS = {
+    "function-before": "before",
+    "function-after": "after",
+    "function-wrap": "wrap",
+    "function-plain": "plain",
+}
+
+
+class ValidatorKey(NamedTuple):
+    model: str
+    field: str | None  # None for model level validators / serializers
+    kind: str  # before / after / wrap / plain / serializer
+    name: str
+
+
+class ValidatorStats:
+    __slots__ = ("calls", "errors", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+
+def _function_name(function: Any) -> str:
+    # __qualname__ so library validators say whose they are (EmailStr._validate)
+    return getattr(function, "__qualname__", None) or type(function).__name__
+
+
+def _timed(function: Callable[..., Any], stats: ValidatorStats) -> Callable[..., Any]:
+    # pydantic-core passes positional arguments based on the schema
+    # (value[, handler][, info]), so *args keeps every signature working
+    perf_counter = time.perf_counter
+
+    def timed(*args: Any) -> Any:
+        start = perf_counter()
+        try:
+            return function(*args)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.calls += 1
+            stats.seconds += perf_counter() - start
+
+    timed.__name__ = _function_name(function)
+    timed.__wrapped__ = function
+    return timed
+
+
+class ValidatorProfile:
+    def __init__(self, models: Iterable[type[BaseModel]]):
+        # Newer pydantic versions may validate without going through the
+        # swapped in validators, the report would just come out empty
+        require_tested_pydantic("profile_validators")
+        self.models = list(dict.fromkeys(models))
+        self.stats: dict[ValidatorKey, ValidatorStats] = {}
+        self._originals: dict[type[BaseModel], tuple[Any, Any]] = {}
+        self._instrumented: dict[type[BaseModel], tuple[Any, Any]] = {}
+        for model in self.models:
+            self._instrumented[model] = self._build(model)
+
+    def _stats(self, model: str, field: str | None, kind: str, function: Any) -> ValidatorStats:
+        key = ValidatorKey(model, field, kind, _function_name(function))
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = ValidatorStats()
+        return stats
+
+    def _instrument(self, schema: Any, model: str, field: str | None) -> Any:
+        # A copy of the schema with the validator / serializer functions wrapped
+        if isinstance(schema, list):
+            return [self._instrument(item, model, field) for item in schema]
+        if not isinstance(schema, dict):
+            return schema
+
+        schema_type = schema.get("type")
+        if schema_type == "model":
+            model, field = schema["cls"].__name__, None
+        copy = {}
+        for key, value in schema.items():
+            if key == "fields" and schema_type in ("model-fields", "typed-dict", "dataclass-args"):
+                if isinstance(value, dict):
+                    copy[key] = {
+                        name: self._instrument(sub, model, name) for name, sub in value.items()
+                    }
+                else:  # dataclass-args fields are a list of dicts with a "name"
+                    copy[key] = [self._instrument(sub, model, sub.get("name")) for sub in value]
+            elif key == "function" and schema_type in _KINDS and isinstance(value, dict):
+                stats = self._stats(model, field, _KINDS[schema_type], value["function"])
+                copy[key] = {**value, "function": _timed(value["function"], stats)}
+            elif key == "serialization" and isinstance(value, dict) and "function" in value:
+                stats = self._stats(model, field, "serializer", value["function"])
+                copy[key] = {**value, "function": _timed(value["function"], stats)}
+            else:
+                copy[key] = self._instrument(value, model, field)
+        return copy
+
+    def _build(self, model: type[BaseModel]) -> tuple[Any, Any]:
+        model.model_rebuild()  # defer_build models have no schema until first use
+        schema = self._instrument(model.__pydantic_core_schema__, model.__name__, None)
+        config = core_config(model)
+        return schema_validator(model, schema, config), SchemaSerializer(schema, config)
+
+    def enable(self) -> None:
+        for model, (validator, serializer) in self._instrumented.items():
+            if model in self._originals:
+                continue
+            self._originals[model] = (model.__pydantic_validator__, model.__pydantic_serializer__)
+            model.__pydantic_validator__ = validator
+            model.__pydantic_serializer__ = serializer
+
+    def disable(self) -> None:
+        for model, (validator, serializer) in self._originals.items():
+            model.__pydantic_validator__ = validator
+            model.__pydantic_serializer__ = serializer
+        self._originals.clear()
+
+    def __enter__(self) -> "ValidatorProfile":
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.disable()
+
+    def reset(self) -> None:
+        for stats in self.stats.values():
+            stats.calls = stats.errors = 0
+            stats.seconds = 0.0
+
+    def rows(self, include_unused: bool = False) -> list[dict[str, Any]]:
+        # Slowest first
+        rows = [
+            {
+                **key._asdict(),
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "seconds": stats.seconds,
+                "us_per_call": stats.seconds / stats.calls * 1e6 if stats.calls else 0.0,
+            }
+            for key, stats in self.stats.items()
+            if stats.calls or include_unused
+        ]
+        return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+    def report(self) -> str:
+        lines = [
+            f"{'model':<16}{'field':<22}{'validator':<40}"
+            f"{'calls':>8}{'errors':>8}{'total ms':>11}{'us/call':>9}"
+        ]
+        for row in self.rows():
+            validator = f"{row['kind']} {row['name']}"
+            lines.append(
+                f"{row['model']:<16}{row['field'] or '-':<22}{validator:<40}"
+                f"{row['calls']:>8}{row['errors']:>8}"
+                f"{row['seconds'] * 1e3:>11.3f}{row['us_per_call']:>9.2f}"
+            )
+        return "\n".join(lines)
+
+
+def profile_validators(*models: type[BaseModel]) -> ValidatorProfile:
+    # All the project models unless told otherwise
+    if not models:
+        from pydanticcourse.automobiles import Automobile
+        from pydanticcourse.estimates import DataFrameSchema, Estimate
+        from pydanticcourse.geo import IPGeo
+        from pydanticcourse.people import Person
+        from pydanticcourse.responses import RequestInfo, Users
+
+        models = (Automobile, Person, RequestInfo, Users, Estimate, DataFrameSchema, IPGeo)
+    return ValidatorProfile(models)
+
+
+if __name__ == "__main__":
+    from pydantic import ValidationError
+
+    from pydanticcourse.automobiles import Automobile
+    from pydanticcourse.estimates import Estimate
+    from pydanticcourse.people import Person
+    from pydanticcourse.responses import RequestInfo, Users
+    from pydanticcourse.samples import api_data, json_data
+
+    n = 2000
+    cars = [{**api_data, "registrationDate": f"2023-06-{i % 28 + 1:02d}"} for i in range(n)]
+    rows = [
+        {"area": "Texas", "july_1_2001": f"21,{i:03d},123", "july_1_2000": "20,9",
+         "april_1_2000": "\t20,851,820"}
+        for i in range(n)
+    ]
+
+    def workload() -> None:
+        for car in cars:
+            Automobile.model_validate(car).model_dump_json()
+        for row in rows:
+            Estimate.model_validate(row)
+        for i in range(n):
+            info = RequestInfo(
+                execution_dt=f"2024-01-{i % 28 + 1} 10:00", elapsed_time_secs=0.1
+            )
+            Users(request_info=info, users=["Athos"]).model_dump_json()
+            Person.model_validate_json(json_data)
+        try:
+            Estimate.model_validate({**rows[0], "july_1_2000": "n/a"})
+        except ValidationError:
+            pass
+
+    with profile_validators() as profile:
+        workload()
+    print(profile.report())
+
+    # Off = the original validators again
+    assert Automobile.__pydantic_validator__ is not profile._instrumented[Automobile][0]
+
+    def best_of(run, repeat: int = 3) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    plain = best_of(workload)
+    with profile:
+        profiled = best_of(workload)
+    print(f"\nworkload {plain * 1e3:.0f}ms, profiled {profiled * 1e3:.0f}ms")
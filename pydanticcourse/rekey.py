@@ -0,0 +1,262 @@
+"""
+Re-keying records between field names and aliases without models
+
+The gateway only needs to rename keys on a passthrough payload, say from
+what Automobile reads (msrpUSD, completionDate, doors) to what it writes
+(baseMSRPUSD, manufacturedDate, numberOfDoors). Validating into a model
+and dumping it does that, plus all the validation nobody asked for.
+key_map() compiles a model's alias maps once into a plain dict and
+re-keys with a dict comprehension:
+
+    to_wire = key_map(Automobile, "validation", "serialization")
+    to_wire(record)                 # one dict
+    to_wire.many(records)           # a batch
+    to_wire.frame(df)               # DataFrame columns (df.rename)
+    to_wire.inverse()               # the other way round
+
+The key spaces:
+    "name"           field names (base_msrp_usd)
+    "validation"     what model_validate reads (msrpUSD); every string in
+                     an AliasChoices maps too
+    "serialization"  what model_dump(by_alias=True) writes (baseMSRPUSD)
+
+Fields holding models (or lists / dicts / optionals of them) are re-keyed
+with the nested model's map, so Person's contactInfo.email comes out
+right too.
+
+For payloads that don't belong to a model, generator_map() wraps an
+alias generator (to_camel, to_snake, or make_upper / make_alias from
+alias.py) and remembers every key it has converted. The same few keys
+repeat across a feed, so after the first record it's a dict lookup too.
+
+Keys a map doesn't know are kept as they are (unknown="drop" drops them).
+Values are never touched - no type conversion, no defaults.
+"""
+
+from types import NoneType, UnionType
+from typing import Annotated, Any, Callable, Iterable, Literal, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from pydanticcourse.core_schemas import input_paths, model_fields_schema
+
+KeySpace = Literal["name", "validation", "serialization"]
+
+# generator_map() stops remembering new keys past this many
+MAX_GENERATED_KEYS = 100_000
+
+
+def _keys(name: str, field: dict[str, Any], space: KeySpace) -> list[str]:
+    # Every key of `space` that means this field, the preferred one first.
+    # field is the field's core schema, which has the alias_generator's
+    # aliases however the model's schema was built or loaded.
+    if space == "name":
+        return [name]
+    if space == "serialization":
+        return [field.get("serialization_alias") or name]
+    # AliasPath lookups aren't a key of their own
+    return [path[0] for path in input_paths(name, field) if len(path) == 1]
+
+
+def _nested_model(annotation: Any) -> tuple[type[BaseModel], str] | None:
+    # (model, how it's held: "one" / "list" / "dict") for fields holding models
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _nested_model(get_args(annotation)[0])
+    if origin in (Union, UnionType):
+        models = [_nested_model(arg) for arg in get_args(annotation) if arg is not NoneType]
+        return models[0] if len(models) == 1 else None
+    if origin in (list, set, frozenset, tuple):
+        args = [arg for arg in get_args(annotation) if arg is not Ellipsis]
+        if len(args) == 1 and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+            return args[0], "list"
+        return None
+    if origin is dict:
+        value = get_args(annotation)[1] if get_args(annotation) else None
+        if isinstance(value, type) and issubclass(value, BaseModel):
+            return value, "dict"
+        return None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, "one"
+    return None
+
+
+class KeyMap:
+    def __init__(
+        self,
+        mapping: dict[str, str],
+        nested: dict[str, tuple["KeyMap", str]] | None = None,
+        unknown: Literal["keep", "drop"] = "keep",
+        generator: Callable[[str], str] | None = None,
+    ):
+        self.mapping = mapping
+        # target key -> (map for the value, "one" / "list" / "dict")
+        self.nested = nested or {}
+        self.unknown = unknown
+        self.generator = generator
+
+    def _missing(self, key: str) -> str:
+        target = self.generator(key)
+        if len(self.mapping) < MAX_GENERATED_KEYS:
+            self.mapping[key] = target
+        return target
+
+    def __call__(self, record: dict[str, Any]) -> dict[str, Any]:
+        mapping = self.mapping
+        if self.generator is not None:
+            missing = self._missing
+            out = {
+                (mapping[key] if key in mapping else missing(key)): value
+                for key, value in record.items()
+            }
+        elif self.unknown == "keep":
+            get = mapping.get
+            out = {get(key, key): value for key, value in record.items()}
+        else:
+            out = {mapping[key]: value for key, value in record.items() if key in mapping}
+        if self.nested:
+            for key, (sub, held) in self.nested.items():
+                value = out.get(key)
+                if value is None:
+                    continue
+                if held == "one":
+                    if isinstance(value, dict):
+                        out[key] = sub(value)
+                elif held == "list":
+                    if isinstance(value, list):
+                        out[key] = [
+                            sub(item) if isinstance(item, dict) else item for item in value
+                        ]
+                elif isinstance(value, dict):
+                    out[key] = {
+                        k: sub(item) if isinstance(item, dict) else item
+                        for k, item in value.items()
+                    }
+        return out
+
+    def many(self, records: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        return list(map(self, records))
+
+    def frame(self, frame):
+        # Renames a DataFrame's columns (nested values are left alone)
+        mapping = self.mapping
+        if self.generator is not None:
+            for column in frame.columns:
+                if column not in mapping:
+                    self._missing(column)
+        renamed = frame.rename(columns=mapping)
+        if self.unknown == "drop" and self.generator is None:
+            renamed = renamed[[mapping[c] for c in frame.columns if c in mapping]]
+        return renamed
+
+    def inverse(self, _inverted: dict[int, "KeyMap"] | None = None) -> "KeyMap":
+        if self.generator is not None:
+            raise ValueError("a generator map can't be inverted, use the opposite generator")
+        inverted = {} if _inverted is None else _inverted
+        if id(self) in inverted:  # a self-referencing model
+            return inverted[id(self)]
+        result = inverted[id(self)] = KeyMap({}, {}, self.unknown)
+        # With several source keys for one target (AliasChoices) the first wins
+        for source, target in self.mapping.items():
+            result.mapping.setdefault(target, source)
+        for key, (sub, held) in self.nested.items():
+            if key in result.mapping:
+                result.nested[result.mapping[key]] = (sub.inverse(inverted), held)
+        return result
+
+
+_maps: dict[tuple, KeyMap] = {}
+
+
+def key_map(
+    model: type[BaseModel],
+    source: KeySpace = "validation",
+    target: KeySpace = "serialization",
+    unknown: Literal["keep", "drop"] = "keep",
+) -> KeyMap:
+    cache_key = (model, source, target, unknown)
+    compiled = _maps.get(cache_key)
+    if compiled is not None:
+        return compiled
+    # Cached before the nested maps are built so self-referencing models
+    # (a Person with a list[Person]) get the map that's being filled in
+    compiled = _maps[cache_key] = KeyMap({}, {}, unknown)
+    fields_schema = model_fields_schema(model)["fields"]
+    for name, field in model.model_fields.items():
+        to = _keys(name, fields_schema[name], target)[0]
+        for key in _keys(name, fields_schema[name], source):
+            compiled.mapping.setdefault(key, to)
+        inner = _nested_model(field.annotation)
+        if inner is not None:
+            compiled.nested[to] = (key_map(inner[0], source, target, unknown), inner[1])
+    return compiled
+
+
+def generator_map(generator: Callable[[str], str]) -> KeyMap:
+    return KeyMap({}, generator=generator)
+
+
+def rekey(
+    records: Iterable[dict[str, Any]],
+    model: type[BaseModel],
+    source: KeySpace = "validation",
+    target: KeySpace = "serialization",
+) -> list[dict[str, Any]]:
+    return key_map(model, source, target).many(records)
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    from pydantic.alias_generators import to_camel, to_snake
+
+    from pydanticcourse.automobiles import Automobile
+    from pydanticcourse.people import Person
+    from pydanticcourse.samples import api_data, json_data
+
+    to_wire = key_map(Automobile, "validation", "serialization")
+    wire = to_wire(api_data)
+    print(sorted(set(wire) - set(api_data)))
+    car = Automobile.model_validate(api_data)
+    assert list(wire) == list(car.model_dump(by_alias=True))
+    assert to_wire.inverse()(wire) == api_data
+    to_names = key_map(Automobile, "validation", "name")
+    assert set(to_names(api_data)) == set(car.model_dump())
+    print("keys match model_dump(by_alias=True) / model_dump()")
+
+    # Nested models
+    person = json.loads(json_data)
+    names = key_map(Person, "validation", "name")(person)
+    print(sorted(names["contact_info"])[:3], sorted(names["personal_info"])[:3])
+
+    # No model, just a generator
+    snake = generator_map(to_snake)
+    camel = generator_map(to_camel)
+    assert camel(snake(api_data)) == {to_camel(to_snake(k)): v for k, v in api_data.items()}
+
+    records = [{**api_data, "vin": f"VIN{i:08d}"} for i in range(20_000)]
+    for label, run in (
+        ("model_validate + model_dump", lambda: [
+            Automobile.model_validate(r).model_dump(by_alias=True) for r in records
+        ]),
+        ("to_camel(to_snake()) per key", lambda: [
+            {to_camel(to_snake(k)): v for k, v in r.items()} for r in records
+        ]),
+        ("key_map(...).many", lambda: to_wire.many(records)),
+        ("generator_map(to_snake).many", lambda: snake.many(records)),
+    ):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:<30} {best / len(records) * 1e6:.2f}us per record")
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pass
+    else:
+        frame = pd.DataFrame(records[:5]).drop(columns=["topFeatures", "registrationCountry"])
+        print(list(to_wire.frame(frame).columns))
@@ -0,0 +1,41 @@
+"""
+REST API response models
+
+Every response carries some basic information about the request: a unique
+ID, when it was made and how long it took.
+"""
+
+from uuid import UUID
+
+from pydantic import ConfigDict, Field
+from pydantic.alias_generators import to_camel
+
+from pydanticcourse.custom_types import DateTimeUTC
+from pydanticcourse.ids import uuid7
+from pydanticcourse.timezones import now_utc
+from pydanticcourse.wire_formats import WireFormatModel
+
+
+class CustomBaseModel(WireFormatModel):
+    model_config = ConfigDict(
+        extra="ignore",
+        alias_generator=to_camel,
+        populate_by_name=True,
+        defer_build=True,
+    )
+
+
+class RequestInfo(CustomBaseModel):
+    # Time-ordered, so query IDs sort (and index) in the order they were made
+    query_id: UUID = Field(default_factory=uuid7)
+    execution_dt: DateTimeUTC = Field(default_factory=now_utc)
+    elapsed_time_secs: float
+
+
+class ResponseBaseModel(CustomBaseModel):
+    request_info: RequestInfo
+
+
+# The base for all our response models in the API
+class Users(ResponseBaseModel):
+    users: list[str] = []
@@ -0,0 +1,58 @@
+"""
+Sample documents for the demos (python -m pydanticcourse.<module>)
+
+The same data the lessons in complex_models.py use, so the package doesn't
+have to import a lesson script (which prints its demos when imported).
+"""
+
+# An Automobile as sent by the API
+api_data = {
+    "id": "c4e60f4a-3c7f-4da5-9b3f-07aee50b23e7",
+    "manufacturer": "BMW",
+    "seriesName": "M4 Competition xDrive",
+    "type": "Convertible",
+    "isElectric": False,
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "topFeatures": ["6 cylinders", "all-wheel drive", "convertible"],
+    "vin": "1234567890",
+    "doors": 2,
+    "registrationCountry": {"name": "us"},
+    "registrationDate": "2023-06-01",
+    "licensePlate": "AAA-BBB",
+}
+
+# A person document, Person only picks some of it
+json_data = """
+{
+    "firstName": "David",
+    "lastName": "Hilbert",
+    "contactInfo": {
+        "email": "d.hilbert@spectral-theory.com",
+        "homePhone": {
+            "countryCode": 49,
+            "areaCode": 551,
+            "localPhoneNumber": 123456789
+        }
+    },
+    "personalInfo": {
+        "nationality": "German",
+        "born": {
+            "date": "1862-01-23",
+            "place": {
+                "city": "Konigsberg",
+                "country": "Prussia"
+            }
+        },
+        "died": {
+            "date": "1943-02-14",
+            "place": {
+                "city": "Gottingen",
+                "country": "Germany"
+            }
+        }
+    },
+    "awards": ["Lobachevsky Prize", "Bolyai Prize", "ForMemRS"],
+    "notableStudents": ["von Neumann", "Weyl", "Courant", "Zermelo"]
+}
+"""
@@ -0,0 +1,299 @@
+"""
+On-disk warm start cache for the models' core schemas
+
+defer_build=True moves schema building from import to first use, but every
+new process still has to generate the core schema for each model it touches
+(walking the annotations, Field()s, validators, alias generator...). The
+result is just a dict of plain values and functions, so we pickle it the
+first time and new processes load it and go straight to creating the
+SchemaValidator / SchemaSerializer, which is cheap.
+
+    from pydanticcourse.schema_cache import warm_start
+
+    warm_start()              # every model the package exports
+    warm_start(Automobile)    # or just the ones this worker needs
+
+Each cache file is keyed on:
+- the model's module and qualname
+- the source of the pydanticcourse package and of the modules the model (and
+  its bases) are defined in - edit a model, a custom type or a validator and
+  the key changes
+- model_config
+- the pydantic, pydantic-core and Python versions
+
+A stale file is never read, it's simply a different key. clear_cache() wipes
+the directory.
+
+The cache lives in $PYDANTICCOURSE_SCHEMA_CACHE, or ~/.cache/pydanticcourse/
+schemas. The files are pickles - only point it at a directory you own.
+"""
+
+import hashlib
+import marshal
+import os
+import pickle
+import sys
+import tempfile
+import types
+import warnings
+from importlib import import_module
+from pathlib import Path
+from typing import Any
+
+import pydantic
+import pydantic_core
+from pydantic import BaseModel
+from pydantic_core import SchemaSerializer
+
+from pydanticcourse.core_schemas import apply_alias_generator, core_config, schema_validator
+
+PACKAGE_DIR = Path(__file__).parent
+CACHE_ENV = "PYDANTICCOURSE_SCHEMA_CACHE"
+
+# Bump if the layout of the cached payload changes
+_FORMAT = 1
+
+# Hash of the package source, computed once per process
+_package_digest: str | None = None
+
+
+class SchemaCacheWarning(UserWarning):
+    pass
+
+
+def cache_dir() -> Path:
+    path = os.environ.get(CACHE_ENV)
+    if path:
+        return Path(path)
+    return Path.home() / ".cache" / "pydanticcourse" / "schemas"
+
+
+def _hash_package(digest) -> None:
+    global _package_digest
+    if _package_digest is None:
+        package = hashlib.sha256()
+        for path in sorted(PACKAGE_DIR.rglob("*.py")):
+            package.update(path.relative_to(PACKAGE_DIR).as_posix().encode())
+            package.update(path.read_bytes())
+        _package_digest = package.hexdigest()
+    digest.update(_package_digest.encode())
+
+
+def _hash_module(digest, module_name: str) -> None:
+    module = sys.modules.get(module_name)
+    path = getattr(module, "__file__", None)
+    if path and Path(path).suffix == ".py":
+        digest.update(Path(path).read_bytes())
+    else:
+        # Built in / frozen - its version is covered by sys.version
+        digest.update(module_name.encode())
+
+
+def _stable_repr(value: Any) -> str:
+    # repr() of a function includes its address, which changes every run
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{value.__module__}.{value.__qualname__}"
+    return repr(value)
+
+
+def schema_key(model: type[BaseModel]) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{_FORMAT} {sys.version} {pydantic.VERSION}".encode())
+    digest.update(pydantic_core.__version__.encode())
+    digest.update(f"{model.__module__}.{model.__qualname__}".encode())
+    _hash_package(digest)
+    for module_name in sorted({base.__module__ for base in model.__mro__}):
+        if not module_name.startswith("pydanticcourse"):
+            _hash_module(digest, module_name)
+    for name, value in sorted(model.model_config.items()):
+        digest.update(f"{name}={_stable_repr(value)};".encode())
+    return digest.hexdigest()
+
+
+def cache_path(model: type[BaseModel], directory: Path | None = None) -> Path:
+    directory = cache_dir() if directory is None else directory
+    name = f"{model.__module__}.{model.__qualname__}"
+    return directory / f"{name}-{schema_key(model)[:24]}.pickle"
+
+
+# pydantic puts a few closures in the schema (e.g. the JSON schema hooks for
+# enums). Plain pickle can only store functions it can import by name, so
+# those are stored as their code object + the values they close over. The
+# key includes the Python version, so the marshalled code is always read back
+# by the same interpreter that wrote it.
+def _importable(func: types.FunctionType) -> bool:
+    module = sys.modules.get(func.__module__)
+    obj = module
+    for part in func.__qualname__.split("."):
+        obj = getattr(obj, part, None)
+    return obj is func
+
+
+def _rebuild_function(code, module, name, defaults, kwdefaults, cells):
+    closure = tuple(types.CellType(value) for value in cells) if cells else None
+    func = types.FunctionType(
+        marshal.loads(code), import_module(module).__dict__, name, defaults, closure
+    )
+    func.__kwdefaults__ = kwdefaults
+    return func
+
+
+class _SchemaPickler(pickle.Pickler):
+    # The last object handed to reducer_override, i.e. the one being pickled
+    # when dump() fails
+    last = None
+
+    def reducer_override(self, obj):
+        self.last = obj
+        if type(obj) is types.FunctionType and not _importable(obj):
+            cells = None
+            if obj.__closure__:
+                cells = tuple(cell.cell_contents for cell in obj.__closure__)
+            return _rebuild_function, (
+                marshal.dumps(obj.__code__),
+                obj.__module__,
+                obj.__name__,
+                obj.__defaults__,
+                obj.__kwdefaults__,
+                cells,
+            )
+        return NotImplemented
+
+
+def save_schema(model: type[BaseModel], directory: Path | None = None) -> Path | None:
+    # Builds the model if it hasn't been yet. If the schema can't be pickled
+    # it warns with the object that got in the way and returns None, the
+    # model then just builds normally every time.
+    model.model_rebuild()
+    path = cache_path(model, directory)
+    payload = (model.__pydantic_core_schema__, core_config(model))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickler = _SchemaPickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickler.dump(payload)
+        # Atomic, so a worker starting up never reads a half written file
+        os.replace(tmp, path)
+    except (pickle.PicklingError, TypeError, AttributeError, ValueError) as exc:
+        os.unlink(tmp)
+        culprit = repr(pickler.last)
+        if len(culprit) > 80:
+            culprit = culprit[:77] + "..."
+        warnings.warn(
+            f"{model.__module__}.{model.__qualname__} schema can't be cached,"
+            f" {type(pickler.last).__qualname__} {culprit} can't be pickled"
+            f" ({exc}). The model will be built on every start.",
+            SchemaCacheWarning,
+            stacklevel=2,
+        )
+        return None
+    return path
+
+
+def load_schema(model: type[BaseModel], directory: Path | None = None) -> bool:
+    # Installs a cached schema on the model. False if there isn't one (or it
+    # couldn't be read), the model is left as it was.
+    try:
+        with open(cache_path(model, directory), "rb") as f:
+            schema, config = pickle.load(f)
+    except FileNotFoundError:
+        return False
+    except Exception:
+        # Truncated / corrupt file - it'll be rewritten
+        return False
+
+    # What pydantic's complete_model_class does once it has the schema, plus
+    # the aliases generating it would have set on model_fields
+    apply_alias_generator(model)
+    model.__pydantic_core_schema__ = schema
+    model.__pydantic_validator__ = schema_validator(model, schema, config)
+    model.__pydantic_serializer__ = SchemaSerializer(schema, config)
+    model.__pydantic_complete__ = True
+    return True
+
+
+def warm_start(
+    *models: type[BaseModel], directory: Path | None = None
+) -> dict[str, str]:
+    # Make the models ready to use: "ready" already built, "cached" loaded
+    # from disk, "built" built now and saved for next time, "uncached" built
+    # now but its schema can't be saved (save_schema warns why)
+    if not models:
+        import pydanticcourse
+
+        exported = (getattr(pydanticcourse, name) for name in pydanticcourse.__all__)
+        models = tuple(
+            value
+            for value in exported
+            if isinstance(value, type) and issubclass(value, BaseModel)
+        )
+
+    status = {}
+    for model in models:
+        if model.__pydantic_complete__:
+            status[model.__name__] = "ready"
+        elif load_schema(model, directory):
+            status[model.__name__] = "cached"
+        elif save_schema(model, directory) is not None:
+            status[model.__name__] = "built"
+        else:
+            status[model.__name__] = "uncached"
+    return status
+
+
+def clear_cache(directory: Path | None = None) -> int:
+    directory = cache_dir() if directory is None else directory
+    removed = 0
+    for path in directory.glob("*.pickle"):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    import subprocess
+    import time
+
+    # Fresh interpreters: one cold (empty cache), then warm ones
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "from pydanticcourse.schema_cache import warm_start\n"
+        "status = warm_start()\n"
+        "print(round((time.perf_counter() - start) * 1000, 1), sorted(set(status.values())))\n"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, CACHE_ENV: tmp}
+        for label in ("cold", "warm", "warm", "warm"):
+            out = subprocess.run(
+                [sys.executable, "-c", code], env=env, capture_output=True, text=True
+            )
+            print(f"{label:<5} import + warm_start {out.stdout.strip() or out.stderr}")
+        print(f"{len(list(Path(tmp).glob('*.pickle')))} schemas cached")
+
+    # A cached model has to behave exactly like a freshly built one
+    from pydanticcourse import Automobile
+
+    data = {
+        "manufacturer": "BMW",
+        "seriesName": "M4",
+        "type": "Convertible",
+        "completionDate": "2023-01-01",
+        "msrpUSD": 93_300,
+        "vin": "1234567890",
+        "registrationCountry": {"name": "us"},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        save_schema(Automobile, Path(tmp))
+        built = Automobile.model_validate({**data, "id": None}).model_dump_json()
+        schema = Automobile.model_json_schema()
+        Automobile.__pydantic_complete__ = False
+        assert load_schema(Automobile, Path(tmp))
+        assert Automobile.model_validate({**data, "id": None}).model_dump_json() == built
+        assert Automobile.model_json_schema() == schema
+        print("cached Automobile matches the built one")
+
+        start = time.perf_counter()
+        load_schema(Automobile, Path(tmp))
+        print(f"load_schema(Automobile) {(time.perf_counter() - start) * 1000:.2f}ms")
@@ -0,0 +1,258 @@
+"""
+Path-selective extraction from big JSON documents
+
+Person keeps ~1% of a person document (names, email, nationality, birth)
+and extra="ignore" drops the rest. json_paths() works out, from a model's
+fields and aliases, exactly which JSON paths it reads:
+
+    >>> sorted(json_paths(Person))
+    ['contactInfo.email', 'firstName', 'lastName', 'notableStudents',
+     'personalInfo.born.date', 'personalInfo.born.place.city', ...]
+
+and extract() pulls only those paths out of the raw bytes:
+
+    extract(raw, Person)     # a plain dict with just what Person reads
+    extract(raw, ["firstName", "awards[]"])
+
+The paths are compiled into nested TypedDicts (total=False, Any at the
+leaves, "[]" = every item of a list) and pydantic-core does the scanning,
+so unneeded objects and arrays are skipped without building Python
+objects for them. json.loads() builds every object in the document.
+
+Why not skip the ignored subtrees ourselves? Working out where a subtree
+ends needs a pass over every string and bracket in it, and doing that from
+Python (regex tokens, ~30ms for a 470KB document) is an order of magnitude
+slower than pydantic-core's Rust parser reading the whole thing (~1.7ms).
+Person.model_validate_json(raw) already gets the same benefit - ignored
+keys never become Python objects - so models don't need extract() first;
+it's for code that wants the slim document itself (archiving the 1%,
+handing it to something that isn't a model, logging).
+"""
+
+from functools import lru_cache
+from types import NoneType, UnionType
+from typing import Annotated, Any, Iterable, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+from pydanticcourse.core_schemas import input_paths, model_fields_schema
+
+ITEMS = "[]"  # path segment for "each item of the list"
+
+# A path tree: key -> subtree, None = take the whole value
+_Tree = dict[str, Any]
+
+
+def _add(tree: _Tree, path: list[str]) -> None:
+    head, rest = path[0], path[1:]
+    if not rest:
+        tree[head] = None  # the whole value wins over any sub paths
+        return
+    if head in tree and tree[head] is None:
+        return
+    _add(tree.setdefault(head, {}), rest)
+
+
+def _split(path: str) -> list[str]:
+    # "awards[].name" -> ["awards", "[]", "name"]
+    segments = []
+    for part in path.split("."):
+        while part.endswith(ITEMS) and part != ITEMS:
+            segments.append(part[: -len(ITEMS)])
+            part = ITEMS
+        segments.append(part)
+    return segments
+
+
+def _join(segments: Iterable[str]) -> str:
+    return ".".join(segments).replace("." + ITEMS, ITEMS)
+
+
+def _type_tree(annotation: Any, by_name: bool) -> _Tree | None:
+    # The sub paths a field's type reads, None if it needs the whole value
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _type_tree(get_args(annotation)[0], by_name)
+    if origin in (Union, UnionType):
+        trees = [
+            _type_tree(arg, by_name) for arg in get_args(annotation) if arg is not NoneType
+        ]
+        if any(tree is None for tree in trees):
+            return None
+        merged: _Tree = {}
+        for tree in trees:
+            _merge(merged, tree)
+        return merged
+    if origin in (list, set, frozenset, tuple):
+        args = [arg for arg in get_args(annotation) if arg is not Ellipsis]
+        if len(args) != 1:
+            return None
+        item = _type_tree(args[0], by_name)
+        return None if item is None else {ITEMS: item}
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _model_tree(annotation, by_name)
+    return None
+
+
+def _merge(into: _Tree, tree: _Tree) -> None:
+    for key, sub in tree.items():
+        if sub is None or into.get(key, {}) is None:
+            into[key] = None
+        else:
+            _merge(into.setdefault(key, {}), sub)
+
+
+def _input_keys(paths: list[list[str | int]]) -> list[list[str]]:
+    # The validator's lookup paths as key paths: ints index into lists, so
+    # take the whole list from there on
+    keys = []
+    for path in paths:
+        key = []
+        for part in path:
+            if isinstance(part, int):
+                break
+            key.append(part)
+        keys.append(key)
+    return keys
+
+
+@lru_cache(maxsize=None)
+def _model_tree(model: type[BaseModel], by_name: bool = False) -> _Tree | None:
+    # by_name: also the field names of populate_by_name models. Documents
+    # from upstream use the aliases, so by default only those are read.
+    if model.model_config.get("extra") == "allow":
+        return None  # keeps every key it's given
+    # Keys from the core schema, model_fields only has the alias_generator's
+    # aliases once pydantic has built the schema itself
+    fields_schema = model_fields_schema(model)["fields"]
+    tree: _Tree = {}
+    use_names = by_name and model.model_config.get("populate_by_name", False)
+    for name, field in model.model_fields.items():
+        sub = _type_tree(field.annotation, by_name)
+        for key in _input_keys(input_paths(name, fields_schema[name], use_names)):
+            if not key:
+                continue
+            if sub is None or len(key) > 1:
+                _add(tree, key)
+            else:
+                _merge(tree, {key[0]: sub})
+    return tree
+
+
+def _flatten(tree: _Tree, prefix: list[str]) -> Iterable[str]:
+    for key, sub in tree.items():
+        if sub is None:
+            yield _join(prefix + [key])
+        else:
+            yield from _flatten(sub, prefix + [key])
+
+
+def json_paths(model: type[BaseModel], by_name: bool = False) -> frozenset[str]:
+    tree = _model_tree(model, by_name)
+    return frozenset(_flatten(tree, [])) if tree is not None else frozenset()
+
+
+def _paths_tree(paths: Iterable[str]) -> _Tree:
+    tree: _Tree = {}
+    for path in paths:
+        _add(tree, _split(path))
+    return tree
+
+
+_counter = 0
+
+
+def _typed(tree: _Tree | None) -> Any:
+    global _counter
+    if tree is None:
+        return Any
+    if set(tree) == {ITEMS}:
+        return list[_typed(tree[ITEMS])]
+    if ITEMS in tree:
+        return Any  # both a list and an object on different paths
+    _counter += 1
+    return TypedDict(
+        f"Projection{_counter}",
+        {key: _typed(sub) for key, sub in tree.items()},
+        total=False,
+    )
+
+
+@lru_cache(maxsize=256)
+def _projection(key: type[BaseModel] | frozenset[str]) -> TypeAdapter:
+    if isinstance(key, frozenset):
+        tree = _paths_tree(key)
+    else:
+        tree = _model_tree(key)
+    return TypeAdapter(_typed(tree))
+
+
+def projection(model_or_paths: type[BaseModel] | Iterable[str]) -> TypeAdapter:
+    # The compiled, cached TypeAdapter extract() uses
+    if isinstance(model_or_paths, type):
+        return _projection(model_or_paths)
+    return _projection(frozenset(model_or_paths))
+
+
+def extract(
+    data: str | bytes | bytearray, model_or_paths: type[BaseModel] | Iterable[str]
+) -> Any:
+    return projection(model_or_paths).validate_json(data)
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    from pydanticcourse.people import Person
+    from pydanticcourse.samples import json_data
+
+    print("Person reads:")
+    for path in sorted(json_paths(Person)):
+        print("   ", path)
+
+    # A person document that's mostly stuff Person doesn't want
+    doc = json.loads(json_data)
+    doc["publications"] = [
+        {
+            "title": f"On the foundations of geometry part {i}",
+            "year": 1899 + i % 40,
+            "coauthors": ["Ackermann", "Bernays"],
+            "journal": {"name": "Mathematische Annalen", "volume": i},
+        }
+        for i in range(2500)
+    ]
+    doc["biography"] = "Lorem ipsum dolor sit amet " * 2000
+    doc["notableStudents"] = doc.pop("notableStudents")  # last, after the bulk
+    raw = json.dumps(doc).encode()
+
+    slim = extract(raw, Person)
+    assert Person.model_validate(slim) == Person.model_validate_json(raw)
+    print(f"{len(raw) / 1024:.0f}KB document -> {len(json.dumps(slim))} bytes kept")
+    print(extract(raw, ["firstName", "publications[].journal.volume"])["publications"][:2])
+
+    def keep(document: dict) -> dict:
+        # What code using json.loads has to do
+        info = document["personalInfo"]
+        return {
+            "firstName": document["firstName"],
+            "lastName": document["lastName"],
+            "contactInfo": {"email": document["contactInfo"]["email"]},
+            "personalInfo": {"nationality": info["nationality"], "born": info["born"]},
+            "notableStudents": document["notableStudents"],
+        }
+
+    runs = 50
+    for label, run in (
+        ("json.loads + pick", lambda: keep(json.loads(raw))),
+        ("extract(raw, Person)", lambda: extract(raw, Person)),
+        ("Person.model_validate_json", lambda: Person.model_validate_json(raw)),
+    ):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(runs):
+                run()
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:<28} {best / runs * 1000:.2f}ms")
@@ -0,0 +1,143 @@
+"""
+Timezone helpers built on the standard library zoneinfo module
+
+pytz is slow to import and converting with it goes through Python code for
+every value. zoneinfo ships with Python (3.9+), its tz objects are cached
+singletons and the conversions run in C, so we use it for everything the
+project needs:
+
+    make_utc(dt)      -> the AfterValidator used by DateTimeUTC / TimeModel
+    now_utc()         -> default_factory for "created at" style fields
+    get_zone("Europe/London") -> cached tz object
+
+Naive datetimes are assumed to already be UTC (the same rule the pytz based
+make_utc used). Aware datetimes are converted to UTC.
+See PydanticCourse/utc_information.txt
+"""
+
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+UTC = timezone.utc
+
+# tzinfo types whose astimezone() already runs in C
+_C_ZONES = (timezone, ZoneInfo)
+
+# Other tzinfo objects (dateutil's tz.gettz() zones, tzlocal, pytz zones...)
+# work out the offset in Python on every call. A zone's offset only changes
+# at a transition (DST start/end etc.) and in practice those happen on the
+# hour, so we remember the offset for a whole hour of wall clock time.
+# Key = (id(zone), hours since 0001-01-01, fold)
+# Value = (zone, offset) - holding the zone keeps its id() from being reused
+_offset_cache: dict[tuple[int, int, int], tuple[tzinfo, timedelta]] = {}
+_OFFSET_CACHE_MAX = 100_000
+
+
+@lru_cache(maxsize=None)
+def get_zone(key: str) -> tzinfo:
+    # ZoneInfo keeps its own weak cache, lru_cache keeps the zone alive
+    # so we never pay to re-read the tzdata file
+    if key.upper() in ("UTC", "Z"):
+        return UTC
+    return ZoneInfo(key)
+
+
+def _cached_offset(dt: datetime, tz: tzinfo) -> timedelta | None:
+    key = (id(tz), dt.toordinal() * 24 + dt.hour, dt.fold)
+    hit = _offset_cache.get(key)
+    if hit is not None and hit[0] is tz:
+        return hit[1]
+
+    offset = dt.utcoffset()
+    start = dt.replace(minute=0, second=0, microsecond=0)
+    end = dt.replace(minute=59, second=59, microsecond=999_999)
+    # Only memoize hours that don't contain a transition
+    if offset is not None and start.utcoffset() == end.utcoffset():
+        if len(_offset_cache) >= _OFFSET_CACHE_MAX:
+            _offset_cache.clear()
+        _offset_cache[key] = (tz, offset)
+    return offset
+
+
+def make_utc(dt: datetime) -> datetime:
+    tz = dt.tzinfo
+    if tz is None:
+        # naive -> assume it's UTC
+        return dt.replace(tzinfo=UTC)
+    if tz is UTC:
+        return dt
+    if isinstance(tz, _C_ZONES):
+        return dt.astimezone(UTC)
+
+    offset = _cached_offset(dt, tz)
+    if offset is None:
+        # utcoffset() returned None, so the datetime is really naive
+        return dt.replace(tzinfo=UTC)
+    return (dt - offset).replace(tzinfo=UTC)
+
+
+def to_zone(dt: datetime, key: str) -> datetime:
+    # Convert to a named zone for display, naive values are taken as UTC
+    return make_utc(dt).astimezone(get_zone(key))
+
+
+def now_utc() -> datetime:
+    return datetime.now(UTC)
+
+
+def clear_caches() -> None:
+    _offset_cache.clear()
+    get_zone.cache_clear()
+
+
+if __name__ == "__main__":
+    # Compare against the old pytz based make_utc
+    # python -m pydanticcourse.timezones
+    import subprocess
+    import sys
+    import timeit
+
+    import pytz
+    from dateutil import tz as dateutil_tz
+
+    def pytz_make_utc(dt: datetime) -> datetime:
+        if dt.tzinfo is None:
+            dt = pytz.utc.localize(dt)
+        else:
+            dt = dt.astimezone(pytz.utc)
+        return dt
+
+    london = get_zone("Europe/London")
+    samples = [
+        datetime(2024, 1, 1, 15, 30),
+        datetime(2024, 7, 1, 15, 30, tzinfo=UTC),
+        datetime(2024, 7, 1, 15, 30, tzinfo=london),
+        datetime(2024, 3, 31, 1, 30, tzinfo=london),  # spring forward gap
+        datetime(2024, 10, 27, 1, 30, tzinfo=london),  # fall back, fold=0
+        datetime(2024, 10, 27, 1, 30, fold=1, tzinfo=london),
+        datetime(2024, 7, 1, 15, 30, tzinfo=timezone(timedelta(hours=-5))),
+        datetime(2024, 7, 1, 15, 30, tzinfo=dateutil_tz.tzoffset(None, 3600)),
+        datetime(2024, 7, 1, 15, 30, tzinfo=dateutil_tz.gettz("Asia/Kolkata")),
+        datetime(2024, 10, 27, 1, 30, tzinfo=dateutil_tz.gettz("Europe/London")),
+        pytz.timezone("US/Eastern").localize(datetime(2024, 11, 3, 1, 30)),
+    ]
+    for dt in samples:
+        assert make_utc(dt) == pytz_make_utc(dt), dt
+        assert make_utc(dt).utcoffset() == timedelta(0)
+        assert make_utc(dt).replace(tzinfo=None) == pytz_make_utc(dt).replace(
+            tzinfo=None
+        )
+
+    number = 20_000
+    for name, fn in (("pytz", pytz_make_utc), ("zoneinfo", make_utc)):
+        secs = timeit.timeit(lambda: [fn(dt) for dt in samples], number=number)
+        print(f"{name:>8}: {secs / (number * len(samples)) * 1e9:.0f} ns/value")
+
+    for module in ("pytz", "zoneinfo"):
+        out = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+        ).stderr.strip()
+        print(f"import {module}: {out.splitlines()[-1].split('|')[1].strip()} us")
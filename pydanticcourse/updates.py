@@ -0,0 +1,175 @@
+"""
+Batch field updates for validate_assignment models
+
+With validate_assignment=True (Automobile) every attribute assignment is a
+validation pass of its own, and a pricing + registration update touching
+five fields runs five of them. update_fields() applies a dict of changes
+with a single pass:
+
+    update_fields(car, {"base_msrp_usd": 99_000, "registration_country": {"name": "uk"}})
+
+- the current values with the changes merged in are validated together,
+  once (model validators included, once)
+- all or nothing: if any field fails, pydantic's ValidationError is raised
+  and the instance is left exactly as it was
+- the changed fields are added to model_fields_set, like assignments do
+
+Changes are keyed by field name (aliases are accepted too). Errors are the
+ones model_validate gives, located by the model's input keys ("doors" for
+number_of_doors). Since the whole model goes through the validator, a value
+that was never valid (say a model built with model_construct) fails here
+even if it isn't being changed.
+
+update_many() is the nightly job version: it applies an iterable of
+(model, changes) pairs and returns the failures instead of stopping.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, NamedTuple
+
+from pydantic import BaseModel, ValidationError
+
+from pydanticcourse.core_schemas import input_paths, model_fields_schema
+
+
+class UpdateFailure(NamedTuple):
+    index: int
+    model: BaseModel
+    error: ValidationError
+
+
+class _UpdatePlan(NamedTuple):
+    # field name -> key the validator reads it from
+    input_keys: dict[str, str]
+    # field name / alias -> field name
+    change_keys: dict[str, str]
+    frozen_fields: frozenset[str]
+
+
+@lru_cache(maxsize=None)
+def _plan(cls: type[BaseModel]) -> _UpdatePlan:
+    # Keys from the core schema: model_fields only has the alias_generator's
+    # aliases once pydantic has built the schema itself
+    fields_schema = model_fields_schema(cls)["fields"]
+    input_keys = {}
+    change_keys = {}
+    for name, field in fields_schema.items():
+        keys = [path[0] for path in input_paths(name, field) if len(path) == 1]
+        # A field only read through an AliasPath is passed by name
+        input_keys[name] = keys[0] if keys else name
+        for alias in (*keys, field.get("serialization_alias")):
+            if alias is not None:
+                change_keys.setdefault(alias, name)
+        change_keys[name] = name
+    frozen = frozenset(name for name, f in cls.model_fields.items() if f.frozen)
+    return _UpdatePlan(input_keys, change_keys, frozen)
+
+
+def update_fields(model: BaseModel, changes: dict[str, Any]) -> BaseModel:
+    cls = type(model)
+    plan = _plan(cls)
+
+    names = []
+    for key in changes:
+        name = plan.change_keys.get(key)
+        if name is None:
+            # Same error an assignment to an unknown field gives
+            raise ValueError(f'"{cls.__name__}" object has no field "{key}"')
+        names.append(name)
+    frozen = cls.model_config.get("frozen") or plan.frozen_fields.intersection(names)
+    if frozen:
+        error_type = "frozen_instance" if frozen is True else "frozen_field"
+        raise ValidationError.from_exception_data(
+            cls.__name__,
+            [
+                {"type": error_type, "loc": (name,), "input": changes[key]}
+                for key, name in zip(changes, names)
+                if frozen is True or name in frozen
+            ],
+        )
+
+    input_keys = plan.input_keys
+    data = {
+        input_keys[name]: value
+        for name, value in model.__dict__.items()
+        if name in input_keys
+    }
+    for key, name in zip(changes, names):
+        data[input_keys[name]] = changes[key]
+
+    updated = cls.model_validate(data)  # raises before anything is touched
+
+    model.__dict__.update(updated.__dict__)
+    model.__pydantic_fields_set__.update(names)
+    return model
+
+
+def update_many(
+    pairs: Iterable[tuple[BaseModel, dict[str, Any]]],
+) -> list[UpdateFailure]:
+    failures = []
+    for index, (model, changes) in enumerate(pairs):
+        try:
+            update_fields(model, changes)
+        except ValidationError as ex:
+            failures.append(UpdateFailure(index, model, ex))
+    return failures
+
+
+if __name__ == "__main__":
+    import time
+    from datetime import datetime
+
+    from pydanticcourse import Automobile
+
+    car = Automobile.model_validate(
+        {
+            "manufacturer": "BMW",
+            "seriesName": "M4 Competition xDrive",
+            "type": "Convertible",
+            "completionDate": "2023-01-01",
+            "msrpUSD": 93_300,
+            "topFeatures": ["6 cylinders", "all-wheel drive"],
+            "vin": "1234567890",
+            "doors": 2,
+            "registrationCountry": {"name": "us"},
+            "registrationDate": "2023-06-01",
+            "licensePlate": "AAA-BBB",
+        }
+    )
+    changes = {
+        "base_msrp_usd": 99_000,
+        "registration_country": {"name": "uk"},
+        "registration_date": datetime(2024, 1, 1),
+        "license_plate": "ZZZ-111",
+        "is_electric": True,
+    }
+
+    by_assignment = car.model_copy(deep=True)
+    for name, value in changes.items():
+        setattr(by_assignment, name, value)
+    batched = update_fields(car.model_copy(deep=True), changes)
+    assert batched == by_assignment
+    assert batched.model_fields_set == by_assignment.model_fields_set
+    print("update_fields == one assignment per field")
+
+    before = batched.model_dump()
+    try:
+        update_fields(batched, {"base_msrp_usd": 1, "number_of_doors": 3})
+    except ValidationError as ex:
+        print(f"rejected: {ex.errors()[0]['loc']} {ex.errors()[0]['msg']}")
+    assert batched.model_dump() == before  # base_msrp_usd didn't change either
+    print("failed update left the car untouched")
+
+    runs = 20_000
+    for label, apply in (
+        ("5 assignments", lambda m: [setattr(m, k, v) for k, v in changes.items()]),
+        ("update_fields", lambda m: update_fields(m, changes)),
+    ):
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(runs):
+                apply(car)
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:<14} {best / runs * 1e6:.1f}us per update")
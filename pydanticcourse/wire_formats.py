@@ -0,0 +1,135 @@
+"""
+Opt-in integer wire format for the project's date types
+
+Service to service traffic doesn't need human readable dates. Integers are
+smaller on the wire and neither side has to format or parse a string.
+
+    text      -> the usual string layouts (the default)
+    epoch_s   -> whole seconds since 1970-01-01T00:00:00Z
+    epoch_ms  -> milliseconds since 1970-01-01T00:00:00Z
+    days      -> days since 1970-01-01
+
+Pick a format per call through the pydantic context:
+
+    car.model_dump_json(context={"date_wire_format": "epoch_ms"})
+    Automobile.model_validate_json(raw, context={"date_wire_format": "epoch_ms"})
+
+or per model by deriving from WireFormatModel and setting date_wire_format,
+which becomes the default context for model_dump* / model_validate* calls
+started from that model (nested models follow the outer model's format).
+
+Naive datetimes (e.g. CustomDate) are taken to be UTC, see timezones.py.
+"""
+
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Any, ClassVar
+
+from pydantic import BaseModel, ConfigDict, FieldSerializationInfo, ValidationInfo
+
+from pydanticcourse.timezones import UTC, make_utc
+
+CONTEXT_KEY = "date_wire_format"
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=UTC)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_SECONDS_PER_DAY = 86_400
+
+
+class DateWireFormat(str, Enum):
+    text = "text"
+    epoch_s = "epoch_s"
+    epoch_ms = "epoch_ms"
+    days = "days"
+
+
+def wire_format(info: ValidationInfo | FieldSerializationInfo) -> DateWireFormat:
+    context = info.context
+    if not context:
+        return DateWireFormat.text
+    return DateWireFormat(context.get(CONTEXT_KEY, DateWireFormat.text))
+
+
+def to_wire(value: date, fmt: DateWireFormat) -> int:
+    # Plain integer arithmetic, no timedelta objects on the hot path
+    if not isinstance(value, datetime):
+        days = value.toordinal() - _EPOCH_ORDINAL
+        if fmt is DateWireFormat.days:
+            return days
+        seconds = days * _SECONDS_PER_DAY
+        return seconds * 1000 if fmt is DateWireFormat.epoch_ms else seconds
+
+    if value.tzinfo is not None and value.tzinfo is not UTC:
+        value = make_utc(value)
+    days = value.toordinal() - _EPOCH_ORDINAL
+    if fmt is DateWireFormat.days:
+        return days
+    seconds = (
+        days * _SECONDS_PER_DAY + value.hour * 3600 + value.minute * 60 + value.second
+    )
+    if fmt is DateWireFormat.epoch_ms:
+        return seconds * 1000 + value.microsecond // 1000
+    return seconds
+
+
+def from_wire(value: int, fmt: DateWireFormat, aware: bool) -> datetime:
+    epoch = _EPOCH_UTC if aware else _EPOCH
+    if fmt is DateWireFormat.epoch_s:
+        return epoch + timedelta(seconds=value)
+    if fmt is DateWireFormat.epoch_ms:
+        return epoch + timedelta(milliseconds=value)
+    return epoch + timedelta(days=value)
+
+
+def _parse_wire(value: Any, info: ValidationInfo, aware: bool) -> Any:
+    # Anything that isn't an int (strings, datetimes) carries on to the
+    # normal validators untouched
+    if type(value) is not int:
+        return value
+    fmt = wire_format(info)
+    if fmt is DateWireFormat.text:
+        return value
+    return from_wire(value, fmt, aware)
+
+
+def parse_wire_datetime(value: Any, info: ValidationInfo) -> Any:
+    # BeforeValidator for UTC aware datetimes (DateTimeUTC)
+    return _parse_wire(value, info, aware=True)
+
+
+def parse_wire_date(value: Any, info: ValidationInfo) -> Any:
+    # BeforeValidator for naive dates (CustomDate)
+    return _parse_wire(value, info, aware=False)
+
+
+class WireFormatModel(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
+    # None -> use whatever the caller puts in the context (text by default)
+    date_wire_format: ClassVar[DateWireFormat | None] = None
+
+    @classmethod
+    def _wire_context(cls, context: Any | None) -> Any | None:
+        fmt = cls.date_wire_format
+        if fmt is None or (context is not None and CONTEXT_KEY in context):
+            return context
+        return {**(context or {}), CONTEXT_KEY: fmt}
+
+    def model_dump(self, *, context: Any | None = None, **kwargs) -> dict[str, Any]:
+        return super().model_dump(context=self._wire_context(context), **kwargs)
+
+    def model_dump_json(self, *, context: Any | None = None, **kwargs) -> str:
+        return super().model_dump_json(context=self._wire_context(context), **kwargs)
+
+    @classmethod
+    def model_validate(cls, obj: Any, *, context: Any | None = None, **kwargs):
+        return super().model_validate(obj, context=cls._wire_context(context), **kwargs)
+
+    @classmethod
+    def model_validate_json(
+        cls, json_data: str | bytes | bytearray, *, context: Any | None = None, **kwargs
+    ):
+        return super().model_validate_json(
+            json_data, context=cls._wire_context(context), **kwargs
+        )
@@ -0,0 +1,59 @@
+import pytest
+from pydantic import ValidationError
+
+from pydanticcourse import Automobile, CountryInfo, RegistrationCountry
+from pydanticcourse.countries import parse_registration_country
+
+CAR = {
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "registrationCountry": {"name": "us"},
+}
+
+
+def test_registration_country_is_a_model():
+    country = RegistrationCountry(name="us")
+    assert isinstance(country, RegistrationCountry)
+    assert country.model_dump() == {"name": "United States of America", "code3": "USA"}
+
+
+def test_automobile_holds_an_interned_country():
+    car = Automobile.model_validate(CAR)
+    assert isinstance(car.registration_country, CountryInfo)
+    assert car.registration_country is Automobile.model_validate(CAR).registration_country
+    assert car.model_dump()["registration_country"] == {
+        "name": "United States of America",
+        "code3": "USA",
+    }
+
+
+def test_registration_country_name_is_required():
+    with pytest.raises(ValueError):
+        parse_registration_country({"name": None})
+    with pytest.raises(ValidationError):
+        Automobile.model_validate({**CAR, "registrationCountry": {"name": None}})
+
+
+def test_registration_country_from_a_model():
+    car = Automobile.model_validate({**CAR, "registrationCountry": RegistrationCountry(name="us")})
+    assert car.registration_country is Automobile.model_validate(CAR).registration_country
+    assert parse_registration_country(RegistrationCountry(name="uk")).alpha3 == "GBR"
+
+
+def test_registration_country_dump_round_trips():
+    car = Automobile.model_validate(CAR)
+    dumped = car.model_dump()["registration_country"]
+    again = Automobile.model_validate({**CAR, "registrationCountry": dumped})
+    assert again.registration_country is car.registration_country
+    assert parse_registration_country({"code3": "GBR"}).name == "United Kingdom"
+
+
+def test_registration_country_code3_must_match():
+    with pytest.raises(ValueError, match="'GBR' doesn't match United States"):
+        parse_registration_country({"name": "us", "code3": "GBR"})
+    with pytest.raises(ValidationError):
+        Automobile.model_validate({**CAR, "registrationCountry": {"name": "us", "code3": "GBR"}})
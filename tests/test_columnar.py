@@ -0,0 +1,81 @@
+import csv
+import json
+import sys
+
+import pytest
+
+from pydanticcourse import Automobile
+from pydanticcourse.columnar import ColumnExporter, to_arrow, write_csv, write_parquet
+from pydanticcourse.rekey import key_map
+from pydanticcourse.samples import api_data
+
+# The exported columns are serialization aliases, validation reads others
+# (baseMSRPUSD -> msrpUSD)
+to_input = key_map(Automobile, "serialization", "validation")
+
+
+@pytest.fixture
+def cars():
+    return [
+        Automobile.model_validate(
+            {**api_data, "vin": f"VIN{i}", "licensePlate": None if i % 2 else "AAA-BBB"}
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.mark.parametrize("mode", ["python", "json"])
+def test_columns_match_model_dump(cars, mode):
+    columns = ColumnExporter(Automobile).columns(cars, mode=mode)
+    rows = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    assert rows == [car.model_dump(by_alias=True, mode=mode) for car in cars]
+
+
+def test_csv_round_trip(cars, tmp_path):
+    path = tmp_path / "cars.csv"
+    assert write_csv(cars, str(path), batch_size=2) == 5
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    nested = ("topFeatures", "registrationCountry")  # written as JSON text
+    dates = ("manufacturedDate", "registrationDate")  # CustomDate dumps 2023/01/01
+    for row in rows:
+        for key, cell in row.items():
+            if cell == "":
+                row[key] = None
+            elif key in nested:
+                row[key] = json.loads(cell)
+            elif key in dates:
+                row[key] = cell.replace("/", "-")
+    assert [Automobile.model_validate(to_input(row)) for row in rows] == cars
+
+
+def test_arrow_round_trip(cars, tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    table = to_arrow(cars, batch_size=2)
+    assert table.schema.field("manufacturedDate").type == "timestamp[us]"
+    assert [Automobile.model_validate(to_input(row)) for row in table.to_pylist()] == cars
+
+    path = tmp_path / "cars.parquet"
+    assert write_parquet(cars, str(path)) == 5
+    assert pq.read_table(path).equals(table)
+
+
+def test_arrow_all_none_batch(cars):
+    pytest.importorskip("pyarrow")
+    # The first batch's licensePlate is all None, the next one's isn't
+    table = to_arrow(cars[1:2] + cars[:1], batch_size=1)
+    assert table.column("licensePlate").to_pylist() == [None, "AAA-BBB"]
+    assert str(table.schema.field("licensePlate").type) == "string"
+
+
+def test_empty_input_needs_the_model():
+    with pytest.raises(ValueError, match="pass the model class"):
+        to_arrow([])
+
+
+def test_arrow_without_pyarrow(cars, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)  # import pyarrow fails
+    with pytest.raises(ImportError, match=r"pydanticcourse\[arrow\]"):
+        to_arrow(cars)
@@ -0,0 +1,38 @@
+import pytest
+
+from pydanticcourse.countries import lookup_country, registry
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("Germany", "DEU"),
+        (" USA ", "USA"),
+        ("GBR", "GBR"),
+        ("AND", "AND"),
+        ("DE", "DEU"),
+        ("us", "USA"),  # an alias, not the alpha-2 code
+        ("Untied Kingdom", "GBR"),
+        ("Germnay", "DEU"),
+        ("Swedn", "SWE"),
+    ],
+)
+def test_lookup_country(raw, expected):
+    assert lookup_country(raw)[1] == expected
+
+
+@pytest.mark.parametrize(
+    "raw", ["Prussia", "no", "de", "and", "per", "can", "gbr", "Austrlia", "Narnia"]
+)
+def test_lookup_country_rejects(raw):
+    with pytest.raises(ValueError, match="Unknown country name"):
+        lookup_country(raw)
+
+
+def test_unknown_country_message_is_short():
+    with pytest.raises(ValueError) as info:
+        lookup_country("Prussia")
+    message = str(info.value)
+    assert "Russian Federation" in message
+    assert message.count(",") <= 3
+    assert len(registry.resolver.suggestions("Prussia")) <= 3
@@ -0,0 +1,37 @@
+import pytest
+
+from pydanticcourse import Automobile
+from pydanticcourse.error_sink import ErrorSink
+
+CAR = {
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "registrationCountry": {"name": "us"},
+}
+
+
+@pytest.fixture
+def sink():
+    sink = ErrorSink()
+    rows = [CAR, {**CAR, "doors": 3}, {**CAR, "msrpUSD": "a lot"}]
+    assert len(list(sink.validate(Automobile, rows))) == 1
+    return sink
+
+
+def test_negative_index_counts_from_the_end(sink):
+    assert len(sink) == 2
+    assert sink.message(-1) == sink.message(1)
+    assert sink[-1].path == "msrpUSD"
+    assert sink.message(0) == "Input should be a multiple of 2"
+
+
+@pytest.mark.parametrize("i", [2, -3, 100])
+def test_out_of_range(sink, i):
+    with pytest.raises(IndexError):
+        sink.message(i)
+    with pytest.raises(IndexError):
+        sink[i]
@@ -0,0 +1,52 @@
+import pytest
+from pydantic import BaseModel, ValidationError, field_validator
+
+from pydanticcourse import Automobile, failfast
+from pydanticcourse.failfast import FailFast
+
+CAR = {
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "registrationCountry": {"name": "us"},
+}
+JUNK = {**CAR, "doors": 3, "msrpUSD": "call us"}
+
+
+def _errors(model, row):
+    with pytest.raises(ValidationError) as info:
+        model.model_validate(row)
+    return info.value.errors()
+
+
+def test_uncalibrated_gate_is_the_model():
+    gate = FailFast(Automobile)
+    assert gate.order == []
+    assert _errors(gate, JUNK) == _errors(Automobile, JUNK)
+
+
+def test_calibrated_gate_stops_at_the_first_error():
+    gate = FailFast(Automobile).calibrate([CAR, JUNK] * 5, goal="rejections")
+    assert gate.order
+    (error,) = _errors(gate, JUNK)
+    assert error in _errors(Automobile, JUNK)
+    assert gate.model_validate(CAR).vin == CAR["vin"]
+
+
+def test_without_inspect_validator_field_validators_stay_with_the_model(monkeypatch):
+    monkeypatch.setattr(failfast, "inspect_validator", None)
+
+    class Upper(BaseModel):
+        name: str
+
+        @field_validator("name", mode="before")
+        @classmethod
+        def upper(cls, value):
+            return value.upper()
+
+    gate = FailFast(Upper)
+    assert [check.name for check in gate.checks] == []
+    assert gate.model_validate({"name": "ann"}).name == "ANN"
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from pydanticcourse import Automobile
+from pydanticcourse.fleet import FleetStore
+
+CAR = {
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "topFeatures": ["convertible"],
+    "registrationCountry": {"name": "us"},
+    "licensePlate": "AAA-BBB",
+}
+
+
+def _car(**changes):
+    return Automobile.model_validate({**CAR, **changes})
+
+
+def test_rebuilds_models():
+    cars = [_car(vin=f"VIN{i}", msrpUSD=50_000 + i) for i in range(3)]
+    store = FleetStore(cars)
+    assert list(store) == cars
+
+
+def test_failed_extend_adds_nothing():
+    store = FleetStore([_car(vin="VIN0")])
+    bad = Automobile.model_construct(**{**_car().__dict__, "vin": 12345})
+    with pytest.raises(AttributeError):
+        store.extend([_car(vin="VIN1", manufacturer="Tesla", topFeatures=["new"]), bad])
+    assert len(store) == 1
+    assert store.where(manufacturer="Tesla").tolist() == [False]
+
+    car = _car(vin="VIN2", topFeatures=["heated seats"])
+    store.append(car)
+    assert [car.vin for car in store] == ["VIN0", "VIN2"]
+    assert store[1] == car
+
+
+def test_group_by_skips_missing_dates():
+    store = FleetStore(
+        [
+            _car(registrationDate="2024-01-01", msrpUSD=100),
+            _car(registrationDate="2024-01-01", msrpUSD=200),
+            _car(msrpUSD=1_000),
+        ]
+    )
+    assert store.group_by("registration_date") == {datetime(2024, 1, 1): 150.0}
+    assert store.group_by("manufactured_date", agg="count") == {datetime(2023, 1, 1): 3.0}
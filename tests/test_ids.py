@@ -0,0 +1,57 @@
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pydanticcourse.ids import IdGenerator, ulid, ulid_timestamp, uuid4, uuid7, uuid7_timestamp
+
+
+@pytest.mark.parametrize("make, version", [(uuid4, 4), (uuid7, 7)])
+def test_stdlib_layout(make, version):
+    value = make()
+    assert uuid.UUID(str(value)) == value
+    assert (value.version, value.variant) == (version, uuid.RFC_4122)
+
+
+def test_time_ordered():
+    sevens = [uuid7() for _ in range(10_000)]
+    assert sevens == sorted(sevens) and len(set(sevens)) == len(sevens)
+    ulids = [ulid() for _ in range(10_000)]
+    assert ulids == sorted(ulids) and len(set(ulids)) == len(ulids)
+    assert abs(uuid7_timestamp(sevens[-1]) - time.time()) < 5
+    assert abs(ulid_timestamp(ulids[-1]) - time.time()) < 5
+
+
+def test_threads_get_their_own_buffers():
+    generator = IdGenerator(ids_per_refill=64)
+    with ThreadPoolExecutor(4) as pool:
+        batches = list(pool.map(lambda _: [generator.uuid4() for _ in range(500)], range(4)))
+    assert len({value for batch in batches for value in batch}) == 4 * 500
+
+
+def test_ids_per_refill_must_be_positive():
+    with pytest.raises(ValueError):
+        IdGenerator(ids_per_refill=0)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_does_not_repeat_the_parent():
+    generator = IdGenerator()
+    generator.uuid4()
+    uuid4()  # both buffers hold prefetched IDs now
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write, b"".join(make().bytes for make in [generator.uuid4] * 8 + [uuid4] * 8))
+        os._exit(0)
+    os.close(write)
+    os.waitpid(pid, 0)
+    with os.fdopen(read, "rb") as f:
+        child = f.read()
+    parent = b"".join(make().bytes for make in [generator.uuid4] * 8 + [uuid4] * 8)
+    assert len(child) == len(parent) == 16 * 16
+    child_ids = {child[i : i + 16] for i in range(0, len(child), 16)}
+    assert not child_ids & {parent[i : i + 16] for i in range(0, len(parent), 16)}
+
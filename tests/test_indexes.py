@@ -0,0 +1,56 @@
+import pytest
+
+from pydanticcourse import Automobile
+from pydanticcourse.fleet import FleetStore
+from pydanticcourse.indexes import AutomobileIndex, DuplicateVinError
+
+CAR = {
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "registrationCountry": {"name": "us"},
+}
+
+
+def _car(vin):
+    return Automobile.model_validate({**CAR, "vin": vin})
+
+
+def test_rows_then_add():
+    index = AutomobileIndex(FleetStore(), expected=100)
+    index.add(_car("VIN1"))
+    held = index.rows(manufacturer="BMW")
+    index.add(_car("VIN2"))
+    assert held.tolist() == [0]
+    assert index.rows(manufacturer="BMW").tolist() == [0, 1]
+    assert index.row_for_vin("VIN2") == 1
+
+
+def test_duplicate_changes_nothing():
+    store = FleetStore()
+    index = AutomobileIndex(store, expected=100)
+    index.add(_car("VIN1"))
+    with pytest.raises(DuplicateVinError):
+        index.add(_car("VIN1"))
+    assert len(store) == 1
+    assert index.rows(type_="Convertible").tolist() == [0]
+
+
+def test_row_with_a_store_must_be_the_next_row():
+    store = FleetStore()
+    index = AutomobileIndex(store, expected=100)
+    with pytest.raises(ValueError):
+        index.add(_car("VIN1"), row=5)
+    assert len(store) == 0
+    assert "VIN1" not in index.vins
+    assert index.add(_car("VIN1"), row=0) == 0
+
+
+def test_row_without_a_store():
+    index = AutomobileIndex(expected=100)
+    assert index.add(_car("VIN1"), row=41) == 41
+    assert index.add(_car("VIN2")) == 42
+    assert index.rows(registration_country="us").tolist() == [41, 42]
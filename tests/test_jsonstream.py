@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from pydanticcourse import Automobile
+from pydanticcourse.jsonstream import ElementError, iter_json_array
+
+CAR = {
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "topFeatures": ["convertible ☀"],  # multi byte characters split across chunks
+    "vin": "1234567890",
+    "registrationCountry": {"name": "us"},
+}
+
+RAW = json.dumps([{**CAR, "id": None, "vin": f"VIN{i}"} for i in range(10)]).encode()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_matches_whole_array_validation(chunk_size):
+    streamed = list(iter_json_array(RAW, Automobile, chunk_size=chunk_size))
+    assert streamed == TypeAdapter(list[Automobile]).validate_json(RAW)
+
+
+def test_chunk_iterable_and_empty_array():
+    chunks = (RAW[i : i + 5] for i in range(0, len(RAW), 5))
+    assert len(list(iter_json_array(chunks, Automobile))) == 10
+    assert list(iter_json_array(b" [ ] ", Automobile)) == []
+
+
+def test_invalid_elements():
+    raw = json.dumps([CAR, {**CAR, "doors": 3}, CAR]).encode()
+    with pytest.raises(ValidationError):
+        list(iter_json_array(raw, Automobile))
+    results = list(iter_json_array(raw, Automobile, errors="yield"))
+    assert [type(r) for r in results] == [Automobile, ElementError, Automobile]
+    assert results[1].index == 1 and results[1].errors[0]["loc"] == ("doors",)
+
+
+@pytest.mark.parametrize("cut", [1, 20, len(RAW) // 2])
+@pytest.mark.parametrize("chunk_size", [3, 1 << 16])
+def test_truncated_input_raises(cut, chunk_size):
+    with pytest.raises(ValueError, match="Invalid JSON|Expected"):
+        list(iter_json_array(RAW[:-cut], Automobile, chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize(
+    "raw, message",
+    [
+        (b"", "Expected a JSON array"),
+        (b'{"a": 1}', "Expected a JSON array"),
+        (b"[1 2]", "Expected ',' or ']'"),
+        (b"[1, ]", "Expected a value after ','"),
+        (b"[1] [2]", "Unexpected data after the array"),
+        (b'[{"a": tru}]', "Invalid JSON"),
+    ],
+)
+def test_malformed_input_raises(raw, message):
+    with pytest.raises(ValueError, match=message):
+        list(iter_json_array(raw, Automobile, chunk_size=2, errors="yield"))
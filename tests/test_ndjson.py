@@ -0,0 +1,61 @@
+import io
+import json
+
+import pytest
+
+from pydanticcourse import Automobile
+from pydanticcourse.ndjson import LineError, iter_lines, validate_ndjson, validate_ndjson_file
+from pydanticcourse.schema_cache import CACHE_ENV
+
+CAR = {
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "doors": 2,
+    "registrationCountry": {"name": "us"},
+}
+
+
+def _ndjson(n: int) -> bytes:
+    # Every 10th car has 3 doors, which isn't valid
+    lines = [
+        json.dumps({**CAR, "vin": f"VIN{i}", "doors": 3 if i % 10 == 9 else 2}) for i in range(n)
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _keys(results):
+    return [r.line if isinstance(r, LineError) else r.vin for r in results]
+
+
+def test_blank_lines_keep_line_numbers():
+    lines = iter_lines(b'{"a": 1}\n\n  \n{"b": 2}')
+    assert list(lines) == [(1, b'{"a": 1}'), (4, b'{"b": 2}')]
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, bytes.decode, io.BytesIO])
+def test_sources(wrap):
+    results = [r for chunk in validate_ndjson(wrap(_ndjson(20)), chunk_size=7) for r in chunk]
+    assert _keys(results) == [i + 1 if i % 10 == 9 else f"VIN{i}" for i in range(20)]
+    assert results[9].errors[0]["loc"] == ("doors",)
+
+
+def test_str_is_never_a_path():
+    (error,) = [r for chunk in validate_ndjson("registry.ndjson") for r in chunk]
+    assert error.line == 1 and error.errors[0]["type"] == "json_invalid"
+
+
+def test_file_and_process_pool(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_ENV, str(tmp_path / "schemas"))
+    path = tmp_path / "cars.ndjson"
+    path.write_bytes(_ndjson(50))
+    serial = list(validate_ndjson_file(path))
+    pooled = list(validate_ndjson_file(str(path), chunk_size=4, processes=2))
+    assert _keys(pooled) == _keys(serial)
+    assert sum(isinstance(r, Automobile) for r in pooled) == 45
+    assert [r.errors for r in pooled if isinstance(r, LineError)] == [
+        r.errors for r in serial if isinstance(r, LineError)
+    ]
@@ -0,0 +1,41 @@
+import pytest
+from pydantic import ValidationError
+
+from pydanticcourse import ContactInfo, LazyPerson, Person
+
+HILBERT = {
+    "firstName": "David",
+    "lastName": "Hilbert",
+    "contactInfo": {"email": "david@hilbert.de"},
+    "personalInfo": {
+        "nationality": "German",
+        "born": {"date": "1862-01-23", "place": {"city": "Königsberg", "country": "Prussia"}},
+    },
+    "notableStudents": ["Weyl", "Courant"],
+}
+
+
+def test_repr_does_not_validate_nested_data():
+    person = LazyPerson.model_validate({**HILBERT, "contactInfo": {"email": "bad"}})
+    assert repr(person) == "LazyPerson(first_name='David', last_name='Hilbert')"
+    with pytest.raises(ValidationError):
+        person.validate_nested()
+
+
+def test_dumps_match_person():
+    lazy = LazyPerson.model_validate(HILBERT)
+    person = Person.model_validate(HILBERT)
+    assert list(lazy.model_dump()) == list(person.model_dump())
+    assert lazy.model_dump() == person.model_dump()
+    assert lazy.model_dump_json(by_alias=True) == person.model_dump_json(by_alias=True)
+
+
+def test_nested_fields_by_name():
+    person = LazyPerson(
+        first_name="David",
+        last_name="Hilbert",
+        contact_info=ContactInfo(email="david@hilbert.de"),
+        personal_info=HILBERT["personalInfo"],
+    )
+    assert person.contact_info.email == "david@hilbert.de"
+    assert person.personal_info.born.place.city == "Königsberg"
@@ -0,0 +1,25 @@
+import pydantic
+import pytest
+
+from pydanticcourse.core_schemas import TESTED_PYDANTIC, pydantic_version
+from pydanticcourse.profiling import profile_validators
+from pydanticcourse.responses import RequestInfo, Users
+
+
+@pytest.mark.skipif(
+    pydantic_version() != TESTED_PYDANTIC, reason="profiling is only checked on pydantic 2.10"
+)
+def test_report_counts_validator_calls():
+    with profile_validators(Users, RequestInfo) as profile:
+        for i in range(5):
+            info = RequestInfo(execution_dt=f"2024-01-0{i + 1} 10:00", elapsed_time_secs=0.1)
+            Users(request_info=info, users=["Athos"]).model_dump_json()
+    rows = {(row["model"], row["field"], row["name"]): row for row in profile.rows()}
+    assert rows["RequestInfo", "execution_dt", "parse_datetime"]["calls"] == 5
+    assert "parse_datetime" in profile.report()
+
+
+def test_refuses_untested_pydantic(monkeypatch):
+    monkeypatch.setattr(pydantic, "VERSION", "2.11.0")
+    with pytest.raises(RuntimeError, match="pydantic 2.11.0"):
+        profile_validators(Users)
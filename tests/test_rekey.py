@@ -0,0 +1,68 @@
+import json
+
+import pandas as pd
+import pytest
+from pydantic.alias_generators import to_camel, to_snake
+
+from pydanticcourse import Automobile, Person
+from pydanticcourse.rekey import generator_map, key_map, rekey
+from pydanticcourse.samples import json_data
+
+CAR = {
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "doors": 2,
+    "registrationCountry": {"name": "us"},
+}
+
+
+def test_matches_validate_and_dump():
+    (wire,) = rekey([CAR], Automobile)
+    dumped = Automobile.model_validate(CAR).model_dump(mode="json", by_alias=True)
+    assert set(wire) <= set(dumped)
+    assert wire["baseMSRPUSD"] == 93_300 and wire["numberOfDoors"] == 2
+    assert wire["registrationCountry"] == {"name": "us"}  # values are left alone
+
+
+def test_inverse_round_trips():
+    to_wire = key_map(Automobile, "validation", "serialization")
+    assert to_wire.inverse()(to_wire(CAR)) == CAR
+
+
+def test_nested_models():
+    (record,) = rekey([json.loads(json_data)], Person, "validation", "name")
+    assert record["first_name"] == "David"
+    assert record["personal_info"]["born"]["date_"] == "1862-01-23"
+    assert record["awards"]  # Person doesn't know it, it's kept
+
+
+def test_unknown_keys_dropped():
+    to_names = key_map(Automobile, "validation", "name", unknown="drop")
+    assert to_names({"seriesName": "M4", "colour": "red"}) == {"series_name": "M4"}
+
+
+def test_generator_map():
+    to_wire = generator_map(to_camel)
+    assert to_wire({"series_name": "M4", "is_electric": True}) == {
+        "seriesName": "M4",
+        "isElectric": True,
+    }
+    assert to_wire.mapping == {"series_name": "seriesName", "is_electric": "isElectric"}
+    with pytest.raises(ValueError):
+        to_wire.inverse()
+    assert generator_map(to_snake)({"seriesName": "M4"}) == {"series_name": "M4"}
+
+
+def test_frame():
+    frame = pd.DataFrame([{"msrpUSD": 1, "doors": 2, "colour": "red"}])
+    assert list(key_map(Automobile).frame(frame).columns) == [
+        "baseMSRPUSD",
+        "numberOfDoors",
+        "colour",
+    ]
+    to_names = key_map(Automobile, "validation", "name", unknown="drop")
+    assert list(to_names.frame(frame).columns) == ["base_msrp_usd", "number_of_doors"]
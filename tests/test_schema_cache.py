@@ -0,0 +1,119 @@
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+from pydantic import BaseModel, ConfigDict, Field
+
+from pydanticcourse import Automobile, RequestInfo
+from pydanticcourse.schema_cache import (
+    SchemaCacheWarning,
+    load_schema,
+    save_schema,
+    warm_start,
+)
+
+CAR = {
+    "id": None,
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "registrationCountry": {"name": "us"},
+}
+
+
+class _Counter:
+    def __init__(self):
+        self.local = threading.local()
+
+    def next(self) -> int:
+        return 1
+
+
+class Unpicklable(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
+    # A bound method on an object holding a threading.local can't be pickled
+    value: int = Field(default_factory=_Counter().next)
+
+
+def test_unpicklable_schema_warns(tmp_path):
+    with pytest.warns(SchemaCacheWarning, match="Unpicklable.*_local"):
+        assert save_schema(Unpicklable, tmp_path) is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_warm_start_reports_uncached(tmp_path):
+    Unpicklable.__pydantic_complete__ = False
+    with pytest.warns(SchemaCacheWarning):
+        assert warm_start(Unpicklable, directory=tmp_path) == {"Unpicklable": "uncached"}
+
+
+@pytest.mark.parametrize("model", [Automobile, RequestInfo])
+def test_id_factories_can_be_cached(model, tmp_path):
+    assert save_schema(model, tmp_path) is not None
+
+
+def test_automobile_round_trip(tmp_path):
+    save_schema(Automobile, tmp_path)
+    built = Automobile.model_validate(CAR).model_dump_json()
+    schema = Automobile.model_json_schema()
+    Automobile.__pydantic_complete__ = False
+    assert load_schema(Automobile, tmp_path)
+    assert Automobile.model_validate(CAR).model_dump_json() == built
+    assert Automobile.model_json_schema() == schema
+    without_id = {key: value for key, value in CAR.items() if key != "id"}
+    assert Automobile.model_validate(without_id).id_.version == 4
+
+
+# Run in fresh interpreters: warm_start only loads models that aren't built yet
+WARM_START = """
+import json
+import sys
+from pathlib import Path
+
+from pydanticcourse import Automobile
+from pydanticcourse.rekey import rekey
+from pydanticcourse.schema_cache import warm_start
+from pydanticcourse.selective import json_paths
+from pydanticcourse.trusted import TrustedLoader
+from pydanticcourse.updates import update_fields
+
+car = json.loads(sys.argv[2])
+status = warm_start(Automobile, directory=Path(sys.argv[1]))["Automobile"]
+trusted = TrustedLoader(Automobile, sample_rate=0.0).load(car)
+updated = update_fields(Automobile.model_validate(car), {"series_name": "X5"})
+print(json.dumps({
+    "status": status,
+    "aliases": {name: field.alias for name, field in Automobile.model_fields.items()},
+    "paths": sorted(json_paths(Automobile)),
+    "trusted": trusted.model_dump(mode="json", by_alias=True),
+    "updated": updated.model_dump(mode="json", by_alias=True, exclude={"id_"}),
+    "rekeyed": rekey([car], Automobile, "validation", "name"),
+}))
+"""
+
+
+def _warm_start_run(directory) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", WARM_START, str(directory), json.dumps(CAR)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def test_cached_model_matches_built(tmp_path):
+    built = _warm_start_run(tmp_path)
+    cached = _warm_start_run(tmp_path)
+    assert (built.pop("status"), cached.pop("status")) == ("built", "cached")
+    assert cached["aliases"]["series_name"] == "seriesName"
+    assert {"isElectric", "licensePlate"} <= set(cached["paths"])
+    assert cached["trusted"]["seriesName"] == "M4"
+    assert cached["updated"]["seriesName"] == "X5"
+    assert cached == built
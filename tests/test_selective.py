@@ -0,0 +1,55 @@
+import json
+
+from pydantic import AliasChoices, AliasPath, BaseModel, Field
+
+from pydanticcourse import Automobile, Person
+from pydanticcourse.samples import json_data
+from pydanticcourse.schema_cache import load_schema, save_schema
+from pydanticcourse import selective
+from pydanticcourse.selective import extract, json_paths
+
+CAR_KEYS = {
+    "id", "manufacturer", "seriesName", "type", "isElectric", "completionDate", "msrpUSD",
+    "topFeatures", "vin", "doors", "registrationCountry", "registrationDate", "licensePlate",
+}
+
+
+class Paths(BaseModel):
+    first: str = Field(validation_alias=AliasChoices("first", AliasPath("names", 0)))
+    city: str = Field(validation_alias=AliasPath("address", "city"))
+
+
+def test_automobile_paths():
+    assert json_paths(Automobile) == CAR_KEYS
+
+
+def test_paths_after_cached_schema(tmp_path):
+    save_schema(Automobile, tmp_path)
+    Automobile.__pydantic_complete__ = False
+    assert load_schema(Automobile, tmp_path)
+    selective._model_tree.cache_clear()
+    assert json_paths(Automobile) == CAR_KEYS
+
+
+def test_nested_and_by_name():
+    assert "personalInfo.born.place.city" in json_paths(Person)
+    assert "first_name" not in json_paths(Person)
+    assert {"firstName", "first_name"} <= json_paths(Person, by_name=True)
+
+
+def test_alias_paths():
+    assert json_paths(Paths) == {"first", "names", "address.city"}
+
+
+def test_extract_keeps_what_the_model_reads():
+    doc = json.loads(json_data)
+    doc["publications"] = [{"title": "Grundlagen der Geometrie", "year": 1899}]
+    raw = json.dumps(doc)
+    slim = extract(raw, Person)
+    assert "publications" not in slim
+    assert Person.model_validate(slim) == Person.model_validate_json(raw)
+
+
+def test_extract_paths():
+    raw = '{"a": [{"b": 1, "c": 2}, {"b": 3}], "d": 4}'
+    assert extract(raw, ["a[].b"]) == {"a": [{"b": 1}, {"b": 3}]}
@@ -0,0 +1,31 @@
+import asyncio
+
+from pydanticcourse.responses import Users
+from pydanticcourse.timing import LatencyRegistry, timed_response
+
+
+def test_sync_handler_gets_cpu_time():
+    registry = LatencyRegistry()
+
+    @timed_response(Users, "users", registry)
+    def list_users() -> dict:
+        return {"users": ["ann"]}
+
+    assert list_users().users == ["ann"]
+    assert registry["users"].wall.count == 1
+    assert registry["users"].cpu.count == 1
+
+
+def test_async_handler_gets_wall_time_only():
+    registry = LatencyRegistry()
+
+    @timed_response(Users, "users/search", registry)
+    async def search_users() -> dict:
+        await asyncio.sleep(0.001)
+        return {"users": ["ann"]}
+
+    response = asyncio.run(search_users())
+    assert response.request_info.elapsed_time_secs >= 0.001
+    assert registry["users/search"].wall.count == 1
+    assert registry["users/search"].cpu.count == 0
+    assert registry.report().splitlines()[1].endswith("-")
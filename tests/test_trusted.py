@@ -0,0 +1,57 @@
+import pytest
+
+from pydanticcourse import Automobile
+from pydanticcourse.schema_cache import load_schema, save_schema
+from pydanticcourse.trusted import TrustedDataWarning, TrustedLoader
+
+CAR = {
+    "id": "6f1f3c1e-4c7f-4f39-9a2b-1b9f7b1b2c3d",
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "isElectric": False,
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "doors": 2,
+    "registrationCountry": {"name": "us"},
+    "registrationDate": "2023-06-01",
+    "licensePlate": "AAA-BBB",
+}
+
+
+def _assert_matches_validated(car):
+    validated = Automobile.model_validate(CAR)
+    assert car == validated
+    assert car.model_fields_set == validated.model_fields_set
+
+
+def test_unsampled_load_matches_validation():
+    loader = TrustedLoader(Automobile, sample_rate=0.0)
+    _assert_matches_validated(loader.load(CAR))
+    assert (loader.loaded, loader.checked) == (1, 0)
+
+
+def test_unsampled_load_after_cached_schema(tmp_path):
+    save_schema(Automobile, tmp_path)
+    Automobile.__pydantic_complete__ = False
+    assert load_schema(Automobile, tmp_path)
+    _assert_matches_validated(TrustedLoader(Automobile, sample_rate=0.0).load(CAR))
+
+
+def test_defaults_filled_in():
+    row = {key: value for key, value in CAR.items() if key not in ("id", "isElectric")}
+    car = TrustedLoader(Automobile, sample_rate=0.0).load(row)
+    assert car.id_.version == 4
+    assert car.is_electric is False
+    assert "is_electric" not in car.model_fields_set
+
+
+def test_sampled_drift_warns():
+    failures = []
+    loader = TrustedLoader(Automobile, sample_rate=1.0, on_failure=failures.append)
+    with pytest.warns(TrustedDataWarning, match="row 1"):
+        loader.load_many([CAR, {**CAR, "doors": 3}])
+    assert (loader.checked, loader.failed) == (2, 1)
+    assert [failure.index for failure in failures] == [1]
+    assert list(loader.recent_failures) == failures
@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+
+from pydanticcourse import Automobile
+from pydanticcourse.schema_cache import load_schema, save_schema
+from pydanticcourse.updates import update_fields, update_many
+
+CAR = {
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "doors": 2,
+    "registrationCountry": {"name": "us"},
+    "registrationDate": "2023-06-01",
+    "licensePlate": "AAA-BBB",
+}
+
+
+def test_matches_assignments():
+    changes = {
+        "base_msrp_usd": 99_000,
+        "registration_country": {"name": "uk"},
+        "registration_date": date(2024, 1, 1),
+        "is_electric": True,
+    }
+    car = Automobile.model_validate(CAR)
+    assigned = car.model_copy(deep=True)
+    for name, value in changes.items():
+        setattr(assigned, name, value)
+    updated = update_fields(car, changes)
+    assert updated == assigned
+    assert updated.model_fields_set == assigned.model_fields_set
+
+
+def test_aliases_accepted():
+    car = update_fields(Automobile.model_validate(CAR), {"seriesName": "X5", "doors": 4})
+    assert (car.series_name, car.number_of_doors) == ("X5", 4)
+
+
+def test_failed_update_changes_nothing():
+    car = Automobile.model_validate(CAR)
+    before = car.model_dump()
+    with pytest.raises(ValidationError) as ex:
+        update_fields(car, {"base_msrp_usd": 1, "number_of_doors": 3})
+    assert ex.value.errors()[0]["loc"] == ("doors",)
+    assert car.model_dump() == before
+
+
+def test_unknown_field():
+    with pytest.raises(ValueError, match='no field "colour"'):
+        update_fields(Automobile.model_validate(CAR), {"colour": "red"})
+
+
+def test_after_cached_schema(tmp_path):
+    save_schema(Automobile, tmp_path)
+    Automobile.__pydantic_complete__ = False
+    assert load_schema(Automobile, tmp_path)
+    car = update_fields(Automobile.model_validate(CAR), {"series_name": "X5"})
+    assert car.series_name == "X5"
+
+
+def test_update_many_collects_failures():
+    cars = [Automobile.model_validate(CAR) for _ in range(3)]
+    failures = update_many(
+        (car, {"number_of_doors": doors}) for car, doors in zip(cars, (4, 3, 2))
+    )
+    assert [failure.index for failure in failures] == [1]
+    assert [car.number_of_doors for car in cars] == [4, 2, 2]
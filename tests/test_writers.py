@@ -0,0 +1,64 @@
+import io
+import json
+
+import pytest
+
+from pydanticcourse import Automobile
+from pydanticcourse.writers import ModelWriter, write_models
+
+CAR = {
+    "manufacturer": "BMW",
+    "seriesName": "M4",
+    "type": "Convertible",
+    "completionDate": "2023-01-01",
+    "msrpUSD": 93_300,
+    "vin": "1234567890",
+    "registrationCountry": {"name": "us"},
+}
+
+
+class ShortWrites(io.RawIOBase):
+    # Takes at most 7 bytes per write(), like a pipe or socket under load
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        chunk = bytes(b[:7])
+        self.data += chunk
+        return len(chunk)
+
+
+def _cars(n):
+    car = Automobile.model_validate(CAR)
+    return [car.model_copy(update={"vin": f"VIN{i:08d}"}) for i in range(n)]
+
+
+def test_ndjson_matches_model_dump_json():
+    cars = _cars(50)
+    out = io.BytesIO()
+    assert write_models(cars, out, by_alias=True) == 50
+    expected = "".join(c.model_dump_json(by_alias=True) + "\n" for c in cars)
+    assert out.getvalue() == expected.encode()
+
+
+def test_short_writes_on_a_raw_stream():
+    cars = _cars(50)
+    raw = ShortWrites()
+    with ModelWriter(raw, "array", buffer_size=64) as out:
+        out.write_many(cars)
+    assert not raw.closed
+    assert len(json.loads(raw.data)) == 50
+
+
+def test_array_left_open_on_error():
+    out = io.BytesIO()
+    with pytest.raises(LookupError):
+        with ModelWriter(out, "array") as writer:
+            writer.write_many(_cars(2))
+            raise LookupError("lost the database connection")
+    assert out.getvalue().startswith(b"[{") and not out.getvalue().endswith(b"]")
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(out.getvalue())